@@ -0,0 +1,195 @@
+# 기사 HTML 디스크 캐시
+# URL 해시(SHA-1)를 이름으로 기사 하나당 gzip 파일 하나를 저장
+# - 내용: 링크, 목록 날짜, 출처, 받은 시각, ETag / Last-Modified, 본문 HTML
+# - 파일 수정 시각을 마지막 사용 시각으로 써서 용량을 넘으면 오래 안 쓴 것부터 지움 (LRU)
+# - 캐시 폴더의 index.jsonl에 기사마다 (해시, 링크, 목록 날짜, 출처) 한 줄을 덧붙여 두고
+#   iter_links는 압축을 풀지 않고 이 색인으로 날짜를 거름
+#   (색인에 없는 파일은 그때 한 번 읽어서 색인에 추가: 색인 이전 캐시, 다른 프로세스와 겹쳐 빠진 줄)
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+INDEX_NAME = "index.jsonl"
+
+
+def cache_key(full_link):
+    return hashlib.sha1(full_link.encode("utf-8")).hexdigest()
+
+
+class ArticleCache:
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evicted = 0
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path in self._paths())
+
+    # 해시 앞 두 글자로 하위 폴더를 나눠 한 폴더에 파일이 너무 많아지지 않게 함
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json.gz")
+
+    def _paths(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json.gz"):
+                    yield os.path.join(root, name)
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    # 색인 줄 덧붙이기 (한 번에 써서 다른 프로세스가 덧붙인 줄과 섞이지 않게 함)
+    def _append_index(self, rows):
+        lines = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        if lines:
+            with self.lock:
+                with open(self._index_path(), "a", encoding="utf-8") as f:
+                    f.write(lines)
+
+    # 색인: {해시: (링크, 목록 날짜, 출처)} (같은 해시는 마지막 줄), 읽은 줄 수
+    def _read_index(self):
+        index = {}
+        lines = 0
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        key, link, date_text, source = json.loads(line)
+                    except ValueError:
+                        continue  # 쓰다 만 줄
+                    index[key] = (link, date_text, source)
+        except OSError:
+            pass
+        return index, lines
+
+    # 지금 있는 파일의 줄만 남겨서 다시 씀 (같은 기사를 여러 번 저장하거나 지운 기사 줄이 쌓였을 때)
+    def _rewrite_index(self, index):
+        path = self._index_path()
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self.lock:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for key, (link, date_text, source) in index.items():
+                    f.write(json.dumps([key, link, date_text, source], ensure_ascii=False) + "\n")
+            os.replace(temp_path, path)
+
+    @staticmethod
+    def _read(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    # 캐시된 기사 (dict) 또는 None
+    def get(self, full_link):
+        path = self._path(cache_key(full_link))
+        try:
+            entry = self._read(path)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+        # 사용 시각 갱신 (LRU 순서)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self.lock:
+            self.hits += 1
+        return entry
+
+    def put(self, full_link, date_text, html, etag=None, last_modified=None, fetched_at=None, source=None):
+        entry = {
+            "link": full_link,
+            "date": date_text,
+            "source": source,
+            "fetched_at": fetched_at or time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "html": html,
+        }
+        key = cache_key(full_link)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 다른 스레드/프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 바꿔치기
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(entry, f, ensure_ascii=False)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(temp_path, path)
+        self._append_index([[key, full_link, date_text, source]])
+        with self.lock:
+            self.total_bytes += os.path.getsize(path) - old_size
+            over = self.total_bytes > self.max_bytes
+        if over:
+            self.evict()
+        return entry
+
+    # 304 응답을 받은 기사는 받은 시각만 갱신
+    def touch(self, entry):
+        with self.lock:
+            self.not_modified += 1
+        entry["fetched_at"] = time.time()
+        return self.put(entry["link"], entry["date"], entry["html"], entry["etag"], entry["last_modified"],
+                        entry["fetched_at"], entry.get("source"))
+
+    # 전체 크기가 max_bytes의 90% 아래로 내려갈 때까지 오래 안 쓴 파일부터 삭제
+    def evict(self):
+        with self.lock:
+            files = []
+            for path in self._paths():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+            files.sort()
+            total = sum(size for _, size, _ in files)
+            limit = self.max_bytes * 0.9
+            for _, size, path in files:
+                if total <= limit:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evicted += 1
+            self.total_bytes = total
+
+    # 캐시에 있는 기사 (링크, 목록 날짜, 출처 이름). since/until은 'YYYY-MM-DD' (포함)
+    # 날짜는 색인에서 보고, 범위 안의 기사도 압축을 풀지 않음 (본문은 처리할 때 get으로 읽음)
+    def iter_links(self, since=None, until=None):
+        index, lines = self._read_index()
+        live = {}
+        missing = []
+        for path in self._paths():
+            key = os.path.basename(path)[:-len(".json.gz")]
+            if key not in index:
+                try:
+                    entry = self._read(path)
+                except (OSError, ValueError):
+                    continue
+                index[key] = (entry["link"], entry.get("date"), entry.get("source"))
+                missing.append([key, *index[key]])
+            live[key] = index[key]
+        # 지운 기사 / 같은 기사의 옛 줄이 살아 있는 기사만큼 쌓였으면 색인을 다시 씀
+        if lines + len(missing) > 2 * len(live) + 1000:
+            self._rewrite_index(live)
+        elif missing:
+            self._append_index(missing)
+
+        for link, date_text, source in live.values():
+            date_str = (date_text or "").split(" ")[0]
+            if (since and date_str < since) or (until and date_str > until):
+                continue
+            yield link, date_text, source
+
+    def print_summary(self):
+        print(f"[INFO] 기사 캐시: 적중 {self.hits}건, 없음 {self.misses}건, 변경 없음(304) {self.not_modified}건, "
+              f"삭제 {self.evicted}건, {self.total_bytes / 1024 / 1024:.1f}MB")
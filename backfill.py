@@ -0,0 +1,268 @@
+# 지난 날짜 백필 (since ~ until 기간의 뉴스를 모아서 저장)
+# - 기간을 출처별 날짜 구간(BACKFILL_SHARD_DAYS일)으로 나누고 BACKFILL_PARALLEL개 구간씩 묶어서 동시에 수집
+#   (구간마다 링크 수집 스레드 하나, 기사 수집 / 파싱 / 저장은 sql.NewsPipeline을 같이 씀)
+# - 목록은 최신순이라 구간이 시작되는 페이지를 PageLocator가 지수 탐색 + 이진 탐색으로 찾고, 그 페이지부터 넘김
+# - 목록 페이지와 기사 요청은 모든 구간이 HostLimiter 하나를 같이 써서 전체 초당 요청 수(BACKFILL_RATE)를 넘지 않음
+# - 구간마다 백필_구간 테이블에 상태를 기록하고, 기사를 빠짐없이 저장한 구간만 완료로 남김
+#   다시 실행하면 완료한 날짜는 건너뛰므로 중간에 멈춘 백필을 같은 명령으로 이어서 할 수 있음
+# - 크롤링_체크포인트(최신 기사 수집 위치)는 건드리지 않음
+# 사용법: py backfill.py --since 2023-01-01 [--until 2024-12-31] [--shard-days 7] [--parallel 4] [--rate 5]
+import argparse
+import datetime
+import os
+import threading
+import time
+
+import metrics
+import sql
+
+BACKFILL_SHARD_DAYS = int(os.getenv("BACKFILL_SHARD_DAYS", "7"))  # 구간 하나의 날짜 수
+BACKFILL_PARALLEL = int(os.getenv("BACKFILL_PARALLEL", "4"))  # 동시에 수집하는 구간 수
+BACKFILL_RATE = float(os.getenv("BACKFILL_RATE", "5"))  # 모든 구간을 합친 초당 최대 요청 수 (0이면 호스트별 제한만)
+BACKFILL_MAX_PAGES = int(os.getenv("BACKFILL_MAX_PAGES", "20000"))  # 목록을 넘길 수 있는 마지막 페이지
+
+RUNNING = "실행중"
+DONE = "완료"
+FAILED = "실패"
+
+
+# since ~ until을 days일씩 나눈 [(시작일, 종료일), ...] 최신 구간부터
+def make_shards(since, until, days=BACKFILL_SHARD_DAYS):
+    shards = []
+    end = until
+    while end >= since:
+        start = max(since, end - datetime.timedelta(days=days - 1))
+        shards.append((start, end))
+        end = start - datetime.timedelta(days=1)
+    return shards
+
+
+def shard_name(source, start, end):
+    return f"{source.name} {start}~{end}"
+
+
+# 출처별로 완료한 날짜 set (구간 크기를 바꿔서 다시 실행해도 이미 한 날짜는 건너뛸 수 있도록 날짜 단위로 풂)
+def load_done_days(cursor, names, since, until):
+    done = {name: set() for name in names}
+    if not names:
+        return done
+    placeholders = ", ".join(["%s"] * len(names))
+    cursor.execute(f"""
+        SELECT 출처, 시작일, 종료일 FROM 백필_구간
+        WHERE 상태 = %s AND 출처 IN ({placeholders}) AND 종료일 >= %s AND 시작일 <= %s
+    """, [DONE, *names, since, until])
+    for name, start, end in cursor.fetchall():
+        for offset in range((end - start).days + 1):
+            done[name].add(start + datetime.timedelta(days=offset))
+    return done
+
+
+def is_done(done_days, start, end):
+    return all(start + datetime.timedelta(days=offset) in done_days for offset in range((end - start).days + 1))
+
+
+def start_shards(cursor, conn, shards):
+    cursor.executemany("""
+        INSERT INTO 백필_구간 (출처, 시작일, 종료일, 상태, 시작시각)
+        VALUES (%s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE 상태 = VALUES(상태), 링크 = 0, 저장 = 0, 시작시각 = NOW(), 종료시각 = NULL
+    """, [(source.name, start, end, RUNNING) for source, start, end in shards])
+    conn.commit()
+
+
+# rows: [(출처 이름, 시작일, 종료일, 상태, 링크 수, 저장 수), ...]
+def finish_shards(cursor, conn, rows):
+    cursor.executemany("""
+        UPDATE 백필_구간 SET 상태 = %s, 링크 = %s, 저장 = %s, 종료시각 = NOW()
+        WHERE 출처 = %s AND 시작일 = %s AND 종료일 = %s
+    """, [(status, links, saved, name, start, end) for name, start, end, status, links, saved in rows])
+    conn.commit()
+
+
+# 출처 목록에서 어떤 날짜 이하의 기사가 처음 나오는 페이지 찾기 (목록은 최신순, 페이지가 뒤로 갈수록 오래된 기사)
+# 페이지마다 가장 오래된 기사 날짜를 기억해 두고 모든 구간이 같이 쓰므로, 구간마다 처음부터 넘기지 않고
+# 이미 아는 페이지 사이만 지수 탐색 + 이진 탐색으로 요청함 (페이지 번호의 로그만큼)
+# 새 기사가 올라오면 기사가 뒤 페이지로 밀리므로 기억해 둔 값은 더 앞 페이지를 가리킴 (조금 더 넘길 뿐 빠뜨리지 않음)
+class PageLocator:
+    def __init__(self, source, session, limiter, max_pages=BACKFILL_MAX_PAGES):
+        self.source = source
+        self.session = session
+        self.limiter = limiter
+        self.max_pages = max_pages
+        self.oldest = {}  # 페이지 -> 가장 오래된 기사 날짜 (빈 페이지면 None)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def _oldest(self, page):
+        with self.lock:
+            if page in self.oldest:
+                return self.oldest[page]
+        page_url = self.source.list_page_url(page)
+        with self.limiter.slot(page_url), metrics.span("list_probe", source=self.source.name):
+            response = self.session.get(page_url, timeout=sql.FETCH_TIMEOUT)
+        items = []
+        if response.status_code != 404:
+            response.raise_for_status()
+            items = self.source.parse_list(response.text)
+        dates = []
+        for _, date_text in items:
+            try:
+                dates.append(sql.parse_news_time(date_text).date())
+            except ValueError:
+                continue
+        with self.lock:
+            self.requests += 1
+            self.oldest[page] = min(dates) if dates else None
+            return self.oldest[page]
+
+    def _reached(self, page, date):
+        oldest = self._oldest(page)
+        return oldest is None or oldest <= date
+
+    # date 이하 기사가 처음 나오는 페이지 (목록 끝까지 그런 기사가 없으면 None)
+    def first_page(self, date):
+        with self.lock:
+            known = dict(self.oldest)
+        # low: date보다 새 기사만 있는 페이지 (0은 첫 페이지 앞), high: date 이하 기사가 있거나 빈 페이지
+        low = max((page for page, oldest in known.items() if oldest is not None and oldest > date), default=0)
+        high = min((page for page, oldest in known.items() if page > low and (oldest is None or oldest <= date)),
+                   default=None)
+        while high is None:
+            page = min(max(1, low * 2), self.max_pages)
+            if self._reached(page, date):
+                high = page
+            elif page >= self.max_pages:
+                raise ValueError(f"{self.source.name} 목록 {self.max_pages}페이지 안에 {date} 이전 기사가 없습니다. "
+                                 "BACKFILL_MAX_PAGES를 늘려 주세요.")
+            else:
+                low = page
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._reached(middle, date):
+                high = middle
+            else:
+                low = middle
+        return high if self._oldest(high) is not None else None
+
+
+# 구간 하나의 링크 (구간이 시작되는 페이지부터 start 이전 기사가 나올 때까지)
+def iter_shard_links(source, locator, start, end, seen_links, limiter):
+    first_page = locator.first_page(end)
+    if first_page is None:
+        print(f"[INFO] {source.name} 목록에 {end} 이전 기사가 없습니다.")
+        return
+    print(f"[INFO] {source.name} {start}~{end} 구간은 목록 {first_page}페이지부터 수집합니다.")
+    yield from sql.iter_news_links_http(source, datetime.datetime.combine(start, datetime.time()), seen_links,
+                                        until=datetime.datetime.combine(end, datetime.time()),
+                                        first_page=first_page, last_page=locator.max_pages, limiter=limiter)
+
+
+# 구간 묶음 하나를 수집해서 저장하고 구간별 상태를 기록. 끝난 파이프라인 반환
+def crawl_shards(db_stock_data, cursor, conn, shards, locators, limiter, cache=None,
+                 fetch_workers=sql.FETCH_WORKERS, parse_workers=sql.PARSE_WORKERS):
+    since = min(start for _, start, _ in shards)
+    until = max(end for _, _, end in shards)
+    start_shards(cursor, conn, shards)
+
+    existing_links = sql.get_existing_news_links(cursor, since.isoformat(), until.isoformat())
+    margin = datetime.timedelta(days=sql.NEAR_DUP_DAYS)
+    near_dups = sql.open_near_dup_index(cursor, since - margin, until + margin)
+    pipeline = sql.NewsPipeline(db_stock_data, cursor, conn, fetch_workers=fetch_workers,
+                                parse_workers=parse_workers, cache=cache, near_dups=near_dups, limiter=limiter,
+                                metrics_name="backfill")
+    pipeline.run_sources([
+        (shard_name(source, start, end), source.body_selectors,
+         iter_shard_links(source, locators[source.name], start, end, set(existing_links), limiter))
+        for source, start, end in shards])
+
+    rows = []
+    for source, start, end in shards:
+        name = shard_name(source, start, end)
+        stats = pipeline.sources[name].stats
+        status = DONE if pipeline.completed(name) else FAILED
+        if status == FAILED:
+            print(f"[WARNING] {name} 구간의 일부 기사를 처리하지 못했습니다. 다음 실행에서 다시 시도합니다.")
+        rows.append((source.name, start, end, status, stats["discover"].count, stats["write"].count))
+    finish_shards(cursor, conn, rows)
+    return pipeline
+
+
+# since ~ until 백필. 저장한 기사 수 반환
+def run_backfill(since, until, shard_days=BACKFILL_SHARD_DAYS, parallel=BACKFILL_PARALLEL, rate=BACKFILL_RATE,
+                 fetch_workers=sql.FETCH_WORKERS, parse_workers=sql.PARSE_WORKERS):
+    conn = sql.connect_to_db()
+    cursor = conn.cursor()
+    session = sql.create_session(parallel)
+    try:
+        print("[INFO] 테이블 생성 확인 중...")
+        sql.ensure_table_exists(cursor)
+
+        print("[INFO] 상장법인목록 데이터 로드 중...")
+        db_stock_data = sql.load_stock_data(cursor)
+        if not db_stock_data:
+            print("[WARNING] 상장법인목록 데이터가 비어 있습니다.")
+            return 0
+
+        # 목록 페이지를 넘길 수 있는 출처만 (RSS 피드는 최근 기사만 담겨 있어서 지난 날짜를 가져올 수 없음)
+        sources = []
+        for source in sql.load_news_sources():
+            if source.list_page_url(2) is None:
+                print(f"[WARNING] {source.name}은(는) 지난 목록 페이지가 없어 백필하지 않습니다.")
+            else:
+                sources.append(source)
+
+        done = load_done_days(cursor, [source.name for source in sources], since, until)
+        all_shards = [(source, start, end) for source in sources for start, end in make_shards(since, until, shard_days)]
+        pending = [(source, start, end) for source, start, end in all_shards
+                   if not is_done(done[source.name], start, end)]
+        # 최신 구간부터, 같은 날짜의 출처들을 한 묶음에 (묶음마다 읽는 기존 링크 / 거의 같은 기사 범위가 좁아짐)
+        pending.sort(key=lambda shard: (shard[1], shard[0].name), reverse=True)
+        print(f"[INFO] 백필 {since} ~ {until}: 구간 {len(all_shards)}개 중 {len(pending)}개 남음 "
+              f"({shard_days}일씩, {parallel}개 동시, 초당 최대 {rate:g}회 요청)")
+
+        limiter = sql.HostLimiter(rate=rate)
+        locators = {source.name: PageLocator(source, session, limiter) for source in sources}
+        cache = sql.open_article_cache()
+        start_time = time.perf_counter()
+        articles = rows = failed = 0
+        for index in range(0, len(pending), parallel):
+            shards = pending[index:index + parallel]
+            pipeline = crawl_shards(db_stock_data, cursor, conn, shards, locators, limiter, cache,
+                                    fetch_workers, parse_workers)
+            articles += pipeline.stats["write"].count
+            rows += pipeline.stats["write"].count + pipeline.writer.rows
+            failed += sum(not pipeline.completed(shard_name(*shard)) for shard in shards)
+            elapsed = time.perf_counter() - start_time
+            print(f"[INFO] 백필 진행: 구간 {index + len(shards)}/{len(pending)}개 (실패 {failed}개), "
+                  f"기사 {articles}개, {rows}행, {rows / elapsed:.1f} rows/sec")
+
+        elapsed = time.perf_counter() - start_time
+        probes = sum(locator.requests for locator in locators.values())
+        print(f"[INFO] 백필 완료: 구간 {len(pending)}개 (실패 {failed}개), 기사 {articles}개, "
+              f"기사 + 종목 언급 {rows}행 ({elapsed:.1f}초, {rows / elapsed if elapsed > 0 else 0.0:.1f} rows/sec), "
+              f"시작 페이지 찾기 요청 {probes}회")
+        if failed:
+            print("[WARNING] 실패한 구간이 있습니다. 같은 명령을 다시 실행하면 남은 구간만 수집합니다.")
+        return articles
+    finally:
+        session.close()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    arg_parser = argparse.ArgumentParser(description="지난 날짜 뉴스 백필 (중간에 멈추면 같은 명령으로 이어서 실행)")
+    arg_parser.add_argument("--since", required=True, type=datetime.date.fromisoformat, help="시작 날짜 (YYYY-MM-DD)")
+    arg_parser.add_argument("--until", type=datetime.date.fromisoformat, default=yesterday,
+                            help="끝 날짜 (YYYY-MM-DD, 기본값 어제)")
+    arg_parser.add_argument("--shard-days", type=int, default=BACKFILL_SHARD_DAYS, help="구간 하나의 날짜 수")
+    arg_parser.add_argument("--parallel", type=int, default=BACKFILL_PARALLEL, help="동시에 수집하는 구간 수")
+    arg_parser.add_argument("--rate", type=float, default=BACKFILL_RATE, help="초당 최대 요청 수 (0이면 호스트별 제한만)")
+    args = arg_parser.parse_args()
+
+    if args.since > args.until:
+        arg_parser.error("--since가 --until보다 늦습니다.")
+    if args.shard_days < 1 or args.parallel < 1:
+        arg_parser.error("--shard-days와 --parallel은 1 이상이어야 합니다.")
+    run_backfill(args.since, args.until, args.shard_days, args.parallel, args.rate)
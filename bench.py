@@ -0,0 +1,1736 @@
+# 오프라인 벤치마크 / 로컬 테스트 서버
+# - 녹화한 edaily 페이지(또는 합성 페이지)를 로컬 HTTP 서버로 제공
+# - 사용법: python bench.py --help
+import argparse
+import ast
+import datetime
+import hashlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MANIFEST_NAME = "manifest.json"
+RESULTS_DIR = "bench_results"  # ingest 결과 JSON 기본 저장 폴더
+DASHBOARD_SCRIPT = "chartF.py"
+BENCH_DB_NAME = "news_gazer_bench"  # 벤치마크 전용 스키마 기본값 (.env의 BENCH_DB_NAME, 매번 테이블을 새로 만듦)
+LIST_PAGE_SIZE = 20
+LIST_PATH = "/NewsList/0701?page={page}"
+
+# 합성 기사에 쓰는 상장사 샘플 (종목코드, 기업명, 시장, 업종명, 업종_ID)
+SAMPLE_COMPANIES = [
+    ("005930", "삼성전자", "코스피", "반도체", 1),
+    ("000660", "SK하이닉스", "코스피", "반도체", 1),
+    ("035420", "NAVER", "코스피", "인터넷", 2),
+    ("035720", "카카오", "코스피", "인터넷", 2),
+    ("005380", "현대차", "코스피", "자동차", 3),
+    ("000270", "기아", "코스피", "자동차", 3),
+    ("051910", "LG화학", "코스피", "화학", 4),
+    ("006400", "삼성SDI", "코스피", "2차전지", 5),
+    ("068270", "셀트리온", "코스피", "바이오", 6),
+    ("207940", "삼성바이오로직스", "코스피", "바이오", 6),
+    ("352820", "하이브", "코스피", "엔터테인먼트", 7),
+    ("247540", "에코프로비엠", "코스닥", "2차전지", 5),
+    ("086520", "에코프로", "코스닥", "2차전지", 5),
+    ("293490", "카카오게임즈", "코스닥", "게임", 8),
+    ("263750", "펄어비스", "코스닥", "게임", 8),
+    ("028300", "HLB", "코스닥", "바이오", 6),
+    ("196170", "알테오젠", "코스닥", "바이오", 6),
+    ("041510", "에스엠", "코스닥", "엔터테인먼트", 7),
+    ("035900", "JYP Ent.", "코스닥", "엔터테인먼트", 7),
+    ("112040", "위메이드", "코스닥", "게임", 8),
+]
+
+# 매칭 오탐 확인용: 흔한 낱말과 같은 기업명 / 목록에 없는 더 긴 이름의 앞부분인 기업명 (bench match에서만 씀)
+TRAP_COMPANIES = [
+    ("001680", "대상", "코스피", "식품", 9),
+    ("053620", "태양", "코스닥", "기계", 10),
+    ("004170", "신세계", "코스피", "유통", 11),
+    ("003550", "LG", "코스피", "지주", 12),
+    ("000880", "한화", "코스피", "지주", 12),
+]
+# 위 기업이 나오지 않는 문장 (정답 종목 없음)
+TRAP_SENTENCES = [
+    "이번 분기 투자 대상으로 꼽혔다.",
+    "태양광 업황 회복 기대감이 커졌다.",
+    "신세계인터내셔날이 패션 부문 호조로 강세를 보였다.",
+    "LG에너지솔루션은 북미 공장 증설 계획을 밝혔다.",
+    "한화에어로스페이스가 방산 수출 기대에 올랐다.",
+    "감독 대상에는 중소형 증권사도 포함됐다.",
+]
+
+FILLER = [
+    "증권가에서는 실적 개선 기대감이 이어지고 있다는 분석이 나왔다.",
+    "외국인과 기관의 순매수가 이어지며 지수 상승을 이끌었다.",
+    "업계에서는 하반기 수요 회복이 본격화될 것으로 보고 있다.",
+    "전문가들은 단기 변동성 확대에 유의해야 한다고 조언했다.",
+    "회사 측은 신규 사업 투자를 확대할 계획이라고 밝혔다.",
+]
+
+
+# 합성 본문용 단어 (기사마다 다른 문장을 만들어 거의 같은 기사로 잘못 묶이지 않도록 함)
+_SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초코토포호구누두루무부수우주"
+_word_rng = random.Random(7)
+WORDS = ["".join(_word_rng.choice(_SYLLABLES) for _ in range(_word_rng.randint(2, 4))) for _ in range(3000)]
+
+
+def _sentence(rng, n_words=None):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words or rng.randint(8, 15))) + "다."
+
+
+# 벤치마크용 상장법인목록 (load_stock_data와 같은 모양)
+def sample_stock_data(companies=SAMPLE_COMPANIES):
+    from stock_master import Company
+
+    return {row[0]: Company(*row) for row in companies}
+
+
+def _article_html(rng, title, companies, date_text):
+    # 본문 밖(메뉴, 광고, 관련기사)에도 6자리 숫자와 기업명이 섞여 있도록 구성
+    noise_companies = rng.sample(SAMPLE_COMPANIES, 3)
+    related = "".join(f"<li><a href='/News/Read?newsId={rng.randint(10**16, 10**17 - 1)}'>"
+                      f"{name}({code}) 관련 뉴스</a></li>" for code, name, *_ in noise_companies)
+    paragraphs = []
+    for code, name, *_ in companies:
+        # 절반은 기업명만 쓰고 종목코드는 쓰지 않음
+        mention = f"{name}({code})" if rng.random() < 0.5 else name
+        paragraphs.append(f"<p>{mention}는 {rng.choice(FILLER)} {_sentence(rng)}</p>")
+    paragraphs.append(f"<p>{' '.join(_sentence(rng) for _ in range(6))}</p>")
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>{title}</title>
+<script>var adSlot = "{rng.randint(100000, 999999)}";</script></head>
+<body>
+<header><nav><a href="/">이데일리</a> <a href="/NewsList/0701">증권</a> 고객센터 {rng.randint(100000, 999999)}</nav></header>
+<div class="news_titles"><h1>{title}</h1><span class="date">{date_text}</span></div>
+<div class="news_body" itemprop="articleBody">
+{''.join(paragraphs)}
+</div>
+<aside class="ad">광고문의 {rng.randint(100000, 999999)}</aside>
+<div class="related"><ul>{related}</ul></div>
+<footer>사업자번호 {rng.randint(100000, 999999)} 이데일리</footer>
+</body></html>
+"""
+
+
+def _list_items_html(entries):
+    return "".join(
+        f"<li><a href='{entry['path']}'><p class='tit'>{entry['title']}</p></a>"
+        f"<span class='data_info'><span>{entry['date']}</span><span>이데일리</span></span></li>"
+        for entry in entries)
+
+
+def _list_html(entries):
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>증권 - 이데일리</title></head>
+<body>
+<header><nav><a href="/">이데일리</a></nav></header>
+<div class="grid-nm id_thum_stock_news">
+<ul class="targetAdd">{_list_items_html(entries)}</ul>
+<button class="btn_page_more_con">더보기</button>
+</div>
+</body></html>
+"""
+
+
+# 합성 edaily 기사 페이지 생성 (정답 종목코드를 manifest에 기록)
+def make_fixtures(directory, n_articles=300, target_date=None, seed=42):
+    rng = random.Random(seed)
+    target_date = target_date or (time.time() - 86400)
+    date_str = time.strftime("%Y-%m-%d", time.localtime(target_date))
+    os.makedirs(directory, exist_ok=True)
+
+    articles = []
+    for i in range(n_articles):
+        news_id = f"{i + 1:017d}"
+        companies = rng.sample(SAMPLE_COMPANIES, rng.randint(1, 3))
+        title = f"[특징주] {companies[0][1]}, {rng.choice(['강세', '약세', '급등', '보합'])} {i + 1}"
+        minute = n_articles - i
+        date_text = f"{date_str} {minute // 60 % 24:02d}:{minute % 60:02d}"
+        file_name = f"article_{i + 1:05d}.html"
+        with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+            f.write(_article_html(rng, title, companies, date_text))
+        articles.append({
+            "path": f"/News/Read?newsId={news_id}&mediaCodeNo=257",
+            "file": file_name,
+            "date": date_text,
+            "title": title,
+            "codes": sorted(code for code, *_ in companies),
+        })
+
+    # 목록 페이지: 최신순, 마지막 페이지 끝에는 target_date 이전 기사를 붙여 수집이 멈추도록 함
+    old_date = time.strftime("%Y-%m-%d", time.localtime(target_date - 86400))
+    old_entries = [{"path": f"/News/Read?newsId=9{i:016d}&mediaCodeNo=257", "title": f"지난 기사 {i}",
+                    "date": f"{old_date} 23:{59 - i:02d}"} for i in range(LIST_PAGE_SIZE)]
+    entries = articles + old_entries
+    lists = []
+    for page, offset in enumerate(range(0, len(entries), LIST_PAGE_SIZE), start=1):
+        file_name = f"list_{page:04d}.html"
+        with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+            f.write(_list_html(entries[offset:offset + LIST_PAGE_SIZE]))
+        lists.append({"path": LIST_PATH.format(page=page), "file": file_name})
+
+    manifest = {"articles": articles, "lists": lists}
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    return manifest
+
+
+def load_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 녹화 페이지를 경로 그대로 돌려주는 로컬 edaily 대역 서버
+class FixtureServer:
+    def __init__(self, directory, latency=0.0):
+        manifest = load_manifest(directory)
+        self.routes = {entry["path"]: os.path.join(directory, entry["file"])
+                       for key in ("articles", "lists") for entry in manifest.get(key, [])}
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive 허용
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                file_path = server.routes.get(self.path)
+                if file_path is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                with open(file_path, "rb") as f:
+                    body = f.read()
+                # 조건부 요청 확인용 ETag (내용이 같으면 304)
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    with server.lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# 실제 edaily 페이지를 받아서 fixture로 저장
+def record_fixtures(directory, urls):
+    os.makedirs(directory, exist_ok=True)
+    articles = []
+    with requests.Session() as session:
+        for i, url in enumerate(urls):
+            response = session.get(url, timeout=10)
+            response.raise_for_status()
+            file_name = f"article_{i + 1:05d}.html"
+            with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+                f.write(response.text)
+            parsed = urlparse(url)
+            path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+            articles.append({"path": path, "file": file_name, "date": time.strftime("%Y-%m-%d %H:%M")})
+            print(f"[INFO] 저장: {url}")
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump({"articles": articles}, f, ensure_ascii=False, indent=1)
+
+
+# fixture 디렉터리 준비 (없으면 임시 디렉터리에 합성)
+def prepare_fixtures(args):
+    if args.fixtures:
+        return args.fixtures, None
+    directory = tempfile.mkdtemp(prefix="news_fixtures_")
+    make_fixtures(directory, n_articles=args.articles)
+    return directory, directory
+
+
+def bench_fetch(args):
+    import sql
+
+    directory, temp_dir = prepare_fixtures(args)
+    try:
+        manifest = load_manifest(directory)
+        with FixtureServer(directory, latency=args.latency) as server:
+            news_links = [(server.url + entry["path"], entry["date"]) for entry in manifest["articles"]]
+            for workers in args.workers:
+                limiter = sql.HostLimiter(per_host=max(workers, 1), delay=0.0)
+                session = sql.create_session(workers)
+                start = time.perf_counter()
+                count = sum(1 for _ in sql.fetch_articles(news_links, session, workers, limiter))
+                elapsed = time.perf_counter() - start
+                session.close()
+                print(f"[BENCH] fetch workers={workers:<3} {count}개 {elapsed:.2f}초 "
+                      f"{count / elapsed:.1f} articles/sec")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# 목록 페이지 수집: 페이지별 HTTP 요청 vs 누적 페이지 재파싱(기존 selenium 방식의 파싱 비용)
+def bench_links(args):
+    import sql
+
+    directory, temp_dir = prepare_fixtures(args)
+    try:
+        manifest = load_manifest(directory)
+        target_date = datetime.datetime.strptime(manifest["articles"][0]["date"].split(" ")[0], "%Y-%m-%d")
+        with FixtureServer(directory, latency=args.latency) as server:
+            sql.BASE_URL = server.url
+            start = time.perf_counter()
+            news_links, _ = sql.fetch_news_links_http(server.url + LIST_PATH, target_date, set())
+            elapsed = time.perf_counter() - start
+            pages = server.requests
+        print(f"[BENCH] links http: {len(news_links)}개 링크, {pages}페이지, {elapsed:.3f}초 "
+              f"({pages / elapsed:.1f} pages/sec)")
+
+        # 누적 방식: '더보기'를 누를 때마다 지금까지의 전체 목록을 다시 파싱
+        pages_html = []
+        for entry in manifest["lists"]:
+            with open(os.path.join(directory, entry["file"]), encoding="utf-8") as f:
+                pages_html.append(f.read())
+        start = time.perf_counter()
+        for page in range(1, len(pages_html) + 1):
+            fragments = "".join(html.split('<ul class="targetAdd">')[1].split("</ul>")[0]
+                                for html in pages_html[:page])
+            sql.parse_news_list(_list_html([]).replace('<ul class="targetAdd">', '<ul class="targetAdd">' + fragments))
+        cumulative = time.perf_counter() - start
+        start = time.perf_counter()
+        for html in pages_html:
+            sql.parse_news_list(html)
+        incremental = time.perf_counter() - start
+        print(f"[BENCH] links 파싱: 누적 재파싱 {cumulative:.3f}초 / 페이지별 파싱 {incremental:.3f}초")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _precision_recall(predictions, labels):
+    true_positive = sum(len(pred & label) for pred, label in zip(predictions, labels))
+    predicted = sum(len(pred) for pred in predictions)
+    actual = sum(len(label) for label in labels)
+    return (true_positive / predicted if predicted else 0.0), (true_positive / actual if actual else 0.0)
+
+
+def _read_pages(directory, entries):
+    pages = []
+    for entry in entries:
+        with open(os.path.join(directory, entry["file"]), encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+# 종목 매칭: 기존 정규식(페이지 전체) vs StockMatcher(본문만)
+def bench_match(args):
+    import re
+    from bs4 import BeautifulSoup
+    from news_parser import get_parser
+    from stock_master import read_snapshot
+    from stock_matcher import StockMatcher
+
+    directory, temp_dir = prepare_fixtures(args)
+    try:
+        manifest = load_manifest(directory)
+        stock_data = sample_stock_data()
+        pages = _read_pages(directory, manifest["articles"])
+        page_texts = [BeautifulSoup(html, "html.parser").text for html in pages]
+        parser = get_parser("bs4")
+        bodies = [parser.parse_article(html)[1] for html in pages]
+        labels = [set(entry["codes"]) for entry in manifest["articles"] if "codes" in entry]
+
+        start = time.perf_counter()
+        regex_predictions = [{code for code in set(re.findall(r"\b\d{6}\b", text)) if code in stock_data}
+                             for text in page_texts]
+        regex_time = time.perf_counter() - start
+
+        # 상장법인목록: 샘플 + 오탐 확인용 기업, --master면 저장된 전체 스냅샷 (sql.py / 대시보드가 만든 파일)
+        master = dict(stock_data)
+        master.update(sample_stock_data(TRAP_COMPANIES))
+        if args.master:
+            snapshot = read_snapshot(args.master)
+            if snapshot is None:
+                raise SystemExit(f"[ERROR] 상장법인목록 스냅샷을 읽을 수 없습니다: {args.master}")
+            master.update(snapshot[1])
+
+        # 본문 끝에 오탐을 부르는 문장을 섞은 본문 (정답은 그대로)
+        rng = random.Random(3)
+        trap_bodies = [f"{body} {' '.join(rng.sample(TRAP_SENTENCES, 2))}" for body in bodies]
+
+        start = time.perf_counter()
+        matcher = StockMatcher(master)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        matcher_predictions = [matcher.find_codes(body) for body in bodies]
+        matcher_time = time.perf_counter() - start
+        loose = StockMatcher(master, stop_names=(), particles=None)  # 조사 / 흔한 낱말 검사 전 규칙
+
+        for name, predictions, elapsed in (("regex(전체)", regex_predictions, regex_time),
+                                           ("matcher(본문)", matcher_predictions, matcher_time)):
+            line = f"[BENCH] match {name:<12} {len(pages) / elapsed:8.1f} docs/sec"
+            if len(labels) == len(pages):
+                precision, recall = _precision_recall(predictions, labels)
+                line += f"  precision={precision:.3f} recall={recall:.3f}"
+            print(line)
+        if len(labels) == len(pages):
+            for name, candidate in (("이전 규칙", loose), ("조사 + 흔한 낱말", matcher)):
+                precision, recall = _precision_recall([candidate.find_codes(body) for body in trap_bodies], labels)
+                print(f"[BENCH] match 오탐 문장 섞은 본문 {name:<14} precision={precision:.3f} recall={recall:.3f}")
+        print(f"[BENCH] matcher 생성 {build_time * 1000:.1f}ms (상장사 {len(master)}개)")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# HTML 파서 백엔드별 속도 + bs4 결과와 같은지 확인
+def bench_parse(args):
+    from news_parser import get_parser, available_parsers
+
+    directory, temp_dir = prepare_fixtures(args)
+    try:
+        manifest = load_manifest(directory)
+        list_pages = _read_pages(directory, manifest.get("lists", []))
+        article_pages = _read_pages(directory, manifest["articles"])
+
+        reference = get_parser("bs4")
+        expected_lists = [reference.parse_list(html) for html in list_pages]
+        expected_articles = [reference.parse_article(html) for html in article_pages]
+
+        for name in available_parsers():
+            parser = get_parser(name)
+            start = time.perf_counter()
+            lists = [parser.parse_list(html) for html in list_pages]
+            list_time = time.perf_counter() - start
+            start = time.perf_counter()
+            articles = [parser.parse_article(html) for html in article_pages]
+            article_time = time.perf_counter() - start
+
+            mismatches = sum(a != b for a, b in zip(lists, expected_lists))
+            mismatches += sum(a != b for a, b in zip(articles, expected_articles))
+            list_rate = len(list_pages) / list_time if list_time > 0 else 0.0
+            print(f"[BENCH] parse {name:<10} 목록 {list_rate:8.1f} pages/sec  "
+                  f"기사 {len(article_pages) / article_time:8.1f} pages/sec  bs4와 다른 결과 {mismatches}건")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# 파싱 단계 확장성: 워커 프로세스 1~N개 (결과가 워커 1개와 같은지도 확인)
+# 기사 캐시: 처음 받기 / 캐시 적중 / 오래된 캐시 조건부 요청(304) / 오프라인 재처리
+def bench_cache(args):
+    import sql
+    from article_cache import ArticleCache
+
+    directory, temp_dir = prepare_fixtures(args)
+    cache_dir = tempfile.mkdtemp(prefix="news_cache_")
+    try:
+        manifest = load_manifest(directory)
+        with FixtureServer(directory, latency=args.latency) as server:
+            news_links = [(server.url + entry["path"], entry["date"]) for entry in manifest["articles"]]
+            cache = ArticleCache(cache_dir, args.max_mb * 1024 * 1024)
+            limiter = sql.HostLimiter(per_host=8, delay=0.0)
+            session = sql.create_session(8)
+
+            def run(label, refresh, offline=False):
+                sql.ARTICLE_CACHE_REFRESH = refresh
+                requests_before = server.requests
+                not_modified_before = server.not_modified
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    pages = list(executor.map(
+                        lambda item: sql.fetch_article(session, limiter, item[0], cache, item[1], offline),
+                        news_links))
+                elapsed = time.perf_counter() - start
+                print(f"[BENCH] cache {label:<10} {len(pages)}개 {elapsed:.2f}초 "
+                      f"{len(pages) / elapsed:8.1f} articles/sec  요청 {server.requests - requests_before}회 "
+                      f"(304 {server.not_modified - not_modified_before}회)")
+
+            run("처음", 0)
+            run("캐시 적중", 3600)
+            run("조건부 요청", 0)
+            run("오프라인", 0, offline=True)
+            session.close()
+            cache.print_summary()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# 벤치마크 전용 스키마에 연결 (DB_HOST/DB_USER/DB_PASSWORD 사용, 스키마가 없으면 만듦)
+def connect_bench_db():
+    import pymysql
+    import sql
+
+    db_name = os.getenv("BENCH_DB_NAME", BENCH_DB_NAME)
+    conn = pymysql.connect(host=os.getenv("DB_HOST"), user=os.getenv("DB_USER"),
+                           password=os.getenv("DB_PASSWORD"), charset='utf8')
+    with conn.cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{db_name}` CHARACTER SET utf8mb4")
+    conn.select_db(db_name)
+    with conn.cursor() as cursor:
+        for table in ("기업별_뉴스언급", "뉴스기사", "기업별_일간집계", "업종별_일간집계", "크롤링_체크포인트",
+                      "데이터_버전", "상장법인목록_업종세분화", "type_name"):
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        sql.create_table(cursor)
+    return conn
+
+
+# 합성 상장사 [(종목코드, 기업명, 시장, 업종명, 업종_ID), ...]
+def synthetic_companies(n_companies, rng):
+    return [(f"{i:06d}", f"회사{i}", rng.choice(["코스피", "코스닥"]), f"업종{i % 60}", i % 60)
+            for i in range(1, n_companies + 1)]
+
+
+# 상장법인목록 원본 테이블 (수집 / 대시보드가 읽는 두 테이블을 벤치마크 스키마에 만들어서 채움)
+def fill_companies(conn, companies):
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE TABLE IF NOT EXISTS type_name (type_ID INT PRIMARY KEY, type_name VARCHAR(255) NOT NULL)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 상장법인목록_업종세분화 (
+                code VARCHAR(6) NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL, market VARCHAR(10), type_ID INT
+            )
+        """)
+        cursor.executemany("INSERT INTO type_name (type_ID, type_name) VALUES (%s, %s)",
+                           sorted({(type_ID, type_name) for _, _, _, type_name, type_ID in companies}))
+        cursor.executemany("INSERT INTO 상장법인목록_업종세분화 (code, name, market, type_ID) VALUES (%s, %s, %s, %s)",
+                           [(code, name, market, type_ID) for code, name, market, _, type_ID in companies])
+    conn.commit()
+
+
+# days일 분량(오늘까지)의 합성 기사/종목 언급을 바로 INSERT (종목 인기도는 한쪽으로 치우치게)
+def fill_history(conn, days, per_day, n_companies=2000, seed=42):
+    import sql
+
+    rng = random.Random(seed)
+    companies = synthetic_companies(n_companies, rng)
+    fill_companies(conn, companies)
+    weights = [1.0 / rank for rank in range(1, n_companies + 1)]
+    end = datetime.date.today()
+    day = end - datetime.timedelta(days=days - 1)
+    articles, mentions = [], []
+    total_articles = total_mentions = 0
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        def flush():
+            cursor.executemany(sql.UPSERT_ARTICLE_QUERY, articles)
+            cursor.executemany(sql.INSERT_MENTION_QUERY, mentions)
+            conn.commit()
+            articles.clear()
+            mentions.clear()
+
+        while day <= end:
+            date_str = day.isoformat()
+            for n in range(per_day):
+                link = f"https://m.edaily.co.kr/News/Read?newsId={date_str.replace('-', '')}{n:08d}&mediaCodeNo=257"
+                link_hash = sql.url_hash(link)
+                picked = {company[0]: company for company in rng.choices(companies, weights, k=rng.randint(1, 3))}
+                articles.append((link_hash, date_str, link, f"[특징주] 합성 기사 {date_str} {n}", None, None))
+                for code, name, market, type_name, type_ID in picked.values():
+                    mentions.append((code, link_hash, date_str, name, market, type_name, type_ID))
+                total_articles += 1
+                total_mentions += len(picked)
+            if len(articles) >= 5000:
+                flush()
+            day += datetime.timedelta(days=1)
+        flush()
+        sql.rebuild_rollups(cursor, conn)
+    print(f"[BENCH] 합성 데이터: {days}일, 종목 {n_companies}개, 기사 {total_articles}개, 종목 언급 {total_mentions}개 "
+          f"({time.perf_counter() - start:.1f}초)")
+    return end
+
+
+def _measure(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"[BENCH] queries {label:<28} {elapsed * 1000:9.1f}ms  최대 메모리 {peak / 1024 / 1024:8.2f}MB")
+    return result
+
+
+# 대시보드 첫 화면: 전체 집계를 DataFrame으로 받아 pandas로 거르기(기존) vs 날짜/TOP 10만 SQL로 받기
+def bench_queries(args):
+    import pandas as pd
+    import news_queries
+
+    conn = connect_bench_db()
+    try:
+        latest = fill_history(conn, 365 * args.years, args.per_day)
+        missing = latest + datetime.timedelta(days=1)  # 데이터가 없어 최근 날짜로 넘어가는 경우
+
+        for selected in (latest, missing):
+            print(f"[BENCH] queries 선택 날짜 {selected}")
+
+            def before():
+                df = pd.read_sql("SELECT 날짜, 기업명, 종목코드, 시장, 업종, 나온횟수 FROM 기업별_뉴스횟수", conn)
+                df['날짜'] = pd.to_datetime(df['날짜']).dt.date
+                filtered = df[df['날짜'] == selected]
+                if filtered.empty:
+                    filtered = df[df['날짜'] == df['날짜'].max()]
+                return filtered.groupby('기업명')['나온횟수'].sum().sort_values(ascending=False)[:10]
+
+            def after():
+                display_date = news_queries.resolve_date(conn, selected)
+                return news_queries.load_top10(conn, display_date, '기업명')
+
+            old_top10 = _measure("기존 (전체 로드 + pandas)", before)
+            new_top10 = _measure("쿼리 (날짜 + LIMIT 10)", after)
+            same = list(old_top10.values) == list(new_top10['나온횟수'])
+            print(f"[BENCH] queries TOP 10 나온횟수 {'같음' if same else '다름!'}")
+
+        top_company = new_top10['기업명'].iloc[0]
+        news_df = _measure("상세 페이지 (링크/제목)",
+                           lambda: news_queries.load_news_articles(conn, latest, '기업명', top_company))
+        company_code = news_df['종목코드'].iloc[0]
+        _measure("상세 페이지 (날짜별 횟수)", lambda: news_queries.load_news_counts(conn, company_code))
+    finally:
+        conn.close()
+
+
+# MySQL 대역 연결: 연결할 때(TCP + 인증)와 쿼리마다 지연만 흉내 냄
+class StandInConnection:
+    def __init__(self, connect_latency, query_latency):
+        time.sleep(connect_latency)
+        self.query_latency = query_latency
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError("연결이 끊겼습니다.")
+
+    def query(self):
+        if not self.alive:
+            raise ConnectionError("연결이 끊겼습니다.")
+        time.sleep(self.query_latency)
+
+    def close(self):
+        self.alive = False
+
+
+# 연결 풀: 세션 여러 개가 동시에 쿼리를 보낼 때 매번 연결 vs 풀에서 빌리기
+def bench_pool(args):
+    from db_pool import ConnectionPool
+
+    if args.mysql:
+        import sql
+
+        def connect():
+            return sql.connect_to_db()
+
+        def run_query(conn):
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+    else:
+        def connect():
+            return StandInConnection(args.connect_latency, args.query_latency)
+
+        def run_query(conn):
+            conn.query()
+
+    def simulate(label, session_queries):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+            list(executor.map(lambda _: session_queries(), range(args.sessions)))
+        elapsed = time.perf_counter() - start
+        total = args.sessions * args.queries
+        print(f"[BENCH] pool {label:<10} 세션 {args.sessions}개 x 쿼리 {args.queries}개: "
+              f"{elapsed:.2f}초 {total / elapsed:8.1f} queries/sec")
+
+    def without_pool():
+        for _ in range(args.queries):
+            conn = connect()
+            run_query(conn)
+            conn.close()
+
+    pool = ConnectionPool(connect, max_size=args.pool_size, check_interval=0 if not args.mysql else 30)
+
+    def with_pool():
+        for n in range(args.queries):
+            with pool.connection() as conn:
+                # 대역 연결은 가끔 끊긴 것으로 만들어서 다시 연결되는지 확인
+                if not args.mysql and args.drop_every and n % args.drop_every == args.drop_every - 1:
+                    conn.alive = False
+                    continue
+                run_query(conn)
+
+    simulate("매번 연결", without_pool)
+    simulate("연결 풀", with_pool)
+    stats = pool.stats()
+    pool.close()
+    print(f"[BENCH] pool 통계: {json.dumps(stats, ensure_ascii=False)}")
+    if stats["created"] > args.pool_size:
+        print("[BENCH] pool 최대 연결 수를 넘었습니다!")
+
+
+# DB 왕복 수와 executemany로 보낸 행 수를 세는 연결 래퍼 (MySQL 연결과 대역을 같은 방식으로 셈)
+# executemany는 pymysql처럼 INSERT ... VALUES 문이면 한 번, 아니면 행마다 한 번으로 셈
+class CountingConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.round_trips = 0
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def count(self, round_trips, rows=0):
+        with self.lock:
+            self.round_trips += round_trips
+            self.rows += rows
+
+    def cursor(self):
+        return CountingCursor(self, self.conn.cursor())
+
+    def commit(self):
+        self.count(1)
+        self.conn.commit()
+
+    def rollback(self):
+        self.count(1)
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+
+class CountingCursor:
+    def __init__(self, connection, cursor):
+        self.connection = connection
+        self.cursor = cursor
+
+    def execute(self, query, args=None):
+        self.connection.count(1)
+        return self.cursor.execute(query, args)
+
+    def executemany(self, query, args):
+        from pymysql.cursors import RE_INSERT_VALUES
+
+        args = list(args)
+        if args:
+            self.connection.count(1 if RE_INSERT_VALUES.match(query) else len(args), len(args))
+        return self.cursor.executemany(query, args)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+# 내장 MySQL 대역: 문장을 받기만 하고 왕복마다 지연을 흉내 냄 (SELECT 결과는 항상 비어 있음 = 빈 스키마)
+# executemany는 자리표시자 수와 행 길이가 맞는지만 확인
+class StandInDB:
+    def __init__(self, latency=0.002):
+        self.latency = latency
+
+    def cursor(self):
+        return StandInCursor(self)
+
+    def commit(self):
+        time.sleep(self.latency)
+
+    def rollback(self):
+        time.sleep(self.latency)
+
+    def close(self):
+        pass
+
+
+class StandInCursor:
+    def __init__(self, db):
+        self.db = db
+        self.connection = db
+        self.rowcount = 0
+
+    def execute(self, query, args=None):
+        time.sleep(self.db.latency)
+        self.rowcount = 0
+
+    def executemany(self, query, args):
+        from pymysql.cursors import RE_INSERT_VALUES
+
+        args = list(args)
+        for row in args:
+            if len(row) != query.count("%s"):
+                raise ValueError(f"자리표시자 {query.count('%s')}개, 값 {len(row)}개: {query.strip()[:60]}")
+        time.sleep(self.db.latency * (1 if RE_INSERT_VALUES.match(query) else len(args)))
+        self.rowcount = len(args)
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return ()
+
+    def close(self):
+        pass
+
+
+# 상장법인목록 대역: JOIN은 pymysql처럼 행마다 새 문자열로 만든 행을 돌려주고, CHECKSUM TABLE은 고정 값
+class MasterStandIn:
+    def __init__(self, companies, latency=0.002):
+        self.payload = json.dumps(companies, ensure_ascii=False)
+        self.latency = latency
+
+    def cursor(self):
+        return MasterStandInCursor(self)
+
+
+class MasterStandInCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def execute(self, query, args=None):
+        import stock_master
+
+        time.sleep(self.db.latency)
+        if query.startswith("CHECKSUM TABLE"):
+            self.rows = [(table, 1) for table in stock_master.SOURCE_TABLES]
+        else:
+            self.rows = [tuple(row) for row in json.loads(self.db.payload)]
+
+    def fetchall(self):
+        return self.rows
+
+
+# 예전 load_stock_data (종목코드 -> dict)
+def _legacy_stock_data(rows):
+    return {str(row[0]).strip().zfill(6): {
+        'name': row[1].strip(),
+        'market': row[2].strip() if row[2] else "기타",
+        'type_name': row[3].strip(),
+        'type_ID': row[4]
+    } for row in rows}
+
+
+def _legacy_ticker(code, info):
+    if info['market'] == '코스피':
+        return f"{code}.KS"
+    if info['market'] == '코스닥':
+        return f"{code}.KQ"
+    return None
+
+
+# 가장 빠른 시간(repeat번 중)과 한 번 더 실행했을 때 결과가 들고 있는 메모리 / 최대 메모리
+def _master_measure(label, func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"[BENCH] master {label:<30} {min(times) * 1000:8.2f}ms  보관 {current / 1024 / 1024:6.2f}MB  "
+          f"최대 {peak / 1024 / 1024:6.2f}MB")
+    return result
+
+
+# 상장법인목록: 예전 dict-of-dicts vs Company 스냅샷 (읽는 시간, 들고 있는 메모리, 티커 조회)
+def bench_master(args):
+    import stock_master
+
+    companies = synthetic_companies(args.companies, random.Random(42))
+    conn = connect_bench_db() if args.mysql else MasterStandIn(companies, args.db_latency)
+    if args.mysql:
+        fill_companies(conn, companies)
+    temp_dir = tempfile.mkdtemp(prefix="news_gazer_master_")
+    path = os.path.join(temp_dir, "stock_master.json")
+    try:
+        print(f"[BENCH] master 상장사 {len(companies)}개 ({'MySQL' if args.mysql else f'대역, 왕복 {args.db_latency * 1000:g}ms'})")
+
+        def legacy():
+            with conn.cursor() as cursor:
+                cursor.execute(stock_master.QUERY)
+                return _legacy_stock_data(cursor.fetchall())
+
+        def cold():
+            if os.path.exists(path):
+                os.remove(path)
+            return stock_master.StockMaster(path).load(conn)
+
+        master = stock_master.StockMaster(path)
+        master.load(conn)
+
+        def unchanged():
+            master.checked_at = None
+            return master.load(conn)
+
+        legacy_data = _master_measure("기존 (JOIN + dict)", legacy, args.repeat)
+        _master_measure("스냅샷 없음 (체크섬 + JOIN + 저장)", cold, args.repeat)
+        loaded = _master_measure("새 프로세스 (체크섬 + 파일)", lambda: stock_master.StockMaster(path).load(conn),
+                                 args.repeat)
+        _master_measure("안 바뀜 (체크섬만)", unchanged, args.repeat)
+        print(f"[BENCH] master 스냅샷 파일 {os.path.getsize(path) / 1024:.1f}KB")
+
+        codes = list(legacy_data) * max(1, args.lookups // len(legacy_data))
+        start = time.perf_counter()
+        legacy_tickers = [_legacy_ticker(code, legacy_data[code]) for code in codes]
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        tickers = [loaded[code].ticker for code in codes]
+        snapshot_time = time.perf_counter() - start
+        print(f"[BENCH] master 티커 조회 {len(codes)}회: 시장으로 만들기 {legacy_time / len(codes) * 1e9:.0f}ns/회, "
+              f"만들어 둔 값 {snapshot_time / len(codes) * 1e9:.0f}ns/회 (결과 일치: {legacy_tickers == tickers})")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if args.mysql:
+            conn.close()
+
+
+# 최대 RSS(MB): (이 프로세스, 끝난 자식 프로세스 중 가장 큰 것), 잴 수 없으면 (None, None)
+def peak_rss_mb():
+    if resource is None:
+        return None, None
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024  # macOS는 바이트, Linux는 KB
+    return tuple(round(resource.getrusage(who).ru_maxrss / unit, 1)
+                 for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+
+
+# 지금 커밋 (바뀐 파일이 있으면 -dirty), git이 없으면 unknown
+def git_commit():
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+# 수집 전체: 로컬 서버의 목록/기사 페이지 -> 링크 수집 -> 기사 수집 -> 파싱/매칭 -> DB 저장 (sql.crawl_sources)
+# 결과는 JSON으로 저장해서 커밋 사이에 bench.py compare로 비교
+def bench_ingest(args):
+    import metrics
+    import sql
+
+    if args.metrics:
+        metrics.configure(args.metrics)
+    directory, temp_dir = prepare_fixtures(args)
+    conn = None
+    try:
+        manifest = load_manifest(directory)
+        if not manifest.get("lists"):
+            print("[ERROR] fixture에 목록 페이지가 없습니다. 합성 fixture(bench.py fixtures)를 쓰거나 목록 페이지를 추가하세요.")
+            return
+        articles = manifest["articles"]
+        target_date = datetime.datetime.strptime(articles[0]["date"].split(" ")[0], "%Y-%m-%d")
+        stock_data = sample_stock_data()
+        conn = CountingConnection(connect_bench_db() if args.mysql else StandInDB(args.db_latency))
+        cursor = conn.cursor()
+        limiter = sql.HostLimiter(per_host=args.per_host, delay=args.delay)
+
+        with FixtureServer(directory, latency=args.latency) as server:
+            sql.BASE_URL = server.url
+            source = sql.default_source(server.url + LIST_PATH)
+            start = time.perf_counter()
+            processed = sql.crawl_sources(stock_data, cursor, conn, [source], target_date,
+                                          fetch_workers=args.workers, parse_workers=args.parse_workers,
+                                          limiter=limiter)
+            elapsed = time.perf_counter() - start
+            pages = server.requests
+        if processed != len(articles):
+            print(f"[WARNING] 기사 {len(articles)}개 중 {processed}개만 저장했습니다.")
+
+        peak_rss, peak_rss_children = peak_rss_mb()
+        results = {
+            "elapsed_sec": round(elapsed, 3),
+            "pages": pages,
+            "pages_per_sec": round(pages / elapsed, 1),
+            "articles": processed,
+            "articles_per_sec": round(processed / elapsed, 1),
+            "db_round_trips": conn.round_trips,
+            "db_round_trips_per_article": round(conn.round_trips / processed, 3) if processed else None,
+            "db_rows": conn.rows,
+            "db_rows_per_sec": round(conn.rows / elapsed, 1),
+            "peak_rss_mb": peak_rss,
+            "peak_rss_children_mb": peak_rss_children,
+        }
+        report = {
+            "benchmark": "ingest",
+            "commit": git_commit(),
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "options": {
+                "fixtures": args.fixtures or f"synthetic:{args.articles}",
+                "db": "mysql" if args.mysql else f"stand-in:{args.db_latency}",
+                "latency": args.latency,
+                "workers": args.workers,
+                "parse_workers": args.parse_workers,
+                "per_host": args.per_host,
+                "delay": args.delay,
+                "html_parser": sql.HTML_PARSER,
+                "near_dup_threshold": sql.NEAR_DUP_THRESHOLD,
+                "batch_size": sql.DB_BATCH_SIZE,
+                "metrics": metrics.enabled(),
+            },
+            "results": results,
+        }
+        output = args.output or os.path.join(RESULTS_DIR, f"ingest_{report['commit']}.json")
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+
+        for key, value in results.items():
+            print(f"[BENCH] ingest {key:<28} {value}")
+        print(f"[BENCH] ingest 결과 저장: {output}")
+    finally:
+        if conn is not None:
+            conn.close()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# 계측 비용: 꺼져 있을 때 / 켜져 있을 때 span / inc 한 번에 드는 시간 (빈 루프 시간은 뺌)
+def bench_metrics(args):
+    import metrics
+
+    temp_dir = tempfile.mkdtemp(prefix="news_metrics_")
+    try:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            pass
+        loop_cost = (time.perf_counter() - start) / args.repeat
+        for label, directory in (("꺼짐", ""), ("켜짐", temp_dir)):
+            metrics.configure(directory)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                with metrics.span("bench", stage="parse"):
+                    pass
+            span_cost = (time.perf_counter() - start) / args.repeat - loop_cost
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                metrics.inc("bench", stage="parse")
+            inc_cost = (time.perf_counter() - start) / args.repeat - loop_cost
+            print(f"[BENCH] metrics {label}  span {span_cost * 1e9:8.0f}ns  inc {inc_cost * 1e9:8.0f}ns")
+    finally:
+        metrics.configure("")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# 두 ingest 결과 JSON 비교 (이전 커밋 -> 지금 커밋)
+def bench_compare(args):
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"[BENCH] compare {old.get('commit')} -> {new.get('commit')}")
+    for key in sorted(set(old["options"]) | set(new["options"])):
+        if old["options"].get(key) != new["options"].get(key):
+            print(f"[WARNING] 설정이 다릅니다: {key} {old['options'].get(key)} -> {new['options'].get(key)}")
+    for key, new_value in new["results"].items():
+        old_value = old["results"].get(key)
+        change = ""
+        if isinstance(old_value, (int, float)) and isinstance(new_value, (int, float)) and old_value:
+            change = f"({(new_value - old_value) / old_value * 100:+.1f}%)"
+        print(f"[BENCH] compare {key:<28} {old_value!s:>12} -> {new_value!s:>12} {change}")
+
+
+# 가짜 주가 provider: 날짜 범위의 영업일 랜덤워크 일봉 (한 번 받을 때마다 latency초 지연)
+class FakePriceProvider:
+    def __init__(self, latency=1.0, seed=7):
+        self.latency = latency
+        self.seed = seed
+        self.calls = 0
+        self.rows = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, ticker, start, end):
+        import numpy as np
+        import pandas as pd
+
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        days = pd.bdate_range(start, end)
+        # 날짜마다 값이 정해지도록 (같은 날을 다시 받아도 같은 값)
+        offsets = (days - pd.Timestamp("2003-01-01")).days.to_numpy()
+        rng = np.random.default_rng(self.seed)
+        walk = np.cumsum(rng.normal(0, 1, offsets.max() + 1 if len(offsets) else 1)) + 50000
+        close = walk[offsets] if len(offsets) else np.empty(0)
+        with self.lock:
+            self.rows += len(days)
+        return pd.DataFrame({"open": close - 100, "high": close + 300, "low": close - 300, "close": close,
+                             "volume": np.abs(close) * 10}, index=days)
+
+
+# 주가: 매번 전체 기간 받기(기존 yf.download) vs 로컬 저장소
+def bench_prices(args):
+    import numpy as np
+    from price_store import PriceStore
+
+    store_dir = tempfile.mkdtemp(prefix="news_prices_")
+    try:
+        provider = FakePriceProvider(latency=args.latency)
+        today = datetime.date(2025, 1, 15)  # 영업일 (요일에 따라 결과가 달라지지 않도록 고정)
+
+        start = time.perf_counter()
+        frame = PriceStore.to_frame(PriceStore._to_array(provider("005930.KS", datetime.date(2003, 1, 1), today)))
+        print(f"[BENCH] prices 전체 받기 (기존)     {(time.perf_counter() - start) * 1000:9.1f}ms  {len(frame)}행")
+
+        store = PriceStore(store_dir, provider)
+        yesterday = today - datetime.timedelta(days=1)
+        start = time.perf_counter()
+        store.refresh("005930.KS", yesterday)
+        print(f"[BENCH] prices 저장소 첫 채우기       {(time.perf_counter() - start) * 1000:9.1f}ms")
+
+        # 새 프로세스처럼 저장소 객체를 새로 만들어서 읽기
+        cold_store = PriceStore(store_dir, provider)
+        calls_before = provider.calls
+        start = time.perf_counter()
+        frame = cold_store.get("005930.KS", yesterday)
+        print(f"[BENCH] prices 저장소 콜드 열기       {(time.perf_counter() - start) * 1000:9.1f}ms  {len(frame)}행, "
+              f"provider 호출 {provider.calls - calls_before}회")
+
+        rows_before = provider.rows
+        start = time.perf_counter()
+        added = cold_store.refresh("005930.KS", today)
+        print(f"[BENCH] prices 하루 뒤 새로 고침     {(time.perf_counter() - start) * 1000:9.1f}ms  "
+              f"{added}행 추가, provider에서 {provider.rows - rows_before}행 받음")
+
+        same = np.array_equal(PriceStore._to_array(provider("005930.KS", datetime.date(2003, 1, 1), today)),
+                              np.asarray(cold_store.read("005930.KS")))
+        print(f"[BENCH] prices 전체 받기와 저장소 내용 {'같음' if same else '다름!'}")
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+# 기존 차트 데이터 문자열 생성 (iterrows + f-string, 모든 일봉을 그대로 넣음)
+def _legacy_chart_data(stock_data, news_counts):
+    stock_data = stock_data.copy()
+    stock_data['time'] = stock_data['time'].dt.strftime('%Y-%m-%d')
+    news_counts = news_counts.copy()
+    news_counts['날짜'] = news_counts['날짜'].dt.strftime('%Y-%m-%d')
+    scaled_volume_data = stock_data.copy()
+    scaled_volume_data["Volume"] = scaled_volume_data["Volume"] / 1000
+    candle = ",".join(
+        f"{{ time: '{row['time']}', open: {row['open']}, high: {row['high']}, low: {row['low']}, close: {row['close']} }}"
+        for _, row in stock_data.iterrows())
+    volume = ",".join(f"{{ time: '{row['time']}', value: {row['Volume']} }}"
+                      for _, row in scaled_volume_data.iterrows())
+    news = ",".join(f"{{ time: '{row['날짜']}', value: {row['나온횟수']} }}" for _, row in news_counts.iterrows())
+    return candle + volume + news
+
+
+# 상세보기 차트: 기존 iterrows 문자열 vs numpy 컬럼 JSON + 기간/봉 단위 줄이기
+def bench_chart(args):
+    import numpy as np
+    import pandas as pd
+    import news_chart
+    from date_frame import DateFrame
+    from price_store import PriceStore
+
+    provider = FakePriceProvider(latency=0)
+    prices = PriceStore._to_array(provider("005930.KS", datetime.date(2003, 1, 1), datetime.date(2025, 1, 15)))
+    stock_data = PriceStore.to_frame(prices)
+    rng = np.random.default_rng(1)
+    news_days = stock_data['time'][rng.random(len(stock_data)) < 0.6]
+    news_counts = pd.DataFrame({'날짜': news_days.to_numpy(), '나온횟수': rng.integers(1, 30, len(news_days))})
+
+    def measure(label, build):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            payload = build()
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"[BENCH] chart {label:<22} {elapsed * 1000:8.1f}ms  {len(payload.encode('utf-8')) / 1024:8.1f}KB")
+
+    print(f"[BENCH] chart 일봉 {len(stock_data)}개, 뉴스 {len(news_counts)}일")
+    measure("기존 (iterrows)", lambda: _legacy_chart_data(stock_data, news_counts))
+    for range_label in news_chart.RANGES:
+        for resolution in ("D", "auto"):
+            if resolution == "auto" and news_chart.RANGES[range_label] and news_chart.RANGES[range_label] <= 366:
+                continue
+            measure(f"numpy {range_label} {resolution}", lambda: news_chart.series_json(news_chart.build_series(
+                stock_data, news_counts, news_chart.RANGES[range_label], resolution)))
+    # 대시보드처럼 DateFrame(날짜 위치표)을 한 번 만들어 두고 기간만 잘라 쓸 때
+    price_frame = DateFrame.from_records(prices, "time")
+    news_frame = news_chart.news_frame(news_counts)
+    for range_label in news_chart.RANGES:
+        measure(f"위치표 {range_label} D", lambda: news_chart.series_json(news_chart.build_series(
+            price_frame, news_frame, news_chart.RANGES[range_label], "D")))
+
+
+# 기업별 일간 집계 모양의 합성 데이터 (pd.read_sql이 돌려주는 것처럼 날짜는 date 객체, 문자열은 object)
+# 날짜마다 종목 per_day개 (인기 종목일수록 자주, 같은 날 같은 종목은 한 번)
+def synthetic_rollup(days, per_day, n_companies=2000, seed=42):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    companies = synthetic_companies(n_companies, random.Random(seed))
+    weights = 1.0 / np.arange(1, n_companies + 1)
+    weights /= weights.sum()
+    per_day = min(per_day, n_companies)
+    picked = np.concatenate([rng.choice(n_companies, per_day, replace=False, p=weights) for _ in range(days)])
+    end = datetime.date.today()
+    dates = [end - datetime.timedelta(days=days - 1 - i) for i in range(days)]
+    rows = [companies[i] for i in picked]
+    return pd.DataFrame({
+        '날짜': [date for date in dates for _ in range(per_day)],
+        '기업명': [row[1] for row in rows],
+        '종목코드': [row[0] for row in rows],
+        '시장': [row[2] for row in rows],
+        '업종': [row[3] for row in rows],
+        '나온횟수': rng.zipf(2.0, len(rows)).clip(max=500),
+    }), dates
+
+
+# 호출마다 걸린 시간의 중앙값 / 최소
+def _frame_measure(label, calls):
+    times = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    print(f"[BENCH] frame {label:<34} 중앙값 {times[len(times) // 2] * 1000:9.3f}ms  최소 {times[0] * 1000:9.3f}ms  "
+          f"({len(times)}회)")
+
+
+# 대시보드 작업 데이터: object 문자열 + 화면마다 날짜 변환/전체 비교(기존) vs 범주 + datetime64 마스크 vs DateFrame 위치표
+def bench_frame(args):
+    import numpy as np
+    import pandas as pd
+    from date_frame import DateFrame
+
+    start = time.perf_counter()
+    df, dates = synthetic_rollup(365 * args.years, args.per_day)
+    print(f"[BENCH] frame 합성 집계 {len(df)}행 ({len(dates)}일 x {args.per_day}종목, {time.perf_counter() - start:.1f}초)")
+    categorical = ('기업명', '종목코드', '시장', '업종')
+
+    start = time.perf_counter()
+    typed = df.astype({name: 'category' for name in categorical})
+    typed['날짜'] = pd.to_datetime(typed['날짜'])
+    typed_build = time.perf_counter() - start
+    start = time.perf_counter()
+    frame = DateFrame.from_pandas(df, '날짜', categorical=categorical)
+    frame_build = time.perf_counter() - start
+
+    mb = 1024 * 1024
+    print(f"[BENCH] frame 메모리 object DataFrame {df.memory_usage(deep=True).sum() / mb:8.1f}MB")
+    print(f"[BENCH] frame 메모리 범주 + datetime64    {typed.memory_usage(deep=True).sum() / mb:8.1f}MB  "
+          f"(만들기 {typed_build * 1000:.0f}ms, 한 번)")
+    print(f"[BENCH] frame 메모리 DateFrame          {frame.nbytes() / mb:8.1f}MB  "
+          f"(만들기 {frame_build * 1000:.0f}ms, 한 번)")
+
+    rng = random.Random(1)
+    picks = [rng.choice(dates) for _ in range(args.repeat)]
+
+    # 기존 filter_data: 캐시된 DataFrame 전체를 화면마다 날짜로 바꾸고 모든 행을 비교 (복사본에서)
+    def legacy(day):
+        data = df.copy(deep=False)
+        data['날짜'] = pd.to_datetime(data['날짜']).dt.date
+        filtered = data[data['날짜'] == day]
+        return filtered.groupby('기업명')['나온횟수'].sum().sort_values(ascending=False)[:10]
+
+    def masked(day):
+        filtered = typed[typed['날짜'] == pd.Timestamp(day)]
+        return filtered.groupby('기업명', observed=True)['나온횟수'].sum().sort_values(ascending=False)[:10]
+
+    def sliced(day):
+        rows = frame.on(day)
+        counts = np.bincount(rows['기업명'], weights=rows['나온횟수'])
+        top = np.argsort(-counts, kind='stable')[:10]
+        return pd.Series(counts[top].astype(np.int64), index=frame.categories['기업명'][top])
+
+    # 기존 방식은 한 번에 몇 초씩 걸리므로 날짜 몇 개만
+    results = {}
+    for label, func, n in (("기존 (화면마다 to_datetime + 비교)", legacy, 3), ("범주 + datetime64 마스크", masked, len(picks)),
+                           ("DateFrame 위치표 슬라이스", sliced, len(picks))):
+        _frame_measure(f"{label} TOP 10", [lambda day=day: func(day) for day in picks[:n]])
+        results[label] = [[int(value) for value in func(day).values] for day in picks[:3]]
+    same = len({json.dumps(value) for value in results.values()}) == 1
+    print(f"[BENCH] frame TOP 10 나온횟수 {'같음' if same else '다름!'}")
+
+    # 날짜 하나 / 한 달 자르기만 (TOP 10 계산 빼고)
+    months = [(day - datetime.timedelta(days=30), day) for day in picks]
+    _frame_measure("자르기 하루: 마스크", [lambda day=day: typed[typed['날짜'] == pd.Timestamp(day)] for day in picks])
+    _frame_measure("자르기 하루: 위치표", [lambda day=day: frame.on(day) for day in picks])
+    _frame_measure("자르기 한 달: 마스크", [
+        lambda first=first, last=last: typed[(typed['날짜'] >= pd.Timestamp(first)) & (typed['날짜'] <= pd.Timestamp(last))]
+        for first, last in months])
+    _frame_measure("자르기 한 달: 위치표", [lambda first=first, last=last: frame.slice(first, last) for first, last in months])
+
+    # 빈 범주 값(업종/시장이 없는 종목)이 있어도 to_pandas로 되돌렸을 때 원래 값과 같은지
+    sample = pd.DataFrame({'날짜': ['2024-01-02', '2024-01-01', '2024-01-02'], '시장': ['코스피', None, '코스닥'],
+                           '나온횟수': [3, 1, 2]})
+    restored = DateFrame.from_pandas(sample, '날짜', categorical=('시장',)).to_pandas()
+    expected = sample.assign(날짜=pd.to_datetime(sample['날짜'])).sort_values('날짜', kind='stable')
+    markets = [[None if pd.isna(value) else value for value in column] for column in (restored['시장'], expected['시장'])]
+    same = (markets[0] == markets[1]
+            and restored['나온횟수'].tolist() == expected['나온횟수'].tolist()
+            and restored['날짜'].tolist() == expected['날짜'].tolist())
+    print(f"[BENCH] frame 빈 범주 값 되돌리기 {'같음' if same else '다름!'}")
+
+
+# chartF.py가 PRICE_PROVIDER=bench:fake_price_provider일 때 쓰는 가짜 주가 (지연은 BENCH_PRICE_LATENCY초)
+# Streamlit이 이 모듈을 따로 import하므로 설정은 환경 변수로 넘김
+_fake_prices = None
+_fake_prices_lock = threading.Lock()
+
+
+def fake_price_provider(ticker, start, end):
+    global _fake_prices
+    with _fake_prices_lock:
+        if _fake_prices is None:
+            _fake_prices = FakePriceProvider(latency=float(os.getenv("BENCH_PRICE_LATENCY", "0.5")))
+    return _fake_prices(ticker, start, end)
+
+
+# 저장소 코드에서 직접 부른 time.sleep을 위치별로 기록 (화면을 그리는 중의 인위적 지연 찾기)
+# bench.py 자신의 지연(가짜 provider 등)은 흉내 낸 I/O라서 빼고 셈
+class SleepWatch:
+    def __init__(self):
+        self.bench_file = os.path.abspath(__file__)
+        self.root = os.path.dirname(self.bench_file)
+        self.original = time.sleep
+        self.lock = threading.Lock()
+        self.calls = {}  # '파일:줄' -> [횟수, 합계(초)]
+
+    def _sleep(self, seconds):
+        caller = sys._getframe(1)
+        path = os.path.abspath(caller.f_code.co_filename)
+        if os.path.dirname(path) == self.root and path != self.bench_file:
+            with self.lock:
+                entry = self.calls.setdefault(f"{os.path.basename(path)}:{caller.f_lineno}", [0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+        self.original(seconds)
+
+    def __enter__(self):
+        time.sleep = self._sleep
+        return self
+
+    def __exit__(self, *exc):
+        time.sleep = self.original
+
+
+# AppTest 여러 개를 스레드에서 동시에 돌릴 때 필요한 설정
+# - AppTest는 실행마다 global.appTest 설정을 켰다가 이전 값으로 되돌리므로, 먼저 끝난 세션이 다른 세션
+#   실행 중에 설정을 끄지 않도록 전체 시간 동안 켜 둠
+# - Python 3.11의 ast.parse는 여러 스레드에서 동시에 부르면 가끔 SystemError가 나는데
+#   AppTest는 실행마다 스크립트를 다시 파싱하므로 파싱만 하나씩 함
+@contextmanager
+def concurrent_app_tests():
+    from streamlit.testing.v1.util import patch_config_options
+
+    original = ast.parse
+    lock = threading.Lock()
+
+    def parse(*args, **kwargs):
+        with lock:
+            return original(*args, **kwargs)
+
+    ast.parse = parse
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        ast.parse = original
+
+
+# 세션 하나: 메인 페이지 -> TOP 10 기준 바꾸기 -> 상세보기 -> 뒤로 가기 ({단계: 초}, [오류])
+def _dashboard_session(index, timeout, start_event):
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    errors = []
+
+    def step(name, action):
+        begin = time.perf_counter()
+        app = action()
+        timings[name] = time.perf_counter() - begin
+        errors.extend(f"{name}: {exception.message}" for exception in app.exception)
+        errors.extend(f"{name}: {error.value}" for error in app.error)
+        return app
+
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), DASHBOARD_SCRIPT),
+                            default_timeout=timeout)
+    start_event.wait()
+    step("첫 화면", app.run)
+    if errors or not app.selectbox:
+        return timings, errors
+    step("업종별 TOP 10", lambda: app.selectbox[0].set_value("업종별 TOP 10").run())
+    step("기업별 TOP 10", lambda: app.selectbox[0].set_value("기업별 TOP 10").run())
+    # 세션마다 다른 순위의 기업을 열어서 상세 페이지 캐시 적중이 섞이도록 함
+    buttons = [button for button in app.button if button.key and button.key.startswith("기업_")]
+    if buttons:
+        step("상세보기", lambda: buttons[index % len(buttons)].click().run())
+        step("뒤로 가기", lambda: app.button(key="back_main").click().run())
+    return timings, errors
+
+
+# 대시보드: 합성 데이터를 넣은 벤치마크 스키마와 가짜 주가로 chartF.py를 Streamlit 테스트 API로 띄우고
+# 세션 여러 개를 동시에 돌려서 단계별 시간과 인위적 지연(time.sleep)을 확인
+# 같은 프로세스의 세션끼리 캐시/연결 풀을 같이 쓰므로 1회차는 빈 캐시, 2회차부터는 캐시가 찬 상태
+def bench_dashboard(args):
+    import streamlit as st
+
+    store_dir = tempfile.mkdtemp(prefix="news_prices_")
+    try:
+        conn = connect_bench_db()
+        try:
+            fill_history(conn, args.days, args.per_day, args.companies)
+        finally:
+            conn.close()
+        os.environ.update({
+            "DB_NAME": os.getenv("BENCH_DB_NAME", BENCH_DB_NAME),
+            "PRICE_STORE_DIR": store_dir,
+            "PRICE_PROVIDER": "bench:fake_price_provider",
+            "BENCH_PRICE_LATENCY": str(args.price_latency),
+        })
+        st.cache_data.clear()
+        st.cache_resource.clear()
+
+        steps = 0
+        with SleepWatch() as watch, concurrent_app_tests():
+            for round_number in range(1, args.rounds + 1):
+                start_event = threading.Event()
+                with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+                    futures = [executor.submit(_dashboard_session, i, args.timeout, start_event)
+                               for i in range(args.sessions)]
+                    start_event.set()
+                    results = [future.result() for future in futures]
+
+                label = f"{round_number}회차 ({'빈 캐시' if round_number == 1 else '캐시 적중'})"
+                names = list(dict.fromkeys(name for timings, _ in results for name in timings))
+                for name in names:
+                    values = sorted(timings[name] for timings, _ in results if name in timings)
+                    steps += len(values)
+                    print(f"[BENCH] dashboard {label} {name:<10} 세션 {len(values)}개  "
+                          f"중앙값 {values[len(values) // 2] * 1000:8.1f}ms  최대 {values[-1] * 1000:8.1f}ms")
+                for error in sorted({error for _, errors in results for error in errors}):
+                    print(f"[BENCH] dashboard 오류: {error}")
+
+        if watch.calls:
+            for location, (count, seconds) in sorted(watch.calls.items(), key=lambda item: -item[1][1]):
+                print(f"[BENCH] dashboard 인위적 지연: {location} time.sleep {count}회, 합계 {seconds:.2f}초 "
+                      f"(단계당 {seconds / max(steps, 1) * 1000:.0f}ms)")
+        else:
+            print("[BENCH] dashboard 인위적 지연 없음")
+        # chartF.py가 import한 bench 모듈의 가짜 provider (python bench.py로 실행하면 이 모듈과 따로 있음)
+        fake_prices = getattr(sys.modules.get("bench"), "_fake_prices", None)
+        if fake_prices is not None:
+            print(f"[BENCH] dashboard 가짜 주가 요청 {fake_prices.calls}회")
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+# 거의 같은 기사 찾기용 라벨 코퍼스: (묶음 번호, 종류, 제목, 제목 + 본문)
+# - 원본 기사마다 일부는 옮겨 실은 기사(머리말/꼬리말만 다름)나 조금 고친 기사(단어 5% 변경, 문장 하나 교체)가 따라옴
+# - 같은 상용구 틀로 쓴 서로 다른 기사(다른 묶음)를 섞어서 헛판정도 확인
+def make_near_dup_corpus(n_originals, seed=42):
+    rng = random.Random(seed)
+    template = [_sentence(rng) for _ in range(8)]
+    docs = []
+    group = 0
+    for _ in range(n_originals):
+        company = rng.choice(SAMPLE_COMPANIES)[1]
+        roll = rng.random()
+        if roll < 0.1:
+            title = f"[특징주] {company}, {_sentence(rng, 3)}"
+            sentences = template + [_sentence(rng) for _ in range(8)]
+            docs.append((group, "같은 틀", title, f"{title} {' '.join(sentences)}"))
+            group += 1
+            continue
+        title = f"{company}, {_sentence(rng, 4)}"
+        sentences = [_sentence(rng) for _ in range(rng.randint(12, 30))]
+        docs.append((group, "원본", title, f"{title} {' '.join(sentences)}"))
+        if roll < 0.3:
+            copy_title = f"[연합] {title}"
+            docs.append((group, "전재", copy_title, f"{copy_title} {' '.join(sentences)} 무단전재 및 재배포 금지"))
+        elif roll < 0.5:
+            edited = [" ".join(rng.choice(WORDS) if rng.random() < 0.05 else word for word in sentence.split())
+                      for sentence in sentences]
+            edited[rng.randrange(len(edited))] = _sentence(rng)
+            edited_title = f"{title} (종합)"
+            docs.append((group, "수정", edited_title, f"{edited_title} {' '.join(edited)}"))
+        group += 1
+    # 순서를 조금 섞음 (옮겨 실은 기사가 원본보다 먼저 들어올 수도 있음)
+    for i in range(len(docs) - 1):
+        if rng.random() < 0.1:
+            docs[i], docs[i + 1] = docs[i + 1], docs[i]
+    return docs
+
+
+# 판정 결과 (정답 묶음 목록, 예측: 문서마다 같은 기사로 본 앞 문서 번호 또는 None)의 precision / recall
+def _near_dup_scores(groups, predictions):
+    seen = set()
+    actual = correct = predicted = 0
+    for i, (group, match) in enumerate(zip(groups, predictions)):
+        if group in seen:
+            actual += 1
+        seen.add(group)
+        if match is not None:
+            predicted += 1
+            correct += groups[match] == group
+    return (correct / predicted if predicted else 1.0), (correct / actual if actual else 1.0)
+
+
+# 거의 같은 기사: 제목 일치(기존) vs 전체 비교(선형) vs MinHash LSH 색인
+def bench_near_dup(args):
+    import numpy as np
+    import near_dup
+
+    docs = make_near_dup_corpus(args.originals)
+    groups = [group for group, *_ in docs]
+    kinds = {}
+    for _, kind, *_ in docs:
+        kinds[kind] = kinds.get(kind, 0) + 1
+    print(f"[BENCH] near-dup 코퍼스 {len(docs)}개 ({', '.join(f'{k} {v}' for k, v in kinds.items())})")
+
+    start = time.perf_counter()
+    signatures = [near_dup.signature(text) for *_, text in docs]
+    elapsed = time.perf_counter() - start
+    print(f"[BENCH] near-dup 서명 계산 {len(docs) / elapsed:8.1f} articles/sec")
+
+    titles = {}
+    predictions = []
+    start = time.perf_counter()
+    for i, (_, _, title, _) in enumerate(docs):
+        predictions.append(titles.get(title))
+        titles.setdefault(title, i)
+    elapsed = time.perf_counter() - start
+    precision, recall = _near_dup_scores(groups, predictions)
+    print(f"[BENCH] near-dup 제목 일치          precision={precision:.3f} recall={recall:.3f}  "
+          f"{len(docs) / elapsed:10.1f} articles/sec")
+
+    for threshold in args.thresholds:
+        # 선형: 앞의 모든 서명과 비교
+        matrix = np.empty((len(docs), near_dup.NUM_PERM), dtype=np.uint32)
+        predictions = []
+        start = time.perf_counter()
+        for i, sig in enumerate(signatures):
+            scores = (matrix[:i] == sig).mean(axis=1) if i else np.empty(0)
+            best = int(np.argmax(scores)) if len(scores) else None
+            predictions.append(best if best is not None and scores[best] >= threshold else None)
+            matrix[i] = sig
+        linear_time = time.perf_counter() - start
+        precision, recall = _near_dup_scores(groups, predictions)
+        print(f"[BENCH] near-dup 선형 비교 t={threshold:.2f}  precision={precision:.3f} recall={recall:.3f}  "
+              f"{len(docs) / linear_time:10.1f} articles/sec  찾기당 비교 {(len(docs) - 1) / 2:.0f}개")
+
+        index = near_dup.MinHashIndex(threshold)
+        predictions = []
+        start = time.perf_counter()
+        for i, sig in enumerate(signatures):
+            matches = index.find(sig)
+            predictions.append(matches[0][1] if matches else None)
+            if not matches:
+                index.add(i, sig)
+        lsh_time = time.perf_counter() - start
+        precision, recall = _near_dup_scores(groups, predictions)
+        print(f"[BENCH] near-dup LSH {index.bands}x{index.rows:<3} t={threshold:.2f}  precision={precision:.3f} "
+              f"recall={recall:.3f}  {len(docs) / lsh_time:10.1f} articles/sec  "
+              f"찾기당 비교 {index.comparisons / index.lookups:.1f}개")
+
+
+def bench_scale(args):
+    from parse_stage import ParseStage
+
+    directory, temp_dir = prepare_fixtures(args)
+    try:
+        manifest = load_manifest(directory)
+        pages = _read_pages(directory, manifest["articles"])
+        items = [(f"https://m.edaily.co.kr{entry['path']}#{n}", entry["date"], html)
+                 for n in range(args.repeat) for entry, html in zip(manifest["articles"], pages)]
+        stock_data = sample_stock_data()
+
+        baseline = None
+        baseline_rate = None
+        for workers in args.workers:
+            with ParseStage(stock_data, workers=workers, parser_name=args.parser) as stage:
+                start = time.perf_counter()
+                results = sorted(stage.map(items), key=lambda result: result[1])  # 워커가 여러 개면 끝나는 순서
+                elapsed = time.perf_counter() - start
+            rate = len(items) / elapsed
+            baseline = baseline or results
+            baseline_rate = baseline_rate or rate
+            same = "같음" if results == baseline else "다름!"
+            print(f"[BENCH] scale workers={workers:<3} {rate:8.1f} articles/sec  "
+                  f"x{rate / baseline_rate:.2f}  결과 {same}")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="News_gazer 오프라인 벤치마크")
+    parser.add_argument("--fixtures", help="녹화된 fixture 디렉터리 (없으면 합성 페이지 사용)")
+    parser.add_argument("--articles", type=int, default=300, help="합성 기사 수")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fixtures", help="합성 fixture 생성")
+    p.add_argument("directory")
+    p.set_defaults(func=lambda a: make_fixtures(a.directory, n_articles=a.articles))
+
+    p = sub.add_parser("record", help="실제 기사 페이지를 fixture로 저장")
+    p.add_argument("directory")
+    p.add_argument("urls", nargs="+")
+    p.set_defaults(func=lambda a: record_fixtures(a.directory, a.urls))
+
+    p = sub.add_parser("fetch", help="로컬 서버 대상 기사 수집 속도")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 8, 16])
+    p.add_argument("--latency", type=float, default=0.05, help="요청당 인위적 지연(초)")
+    p.set_defaults(func=bench_fetch)
+
+    p = sub.add_parser("links", help="목록 페이지 수집/파싱 속도")
+    p.add_argument("--latency", type=float, default=0.0, help="요청당 인위적 지연(초)")
+    p.set_defaults(func=bench_links)
+
+    p = sub.add_parser("match", help="종목 매칭 속도와 정확도 (정규식 vs StockMatcher, 오탐 문장 섞은 본문)")
+    p.add_argument("--master", help="전체 상장법인목록 스냅샷 파일 (STOCK_MASTER_PATH, 기본은 샘플 + 오탐 확인용 기업)")
+    p.set_defaults(func=bench_match)
+
+    p = sub.add_parser("parse", help="HTML 파서 백엔드별 속도와 결과 비교")
+    p.set_defaults(func=bench_parse)
+
+    p = sub.add_parser("cache", help="기사 캐시 적중 / 조건부 요청 / 오프라인 재처리 속도")
+    p.add_argument("--latency", type=float, default=0.05, help="요청당 인위적 지연(초)")
+    p.add_argument("--max-mb", type=int, default=1024, help="캐시 최대 크기(MB)")
+    p.set_defaults(func=bench_cache)
+
+    p = sub.add_parser("queries", help="대시보드 조회 쿼리 속도/메모리 (여러 해 분량의 합성 데이터, MySQL 필요)")
+    p.add_argument("--years", type=int, default=3, help="합성 데이터 기간(년)")
+    p.add_argument("--per-day", type=int, default=300, help="하루 기사 수")
+    p.set_defaults(func=bench_queries)
+
+    p = sub.add_parser("pool", help="대시보드 연결 풀: 동시 세션에서 매번 연결 vs 풀")
+    p.add_argument("--sessions", type=int, default=16, help="동시 세션 수")
+    p.add_argument("--queries", type=int, default=50, help="세션당 쿼리 수")
+    p.add_argument("--pool-size", type=int, default=5)
+    p.add_argument("--mysql", action="store_true", help="대역 대신 .env의 MySQL에 연결")
+    p.add_argument("--connect-latency", type=float, default=0.02, help="대역 연결 지연(초)")
+    p.add_argument("--query-latency", type=float, default=0.002, help="대역 쿼리 지연(초)")
+    p.add_argument("--drop-every", type=int, default=20, help="대역 연결을 이 쿼리마다 끊긴 상태로 만듦 (0이면 안 함)")
+    p.set_defaults(func=bench_pool)
+
+    p = sub.add_parser("ingest", help="수집 전체 (목록 -> 기사 -> 파싱 -> DB 저장) 처리량, 결과를 JSON으로 저장")
+    p.add_argument("--mysql", action="store_true", help="대역 대신 .env의 MySQL 서버에 BENCH_DB_NAME 스키마를 새로 만들어 사용")
+    p.add_argument("--db-latency", type=float, default=0.002, help="대역 DB 왕복당 지연(초)")
+    p.add_argument("--latency", type=float, default=0.01, help="요청당 인위적 지연(초)")
+    p.add_argument("--workers", type=int, default=8, help="기사 수집 스레드 수")
+    p.add_argument("--parse-workers", type=int, default=1, help="파싱/매칭 프로세스 수")
+    p.add_argument("--per-host", type=int, default=8, help="같은 호스트 동시 요청 수")
+    p.add_argument("--delay", type=float, default=0.0, help="같은 호스트 요청 사이 최소 간격(초)")
+    p.add_argument("--output", help=f"결과 JSON 경로 (기본값 {RESULTS_DIR}/ingest_<커밋>.json)")
+    p.add_argument("--metrics", help="단계별 계측 결과를 쓸 폴더 (METRICS_DIR 대신)")
+    p.set_defaults(func=bench_ingest)
+
+    p = sub.add_parser("metrics", help="계측 span / inc 한 번의 비용 (꺼짐 vs 켜짐)")
+    p.add_argument("--repeat", type=int, default=1000000)
+    p.set_defaults(func=bench_metrics)
+
+    p = sub.add_parser("master", help="상장법인목록: 예전 dict-of-dicts vs Company 스냅샷 (읽는 시간 / 메모리 / 티커)")
+    p.add_argument("--companies", type=int, default=2700, help="합성 상장사 수")
+    p.add_argument("--mysql", action="store_true", help="대역 대신 .env의 MySQL 서버에 BENCH_DB_NAME 스키마를 새로 만들어 사용")
+    p.add_argument("--db-latency", type=float, default=0.002, help="대역 DB 왕복당 지연(초)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--lookups", type=int, default=100000, help="티커 조회 횟수")
+    p.set_defaults(func=bench_master)
+
+    p = sub.add_parser("compare", help="두 ingest 결과 JSON 비교")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.set_defaults(func=bench_compare)
+
+    p = sub.add_parser("prices", help="주가: 매번 전체 받기 vs 로컬 저장소 (가짜 provider)")
+    p.add_argument("--latency", type=float, default=1.0, help="가짜 provider 요청 지연(초)")
+    p.set_defaults(func=bench_prices)
+
+    p = sub.add_parser("dashboard", help="대시보드 동시 세션: 첫 화면 / TOP 10 바꾸기 / 상세보기 시간과 인위적 지연 (MySQL 필요)")
+    p.add_argument("--days", type=int, default=365, help="합성 데이터 기간(일)")
+    p.add_argument("--companies", type=int, default=2000, help="합성 종목 수")
+    p.add_argument("--per-day", type=int, default=300, help="하루 기사 수")
+    p.add_argument("--sessions", type=int, default=4, help="동시 세션 수")
+    p.add_argument("--rounds", type=int, default=2, help="반복 횟수 (1회차는 빈 캐시)")
+    p.add_argument("--price-latency", type=float, default=0.5, help="가짜 주가 요청 지연(초)")
+    p.add_argument("--timeout", type=float, default=60, help="화면 한 번 그리는 최대 시간(초)")
+    p.set_defaults(func=bench_dashboard)
+
+    p = sub.add_parser("chart", help="상세보기 차트 데이터 생성 시간과 크기 (기존 vs numpy + 줄이기)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_chart)
+
+    p = sub.add_parser("frame", help="대시보드 작업 데이터: object DataFrame vs 범주 + datetime64 vs DateFrame 위치표 (메모리 / 날짜 거르기)")
+    p.add_argument("--years", type=int, default=3)
+    p.add_argument("--per-day", type=int, default=1500, help="날짜마다 언급된 종목 수")
+    p.add_argument("--repeat", type=int, default=50, help="고르는 날짜 수 (기존 방식은 3개만)")
+    p.set_defaults(func=bench_frame)
+
+    p = sub.add_parser("near-dup", help="거의 같은 기사 찾기 정확도/처리량 (제목 일치 vs 선형 비교 vs LSH)")
+    p.add_argument("--originals", type=int, default=5000, help="원본 기사 수")
+    p.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.8])
+    p.set_defaults(func=bench_near_dup)
+
+    p = sub.add_parser("scale", help="파싱 프로세스 풀 워커 수별 처리량")
+    p.add_argument("--workers", type=int, nargs="+",
+                   default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    p.add_argument("--parser", default="bs4", help="HTML 파서 백엔드")
+    p.add_argument("--repeat", type=int, default=5, help="코퍼스 반복 횟수")
+    p.set_defaults(func=bench_scale)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
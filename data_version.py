@@ -0,0 +1,40 @@
+# 데이터 버전
+# 수집이 커밋할 때마다 바뀐 날짜 / 종목과 전체 범위의 버전을 1씩 올림 (같은 트랜잭션)
+# 대시보드는 캐시 키에 버전을 넣어서 바뀐 날짜 / 종목의 캐시만 새로 읽고 나머지는 그대로 씀
+GLOBAL_SCOPE = "전체"
+
+BUMP_QUERY = """
+INSERT INTO 데이터_버전 (범위, 버전)
+VALUES (%s, %s)
+ON DUPLICATE KEY UPDATE 버전 = 버전 + 1
+"""
+
+
+def date_scope(date_value):
+    return f"날짜:{date_value}"
+
+
+def company_scope(stock_code):
+    return f"종목:{stock_code}"
+
+
+# 범위들의 버전을 올림 (전체 범위는 항상 같이 올림)
+def bump(cursor, scopes):
+    rows = [(scope, 1) for scope in sorted(set(scopes) | {GLOBAL_SCOPE})]
+    cursor.executemany(BUMP_QUERY, rows)
+
+
+# 모든 범위의 버전을 올림 (집계를 다시 만든 경우)
+def bump_all(cursor):
+    cursor.execute("UPDATE 데이터_버전 SET 버전 = 버전 + 1")
+    bump(cursor, [])
+
+
+# {범위: 버전} (한 번도 안 올린 범위는 0)
+def read_versions(conn, scopes):
+    scopes = list(scopes)
+    placeholders = ", ".join(["%s"] * len(scopes))
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT 범위, 버전 FROM 데이터_버전 WHERE 범위 IN ({placeholders})", scopes)
+        found = dict(cursor.fetchall())
+    return {scope: found.get(scope, 0) for scope in scopes}
@@ -0,0 +1,124 @@
+# 날짜로 자르는 열 단위 프레임 (대시보드가 화면마다 쓰는 데이터)
+# - 날짜 열은 정렬된 datetime64[D] 배열 하나, 나머지 열은 같은 순서의 numpy 배열
+#   문자열 열은 범주로 바꿀 수 있음 (int32 코드 + 범주 목록, 같은 문자열을 행마다 들고 있지 않음)
+# - 만들 때 첫 날짜부터 마지막 날짜까지 날짜별 시작 행 위치표(offsets)를 한 번 만들어 둠
+#   날짜 하나 / 기간 자르기는 표에서 위치 두 개를 읽는 O(1) 슬라이스 (복사 없는 numpy 뷰)
+# - 날짜 변환(pd.to_datetime) / 정렬 / 범주화는 만들 때 한 번만 하고 (st.cache_data에 넣는 값),
+#   화면을 다시 그릴 때는 변환이나 전체 행 비교 없이 자르기만 함
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+class DateFrame:
+    # days: 정렬된 datetime64[D] 배열, columns: {이름: 같은 길이 배열}, categories: {이름: 범주 배열} (그 열은 코드)
+    def __init__(self, days, columns, categories=None):
+        self.days = days
+        self.columns = columns
+        self.categories = categories or {}
+        self.base = 0  # offsets 값에서 빼는 수 (잘라 낸 프레임은 원래 프레임의 위치표를 같이 씀)
+        if len(days):
+            self.first = days[0]
+            span = int((days[-1] - days[0]).astype(np.int64)) + 1
+            # offsets[i] = (첫 날짜 + i일) 이후인 첫 행, offsets[span] = 행 수
+            self.offsets = np.searchsorted(days, days[0] + np.arange(span + 1)).astype(np.int64)
+        else:
+            self.first = None
+            self.offsets = np.zeros(1, dtype=np.int64)
+
+    # DataFrame에서 만들기 (날짜가 아닌 행은 뺌, 날짜순 정렬, categorical 열은 범주로)
+    # 범주 코드는 범주 수에 맞는 가장 작은 정수형, 빈 값(None/NaN)도 범주 하나로 둠
+    @classmethod
+    def from_pandas(cls, df, date_column, categorical=()):
+        days = pd.to_datetime(df[date_column], errors="coerce").to_numpy(dtype="datetime64[D]")
+        keep = np.flatnonzero(~np.isnat(days))
+        kept = days[keep]
+        if len(kept) > 1 and (kept[1:] < kept[:-1]).any():
+            keep = keep[np.argsort(kept, kind="stable")]
+        # 이미 날짜순이고 빠진 행이 없으면 (ORDER BY 날짜로 읽은 경우) 행을 옮기지 않음
+        take = None if len(keep) == len(days) and (keep[1:] > keep[:-1]).all() else keep
+        columns = {}
+        categories = {}
+        for name in df.columns:
+            if name == date_column:
+                continue
+            if name in categorical:
+                # 행을 옮기기 전에 범주화 (object 배열을 옮기는 것보다 정수 코드를 옮기는 게 훨씬 빠름)
+                codes, uniques = pd.factorize(df[name], use_na_sentinel=False)
+                values = codes.astype(np.min_scalar_type(-max(len(uniques), 1)))
+                categories[name] = np.asarray(uniques, dtype=object)
+            else:
+                values = df[name].to_numpy()
+            columns[name] = values if take is None else values[take]
+        return cls(days if take is None else days[take], columns, categories)
+
+    # 날짜순으로 저장된 구조화 배열에서 만들기 (주가 저장소, 필드를 그대로 열로 씀)
+    @classmethod
+    def from_records(cls, array, date_field):
+        return cls(array[date_field], {name: array[name] for name in array.dtype.names if name != date_field})
+
+    def __len__(self):
+        return len(self.days)
+
+    # 열 배열 (범주 열은 코드)
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    # 범주 열은 문자열로 풀어서, 나머지는 그대로
+    def values(self, name):
+        if name in self.categories:
+            return self.categories[name][self.columns[name]]
+        return self.columns[name]
+
+    def _day_index(self, day, n_days):
+        return int(np.clip((np.datetime64(day, "D") - self.first).astype(np.int64), 0, n_days))
+
+    # start ~ end 날짜 (양끝 포함, None이면 그쪽 끝까지)
+    def slice(self, start=None, end=None):
+        view = DateFrame.__new__(DateFrame)
+        view.categories = self.categories
+        if self.first is None:
+            view.days, view.columns, view.first, view.offsets, view.base = self.days, self.columns, None, self.offsets, 0
+            return view
+        n_days = len(self.offsets) - 1
+        a = 0 if start is None else self._day_index(start, n_days)
+        b = n_days if end is None else self._day_index(np.datetime64(end, "D") + 1, n_days)
+        b = max(a, b)
+        lo = int(self.offsets[a]) - self.base
+        hi = int(self.offsets[b]) - self.base
+        view.days = self.days[lo:hi]
+        view.columns = {name: column[lo:hi] for name, column in self.columns.items()}
+        view.first = self.first + a
+        view.offsets = self.offsets[a:b + 1]
+        view.base = self.base + lo
+        return view
+
+    # 날짜 하나의 행들
+    def on(self, day):
+        return self.slice(day, day)
+
+    # 화면에 표로 보여 줄 때 (범주 열은 pandas categorical, 날짜는 datetime64)
+    # pandas 범주에는 빈 값이 들어갈 수 없으므로 빈 값 범주는 빼고 그 코드는 -1(NaN)로 바꿈
+    def to_pandas(self, date_column="날짜"):
+        data = {date_column: self.days.astype("datetime64[ns]")}
+        for name, column in self.columns.items():
+            if name in self.categories:
+                categories = self.categories[name]
+                missing = pd.isna(categories)
+                if missing.any():
+                    remap = np.cumsum(~missing) - 1
+                    remap[missing] = -1
+                    column = remap[column]
+                    categories = categories[~missing]
+                data[name] = pd.Categorical.from_codes(column, categories)
+            else:
+                data[name] = column
+        return pd.DataFrame(data)
+
+    # 들고 있는 메모리 (배열 + 위치표 + 범주 문자열)
+    def nbytes(self):
+        total = self.days.nbytes + self.offsets.nbytes + sum(column.nbytes for column in self.columns.values())
+        for categories in self.categories.values():
+            total += categories.nbytes + sum(sys.getsizeof(value) for value in categories)
+        return total
@@ -0,0 +1,146 @@
+# 스레드 안전한 DB 연결 풀
+# Streamlit은 세션(사용자)마다 다른 스레드에서 스크립트를 다시 실행하므로
+# 프로세스 하나에 풀 하나를 두고(chartF.py에서 st.cache_resource) 연결을 빌려 씀
+# - max_size: 동시에 열어 둘 최대 연결 수 (다 쓰고 있으면 반납될 때까지 기다림)
+# - idle_timeout: 이 시간(초) 넘게 안 쓴 연결은 닫음
+# - check_interval: 이 시간(초) 넘게 쉬던 연결은 빌려 주기 전에 ping으로 확인하고 끊겼으면 새로 연결
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connect, max_size=5, idle_timeout=300, check_interval=30, timeout=10):
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.idle = deque()  # (연결, 반납 시각), 최근 반납한 것이 오른쪽
+        self.size = 0  # 열려 있는 연결 수 (빌려 준 것 + 쉬는 것)
+        # 통계
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.created = 0
+        self.reconnects = 0
+        self.closed_idle = 0
+
+    # 오래 쉰 연결 닫기 (condition을 잡은 상태에서 호출, 닫을 연결 목록 반환)
+    def _expire_idle(self, now):
+        expired = []
+        while self.idle and now - self.idle[0][1] > self.idle_timeout:
+            expired.append(self.idle.popleft()[0])
+            self.size -= 1
+            self.closed_idle += 1
+        return expired
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        wait_start = time.monotonic()
+        while True:
+            with self.condition:
+                now = time.monotonic()
+                expired = self._expire_idle(now)
+                conn = None
+                idle_since = None
+                if self.idle:
+                    conn, idle_since = self.idle.pop()
+                elif self.size < self.max_size:
+                    self.size += 1
+                else:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise PoolTimeout(f"{self.timeout}초 동안 DB 연결을 빌리지 못했습니다 (최대 {self.max_size}개).")
+                    waited = True
+                    self.condition.wait(remaining)
+                    continue
+                self.checkouts += 1
+                if waited:
+                    self.waits += 1
+                    self.wait_time += now - wait_start
+            for old_conn in expired:
+                self._close(old_conn)
+
+            # 연결을 새로 만들거나 상태 확인은 lock 밖에서 (느린 네트워크 작업)
+            try:
+                if conn is None:
+                    conn = self.connect()
+                    with self.condition:
+                        self.created += 1
+                elif now - idle_since >= self.check_interval and not self._healthy(conn):
+                    self._close(conn)
+                    conn = self.connect()
+                    with self.condition:
+                        self.reconnects += 1
+            except Exception:
+                with self.condition:
+                    self.size -= 1
+                    self.condition.notify()
+                raise
+            return conn
+
+    def _release(self, conn, broken=False):
+        with self.condition:
+            if broken:
+                self.size -= 1
+            else:
+                self.idle.append((conn, time.monotonic()))
+            self.condition.notify()
+        if broken:
+            self._close(conn)
+
+    # with pool.connection() as conn: ... (쿼리 중 오류가 나면 그 연결은 버림)
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except Exception:
+            self._release(conn, broken=True)
+            raise
+        self._release(conn)
+
+    def stats(self):
+        with self.condition:
+            return {
+                "size": self.size,
+                "idle": len(self.idle),
+                "in_use": self.size - len(self.idle),
+                "max_size": self.max_size,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 3),
+                "created": self.created,
+                "reconnects": self.reconnects,
+                "closed_idle": self.closed_idle,
+            }
+
+    def close(self):
+        with self.condition:
+            idle = [conn for conn, _ in self.idle]
+            self.size -= len(self.idle)
+            self.idle.clear()
+        for conn in idle:
+            self._close(conn)
@@ -0,0 +1,67 @@
+# 수집 작업 대기열 (수집_작업 테이블) 다루기
+# - 대시보드(chartF.py)는 이 모듈만 import해서 작업을 넣고 상태를 읽음 (sql.py의 설정 / 파서 / 상장법인목록을 읽지 않도록)
+# - 작업을 실행하는 쪽은 ingest_worker.py
+import os
+import subprocess
+import sys
+
+import pymysql
+
+LOCK_NAME = "news_gazer_ingest"
+LOG_FILE = "ingest_worker.log"
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingest_worker.py")
+
+PENDING = "대기"
+RUNNING = "실행중"
+DONE = "완료"
+FAILED = "실패"
+
+
+# 작업 넣기 (이미 기다리거나 실행 중인 작업이 있으면 새로 넣지 않고 그 작업 id 반환)
+def enqueue_job(conn, requested_by):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT id FROM 수집_작업 WHERE 상태 IN (%s, %s) ORDER BY id LIMIT 1", (PENDING, RUNNING))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        cursor.execute("INSERT INTO 수집_작업 (상태, 요청) VALUES (%s, %s)", (PENDING, requested_by))
+        return cursor.lastrowid
+
+
+# 기다리는 작업이 있는지
+def has_pending_job(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM 수집_작업 WHERE 상태 = %s LIMIT 1", (PENDING,))
+        return cursor.fetchone() is not None
+
+
+# 가장 최근 작업 (dict, 없으면 None)
+def latest_job(conn):
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("SELECT * FROM 수집_작업 ORDER BY id DESC LIMIT 1")
+        return cursor.fetchone()
+
+
+# 다른 연결이 작업자 잠금을 잡고 있는지
+def worker_running(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT IS_USED_LOCK(%s)", (LOCK_NAME,))
+        return cursor.fetchone()[0] is not None
+
+
+# 작업을 넣고, 떠 있는 작업자가 없으면 한 번만 실행하는 작업자를 따로 띄움 (기다리지 않음)
+# 잠금을 놓으려던 --once 작업자가 있었으면 그 작업자가 잠금을 놓은 뒤 대기 작업을 다시 확인해서 처리함
+def request_ingestion(conn, requested_by="dashboard"):
+    job_id = enqueue_job(conn, requested_by)
+    if not worker_running(conn):
+        start_worker_process()
+    return job_id
+
+
+def start_worker_process():
+    directory = os.path.dirname(WORKER_SCRIPT)
+    log = open(os.path.join(directory, LOG_FILE), "a", encoding="utf-8")
+    options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt" else {"start_new_session": True}
+    subprocess.Popen([sys.executable, WORKER_SCRIPT, "--once"], stdout=log, stderr=subprocess.STDOUT,
+                     stdin=subprocess.DEVNULL, cwd=directory, **options)
+    log.close()
@@ -0,0 +1,142 @@
+# 백그라운드 수집 작업자
+# - 대시보드의 '새로 고침'은 수집_작업 테이블에 작업을 넣기만 하고, 작업자가 꺼내서 sql.run_ingestion을 실행
+# - MySQL GET_LOCK으로 크롤링은 한 번에 하나만 실행 (작업자를 여러 개 띄워도 나머지는 기다림)
+# - 기다리는 작업이 여러 개면 한 번의 크롤링으로 같이 처리
+# - 진행 상황은 수집_작업 행에 기록하고 대시보드는 그 행을 읽기만 함
+# - --interval을 주면 마지막 수집이 끝나고 그 시간(초)이 지났을 때 작업을 스스로 넣음
+# - 작업 넣기 / 상태 읽기는 ingest_jobs.py (대시보드는 이 모듈 대신 그쪽만 import)
+# 사용법: py ingest_worker.py [--interval 3600] [--once]
+import argparse
+import threading
+import time
+import traceback
+
+import sql
+from ingest_jobs import LOCK_NAME, PENDING, RUNNING, DONE, FAILED, enqueue_job, has_pending_job
+
+POLL_INTERVAL = 5  # 대기 작업 확인 간격(초)
+
+
+# 작업 테이블은 autocommit 연결로 다룸 (대시보드가 바로 볼 수 있도록)
+def connect():
+    conn = sql.connect_to_db()
+    conn.autocommit(True)
+    return conn
+
+
+class IngestWorker:
+    def __init__(self, interval=None, once=False):
+        self.interval = interval
+        self.once = once
+        self.conn = connect()  # 잠금과 작업 상태용
+        self.progress_conn = None  # 진행 상황 보고 스레드용
+        self.progress_lock = threading.Lock()
+        self.job_ids = []
+
+    def _acquire_lock(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+            return cursor.fetchone()[0] == 1
+
+    def _update(self, conn, fields, params):
+        placeholders = ", ".join(["%s"] * len(self.job_ids))
+        with conn.cursor() as cursor:
+            cursor.execute(f"UPDATE 수집_작업 SET {fields} WHERE id IN ({placeholders})", (*params, *self.job_ids))
+
+    # 파이프라인 진행 상황 (보고 스레드에서 불림)
+    def _progress(self, snapshot):
+        with self.progress_lock:
+            if self.progress_conn is None:
+                self.progress_conn = connect()
+            self._update(self.progress_conn, "링크 = %s, 저장 = %s, 오류 = %s",
+                         (snapshot["discover"], snapshot["write"], snapshot["errors"]))
+
+    # 잠금을 잡은 뒤에도 실행중인 작업은 이전 작업자가 멈춘 것
+    def _fail_orphans(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute("UPDATE 수집_작업 SET 상태 = %s, 종료시각 = NOW(), 메시지 = %s WHERE 상태 = %s",
+                           (FAILED, "작업자가 중간에 멈췄습니다.", RUNNING))
+
+    # 마지막 수집이 끝난 지 interval이 지났으면 작업 넣기
+    def _schedule(self):
+        if not self.interval:
+            return
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT TIMESTAMPDIFF(SECOND, MAX(종료시각), NOW()) FROM 수집_작업 WHERE 상태 = %s",
+                           (DONE,))
+            elapsed = cursor.fetchone()[0]
+        if elapsed is None or elapsed >= self.interval:
+            enqueue_job(self.conn, "schedule")
+
+    # 기다리는 작업을 모두 실행중으로 바꾸고 id 목록 반환
+    def _claim(self):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT id FROM 수집_작업 WHERE 상태 = %s ORDER BY id", (PENDING,))
+            self.job_ids = [row[0] for row in cursor.fetchall()]
+        if self.job_ids:
+            self._update(self.conn, "상태 = %s, 시작시각 = NOW(), 메시지 = NULL", (RUNNING,))
+        return self.job_ids
+
+    def _run_jobs(self):
+        print(f"[INFO] 수집 작업 시작: {self.job_ids}")
+        try:
+            processed = sql.run_ingestion(progress=self._progress)
+            with self.progress_lock:
+                self._update(self.conn, "상태 = %s, 종료시각 = NOW(), 저장 = %s, 메시지 = %s",
+                             (DONE, processed, f"기사 {processed}개 저장"))
+            print(f"[INFO] 수집 작업 완료: 기사 {processed}개")
+        except Exception as e:
+            traceback.print_exc()
+            with self.progress_lock:
+                self._update(self.conn, "상태 = %s, 종료시각 = NOW(), 메시지 = %s", (FAILED, str(e)[:1000]))
+            print(f"[ERROR] 수집 작업 실패: {e}")
+
+    def run(self):
+        sql.ensure_table_exists(self.conn.cursor())
+        try:
+            while self._run_locked():
+                # 잠금을 놓기 직전에 들어온 작업은 request_ingestion이 작업자가 떠 있다고 보고 새로 띄우지 않았으므로
+                # 잠금을 놓은 뒤 다시 확인해서 남아 있으면 한 번 더 처리
+                if not has_pending_job(self.conn):
+                    break
+                print("[INFO] 잠금을 놓는 사이에 들어온 작업이 있어 다시 처리합니다.")
+        finally:
+            self.conn.close()
+            if self.progress_conn is not None:
+                self.progress_conn.close()
+
+    # 잠금을 잡고 작업을 처리한 뒤 잠금을 놓음 (--once인데 다른 작업자가 잠금을 잡고 있으면 False)
+    def _run_locked(self):
+        while not self._acquire_lock():
+            if self.once:
+                print("[INFO] 다른 작업자가 실행 중입니다. 넣은 작업은 그 작업자가 처리합니다.")
+                return False
+            time.sleep(POLL_INTERVAL)
+        self._fail_orphans()
+        print("[INFO] 수집 작업자 시작" + (f" (주기 {self.interval}초)" if self.interval else ""))
+        try:
+            while True:
+                self._schedule()
+                if self._claim():
+                    self._run_jobs()
+                    continue
+                if self.once:
+                    break
+                time.sleep(POLL_INTERVAL)
+        finally:
+            with self.conn.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="백그라운드 뉴스 수집 작업자")
+    parser.add_argument("--interval", type=float, help="이 시간(초)마다 수집 작업을 스스로 넣음")
+    parser.add_argument("--once", action="store_true", help="기다리는 작업만 처리하고 종료")
+    parser.add_argument("--enqueue", action="store_true", help="작업을 하나 넣고 바로 처리")
+    args = parser.parse_args()
+
+    worker = IngestWorker(interval=args.interval, once=args.once)
+    if args.enqueue:
+        enqueue_job(worker.conn, "cli")
+    worker.run()
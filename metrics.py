@@ -0,0 +1,271 @@
+# 수집 파이프라인 계측 (카운터 / 지연 시간 히스토그램 / 구간(span))
+# - configure(폴더)로 켰을 때만 기록함 (sql.py는 METRICS_DIR). 꺼져 있으면 모든 함수가 바로 돌아가고
+#   span()은 아무것도 안 하는 공용 객체를 돌려주므로 계측 코드를 그대로 둬도 비용이 거의 없음
+# - 실행이 끝나면 write_run()이 폴더에 세 파일을 씀
+#   <이름>_summary.json: 카운터 / 히스토그램(개수, 합계, 평균, p50/p95, 최대) / 실행 요약
+#   <이름>.prom: Prometheus 텍스트 형식 (node_exporter textfile collector가 읽도록 바꿔치기로 씀)
+#   <이름>_trace.json: 구간 기록 (Chrome trace 형식, chrome://tracing 이나 Perfetto에서 열림)
+# - 이름 규칙: 카운터는 inc("list_pages", source=...) -> news_gazer_list_pages_total{source="..."}
+#   구간/지연은 span("article_fetch") -> news_gazer_article_fetch_seconds 히스토그램
+import bisect
+import json
+import os
+import threading
+import time
+
+PREFIX = "news_gazer_"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # 초
+MAX_SPANS = 20000  # 구간 기록 최대 개수 (넘으면 trace에서만 빠지고 히스토그램에는 계속 들어감)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (이름, 라벨) -> 값
+        self.gauges = {}  # (이름, 라벨) -> 값
+        self.histograms = {}  # (이름, 라벨) -> [버킷별 개수(+Inf 포함), 합계, 개수, 최댓값]
+        self.spans = []
+        self.dropped_spans = 0
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+
+    def inc(self, name, value, labels):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, labels):
+        with self.lock:
+            self.gauges[(name, labels)] = value
+
+    def observe(self, name, seconds, labels):
+        key = (name, labels)
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0, 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            if seconds > histogram[3]:
+                histogram[3] = seconds
+
+    def record_span(self, name, labels, start, end, failed):
+        self.observe(f"{name}_seconds", end - start, labels)
+        if failed:
+            self.inc(f"{name}_errors", 1, labels)
+        with self.lock:
+            if len(self.spans) >= MAX_SPANS:
+                self.dropped_spans += 1
+                return
+            self.spans.append((name, labels, start, end, threading.get_ident()))
+
+
+class _Span:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.record_span(self.name, self.labels, self.start, time.perf_counter(), exc_type is not None)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+_registry = None  # None이면 꺼짐
+_directory = None
+
+
+# 폴더를 주면 켜고, 비우면 끔
+def configure(directory):
+    global _registry, _directory
+    _directory = directory or None
+    _registry = Registry() if _directory else None
+
+
+def enabled():
+    return _registry is not None
+
+
+# 새 실행 시작 (이전 실행 기록을 비움)
+def start_run():
+    global _registry
+    if _registry is not None:
+        _registry = Registry()
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def inc(name, value=1, **labels):
+    if _registry is not None:
+        _registry.inc(name, value, _labels(labels))
+
+
+def set_gauge(name, value, **labels):
+    if _registry is not None:
+        _registry.set_gauge(name, value, _labels(labels))
+
+
+def observe(name, seconds, **labels):
+    if _registry is not None:
+        _registry.observe(f"{name}_seconds", seconds, _labels(labels))
+
+
+# with span("db_query", statement="commit"): ... (걸린 시간을 히스토그램과 trace에 기록, 예외가 나면 오류 카운터도 올림)
+def span(name, **labels):
+    if _registry is None:
+        return _NOOP_SPAN
+    return _Span(_registry, name, _labels(labels))
+
+
+# 히스토그램 버킷에서 분위수 추정 (그 분위수가 들어 있는 버킷의 위쪽 경계, 마지막 버킷이면 최댓값)
+def _quantile(counts, total, maximum, q):
+    rank = q * total
+    seen = 0
+    for bound, count in zip(BUCKETS, counts):
+        seen += count
+        if seen >= rank:
+            return min(bound, maximum)
+    return maximum
+
+
+def _key_text(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{key}={value}" for key, value in labels) + "}"
+
+
+# 실행 요약 dict (extra는 그대로 'run'에 넣음)
+def summary(extra=None):
+    registry = _registry
+    if registry is None:
+        return None
+    with registry.lock:
+        counters = dict(registry.counters)
+        gauges = dict(registry.gauges)
+        histograms = {key: (list(value[0]), *value[1:]) for key, value in registry.histograms.items()}
+    result = {
+        "started_at": registry.started_at,
+        "duration_sec": round(time.perf_counter() - registry.start, 3),
+        "run": extra or {},
+        "counters": {_key_text(name, labels): value for (name, labels), value in sorted(counters.items())},
+        "gauges": {_key_text(name, labels): value for (name, labels), value in sorted(gauges.items())},
+        "histograms": {},
+        "spans_dropped": registry.dropped_spans,
+    }
+    for (name, labels), (counts, total_seconds, count, maximum) in sorted(histograms.items()):
+        result["histograms"][_key_text(name, labels)] = {
+            "count": count,
+            "sum": round(total_seconds, 6),
+            "mean": round(total_seconds / count, 6) if count else 0.0,
+            "p50": round(_quantile(counts, count, maximum, 0.5), 6),
+            "p95": round(_quantile(counts, count, maximum, 0.95), 6),
+            "max": round(maximum, 6),
+        }
+    return result
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _prom_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+# Prometheus 텍스트 형식 (카운터 *_total, 게이지, 히스토그램 *_bucket/_sum/_count)
+def prometheus_text():
+    registry = _registry
+    if registry is None:
+        return ""
+    with registry.lock:
+        counters = sorted(registry.counters.items())
+        gauges = sorted(registry.gauges.items())
+        histograms = sorted((key, (list(value[0]), value[1], value[2])) for key, value in registry.histograms.items())
+    lines = []
+    typed = set()
+
+    def declare(metric, kind):
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# TYPE {metric} {kind}")
+
+    for (name, labels), value in counters:
+        metric = f"{PREFIX}{name}_total"
+        declare(metric, "counter")
+        lines.append(f"{metric}{_prom_labels(labels)} {value}")
+    for (name, labels), value in gauges:
+        metric = f"{PREFIX}{name}"
+        declare(metric, "gauge")
+        lines.append(f"{metric}{_prom_labels(labels)} {value}")
+    for (name, labels), (counts, total_seconds, count) in histograms:
+        metric = f"{PREFIX}{name}"
+        declare(metric, "histogram")
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS, counts):
+            cumulative += bucket_count
+            lines.append(f"{metric}_bucket{_prom_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{metric}_bucket{_prom_labels(labels, [('le', '+Inf')])} {count}")
+        lines.append(f"{metric}_sum{_prom_labels(labels)} {total_seconds:.6f}")
+        lines.append(f"{metric}_count{_prom_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+# 구간 기록 (Chrome trace 'X' 이벤트, 시각은 실행 시작부터 마이크로초)
+def trace_events():
+    registry = _registry
+    if registry is None:
+        return []
+    with registry.lock:
+        spans = list(registry.spans)
+    pid = os.getpid()
+    return [{"name": name, "ph": "X", "pid": pid, "tid": tid,
+             "ts": round((start - registry.start) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+             "args": dict(labels)}
+            for name, labels, start, end, tid in spans]
+
+
+def _write_atomic(path, text):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+# 실행 결과를 폴더에 씀 (꺼져 있으면 아무것도 안 함). 쓴 파일 경로 목록 반환
+def write_run(name, extra=None):
+    if _registry is None:
+        return []
+    set_gauge("run_duration_seconds", round(time.perf_counter() - _registry.start, 3), run=name)
+    set_gauge("run_finished_timestamp_seconds", round(time.time(), 3), run=name)
+    os.makedirs(_directory, exist_ok=True)
+    paths = [os.path.join(_directory, f"{name}_summary.json"), os.path.join(_directory, f"{name}.prom"),
+             os.path.join(_directory, f"{name}_trace.json")]
+    _write_atomic(paths[0], json.dumps(summary(extra), ensure_ascii=False, indent=1, default=str))
+    _write_atomic(paths[1], prometheus_text())
+    _write_atomic(paths[2], json.dumps({"traceEvents": trace_events()}, ensure_ascii=False))
+    print(f"[INFO] 계측 결과 저장: {', '.join(paths)}")
+    return paths
@@ -0,0 +1,89 @@
+# 기업별_뉴스횟수Final(' | '로 이어 붙인 뉴스링크/뉴스제목) 데이터를
+# 뉴스기사 / 기업별_뉴스언급 테이블로 옮기는 도구
+# 사용법: py migrate.py [--dry-run]
+import argparse
+
+import pymysql
+
+import sql
+from stock_master import Company
+
+OLD_TABLE = "기업별_뉴스횟수Final"
+
+
+# ' | '로 이어 붙인 링크/제목을 기사 단위로 나눔
+def split_joined(links_text, titles_text):
+    # 링크에는 '|'가 들어가지 않으므로 '|' 기준으로 나눔 (예전 데이터에는 공백 없이 붙은 경우도 있음)
+    links = [link.strip() for link in (links_text or "").split("|") if link.strip()]
+    titles = [title.strip() for title in (titles_text or "").split(" | ")]
+
+    # 제목 자체에 ' | '가 들어 있으면 (예: '제목 | 이데일리') 제목 조각이 링크 수의 배수가 됨
+    if links and len(titles) != len(links) and len(titles) % len(links) == 0:
+        size = len(titles) // len(links)
+        titles = [" | ".join(titles[i:i + size]) for i in range(0, len(titles), size)]
+    if len(titles) != len(links):
+        titles = [None] * len(links)
+    return list(zip(links, titles))
+
+
+def migrate(dry_run=False):
+    read_conn = sql.connect_to_db()
+    write_conn = sql.connect_to_db()
+    write_cursor = write_conn.cursor()
+
+    write_cursor.execute(f"SHOW TABLES LIKE '{OLD_TABLE}'")
+    if not write_cursor.fetchone():
+        print(f"[INFO] {OLD_TABLE} 테이블이 없습니다. 옮길 데이터가 없습니다.")
+        return
+
+    if not dry_run:
+        sql.ensure_table_exists(write_cursor)
+    writer = sql.MentionWriter(write_cursor, write_conn)
+
+    old_rows = 0
+    mismatched = 0
+    mentions = 0
+    # 큰 테이블도 메모리에 다 올리지 않도록 서버 측 커서로 읽음
+    read_cursor = read_conn.cursor(pymysql.cursors.SSCursor)
+    read_cursor.execute(f"""
+        SELECT 날짜, 기업명, 종목코드, 시장, 업종, 업종_ID, 뉴스링크, 뉴스제목
+        FROM {OLD_TABLE}
+        ORDER BY 날짜
+    """)
+    for date_value, name, code, market, type_name, type_ID, links_text, titles_text in read_cursor:
+        old_rows += 1
+        date_str = date_value.strftime("%Y-%m-%d")
+        stock_code = str(code).strip().zfill(6)
+        stock_info = Company(stock_code, name, market, type_name, type_ID)
+
+        articles = split_joined(links_text, titles_text)
+        if articles and articles[0][1] is None:
+            mismatched += 1
+        for full_link, title in articles:
+            mentions += 1
+            if dry_run:
+                continue
+            link_hash = writer.add_article(date_str, full_link, title)
+            writer.add(date_str, stock_code, stock_info, link_hash, title or full_link)
+        if not dry_run:
+            writer.maybe_flush()
+
+    read_cursor.close()
+    if not dry_run:
+        writer.close()
+
+    print(f"[INFO] {OLD_TABLE} {old_rows}행 -> 종목 언급 {mentions}건 "
+          f"(링크/제목 개수가 맞지 않는 행 {mismatched}개는 제목 없이 링크만 옮김)")
+    if dry_run:
+        print("[INFO] --dry-run: 데이터베이스에 쓰지 않았습니다.")
+
+    write_cursor.close()
+    write_conn.close()
+    read_conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"{OLD_TABLE} 데이터를 정규화된 테이블로 옮김")
+    parser.add_argument("--dry-run", action="store_true", help="옮길 건수만 확인")
+    args = parser.parse_args()
+    migrate(dry_run=args.dry_run)
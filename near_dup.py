@@ -0,0 +1,149 @@
+# 거의 같은 기사 찾기 (MinHash + LSH 밴드)
+# - 제목 + 본문에서 공백을 뺀 글자 k-gram(shingle) 집합의 MinHash 서명(NUM_PERM개 값)을 만듦
+#   두 서명에서 같은 자리 값이 같은 비율이 두 기사 k-gram 집합의 자카드 유사도 추정값
+#   (통신사 기사를 옮겨 싣거나 몇 문장만 고친 기사는 0.6 이상, 다른 기사는 0.1 아래)
+# - 서명을 밴드(rows개씩)로 나눠 밴드 하나라도 똑같은 기사만 후보로 꺼내서 유사도를 확인하므로
+#   전체 기사와 비교하지 않음. 밴드 수 / 밴드 크기는 threshold에서 놓치는 쌍과 헛후보가 적도록 고름
+# - 서명은 DB에 저장해서 다음 실행에서도 쓰므로 실행마다 값이 바뀌는 hash() 대신 numpy로 직접 해시함
+import threading
+
+import numpy as np
+
+NUM_PERM = 128
+SHINGLE_SIZE = 4
+_PRIME = np.uint64(1099511628211)
+# 순열마다 쓰는 고정 시드 (바꾸면 저장된 서명과 맞지 않음)
+_SEEDS = np.random.default_rng(20250110).integers(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+
+
+# splitmix64: 비슷한 입력의 비트를 고르게 섞음
+def _mix(values):
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+# 글자 k-gram 해시 (중복 제거)
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    text = "".join(text.lower().split())
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if not len(codes):
+        return np.empty(0, dtype=np.uint64)
+    size = min(size, len(codes))
+    n = len(codes) - size + 1
+    hashes = np.zeros(n, dtype=np.uint64)
+    for i in range(size):
+        hashes = hashes * _PRIME + codes[i:i + n]
+    return np.unique(_mix(hashes))
+
+
+# MinHash 서명 (uint32 NUM_PERM개), 빈 글이면 None
+def signature(text, size=SHINGLE_SIZE):
+    hashes = shingle_hashes(text, size)
+    if not len(hashes):
+        return None
+    return (_mix(hashes[:, None] ^ _SEEDS) >> np.uint64(32)).min(axis=0).astype(np.uint32)
+
+
+# DB 저장용 (리틀 엔디언 uint32 배열 바이트)
+def to_bytes(sig):
+    return sig.astype("<u4").tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+def similarity(a, b):
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+# threshold에서 놓치는 쌍(유사도 >= threshold인데 밴드가 하나도 같지 않음)과
+# 헛후보(유사도 < threshold인데 밴드가 같음) 확률의 가중합이 가장 작은 (밴드 수, 밴드 크기)
+# 헛후보는 유사도를 확인해서 걸러지므로 비교 비용만 들고, 놓친 쌍은 되돌릴 수 없어서 더 무겁게 봄
+FALSE_POSITIVE_WEIGHT = 0.2
+
+# numpy 2에서 trapz 이름이 trapezoid로 바뀜 (1.x도 지원)
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+
+def choose_bands(threshold, num_perm=NUM_PERM):
+    grid = np.linspace(0.0, 1.0, 201)
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        hit = 1 - (1 - grid ** rows) ** bands
+        false_positive = _trapezoid(np.where(grid < threshold, hit, 0.0), grid)
+        false_negative = _trapezoid(np.where(grid >= threshold, 1 - hit, 0.0), grid)
+        error = FALSE_POSITIVE_WEIGHT * false_positive + (1 - FALSE_POSITIVE_WEIGHT) * false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHashIndex:
+    def __init__(self, threshold=0.6, num_perm=NUM_PERM):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold는 0보다 크고 1 이하여야 합니다: {threshold}")
+        self.threshold = threshold
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+        self.tables = [{} for _ in range(self.bands)]  # 밴드 값 -> [키, ...]
+        self.items = {}  # 키 -> (서명, 값)
+        self.lock = threading.Lock()
+        # 통계
+        self.lookups = 0
+        self.comparisons = 0
+
+    def _band_keys(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    # 이미 있는 키면 서명과 값을 새것으로 바꿈 (캐시에서 다시 처리한 기사)
+    def add(self, key, sig, value=None):
+        with self.lock:
+            self._remove(key)
+            self.items[key] = (sig, value)
+            for table, band in zip(self.tables, self._band_keys(sig)):
+                table.setdefault(band, []).append(key)
+
+    # 키의 값 (없으면 None)
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+        return item[1] if item is not None else None
+
+    def remove(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        item = self.items.pop(key, None)
+        if item is None:
+            return
+        for table, band in zip(self.tables, self._band_keys(item[0])):
+            keys = table[band]
+            keys.remove(key)
+            if not keys:
+                del table[band]
+
+    # threshold 이상인 기사 [(유사도, 키, 값), ...] 비슷한 순 (exclude 키는 뺌)
+    def find(self, sig, exclude=None):
+        with self.lock:
+            candidates = set()
+            for table, band in zip(self.tables, self._band_keys(sig)):
+                candidates.update(table.get(band, ()))
+            candidates.discard(exclude)
+            self.lookups += 1
+            self.comparisons += len(candidates)
+            matches = []
+            for key in candidates:
+                other, value = self.items[key]
+                score = similarity(sig, other)
+                if score >= self.threshold:
+                    matches.append((score, key, value))
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return matches
+
+    def __len__(self):
+        return len(self.items)
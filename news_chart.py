@@ -0,0 +1,288 @@
+# 상세보기 차트 (캔들 + 거래량 + 뉴스 나온횟수) HTML 생성
+# - 시리즈를 numpy 배열로 만들어 컬럼별 JSON 배열 하나씩으로 넣고, 브라우저에서 객체 배열로 바꿈
+# - 보이는 기간을 고를 수 있고, 기간이 길면 주봉/월봉으로 OHLC를 합쳐서 점 수를 줄임
+# - 일봉인데 뉴스 점이 많으면 LTTB로 모양을 유지하면서 줄임
+# - 주가 / 뉴스 나온횟수는 DateFrame(날짜 위치표)으로 받아 보이는 기간을 슬라이스로 자름
+#   (DataFrame을 주면 그때 DateFrame으로 바꿈)
+import json
+
+import numpy as np
+
+from date_frame import DateFrame
+
+# 보이는 기간 (일, None이면 전체)
+RANGES = {"1개월": 31, "3개월": 92, "1년": 365, "3년": 365 * 3, "전체": None}
+# 봉 단위 (auto면 기간에 따라 고름)
+RESOLUTIONS = {"자동": "auto", "일봉": "D", "주봉": "W", "월봉": "M"}
+MAX_LINE_POINTS = 1500
+
+
+def auto_resolution(days):
+    if days <= 366:
+        return "D"
+    if days <= 366 * 5:
+        return "W"
+    return "M"
+
+
+# 주가 DateFrame (time + open/high/low/close/volume), DataFrame이면 바꿈
+def price_frame(stock_data):
+    if isinstance(stock_data, DateFrame):
+        return stock_data
+    return DateFrame.from_pandas(stock_data.rename(columns={"Volume": "volume"}), "time")
+
+
+# 뉴스 나온횟수 DateFrame (날짜 + 나온횟수), DataFrame이면 바꿈
+def news_frame(news_counts):
+    if isinstance(news_counts, DateFrame):
+        return news_counts
+    return DateFrame.from_pandas(news_counts[["날짜", "나온횟수"]], "날짜")
+
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def _price_arrays(prices):
+    values = [prices[column].astype("f8", copy=False) for column in PRICE_FIELDS]
+    valid = np.ones(len(prices), dtype=bool)
+    for column in values:
+        valid &= ~np.isnan(column)
+    if valid.all():
+        return prices.days, values
+    return prices.days[valid], [column[valid] for column in values]
+
+
+# 값이 다 있는 마지막 주가 날짜 (보통 마지막 행이므로 뒤에서부터 찾음, 없으면 None)
+def _last_price_day(prices):
+    for i in range(len(prices) - 1, -1, -1):
+        if not any(np.isnan(prices[column][i]) for column in PRICE_FIELDS):
+            return prices.days[i]
+    return None
+
+
+def _news_arrays(news):
+    times = news.days
+    values = news["나온횟수"].astype("f8")
+    # 같은 날짜는 합침 (날짜순으로 정렬돼 있으므로 바뀌는 곳마다 묶음)
+    if len(times) < 2 or (times[1:] != times[:-1]).all():
+        return times, values
+    starts = _group_starts(times)
+    return times[starts], np.add.reduceat(values, starts)
+
+
+# 날짜가 속한 주(월요일) / 달(1일)의 시작 날짜
+def period_start(times, unit):
+    if unit == "W":
+        days = times.astype("int64")
+        # 1970-01-01은 목요일이므로 4일을 빼서 월요일 기준으로 맞춤
+        return ((days - 4) // 7 * 7 + 4).astype("datetime64[D]")
+    if unit == "M":
+        return times.astype("datetime64[M]").astype("datetime64[D]")
+    return times
+
+
+def _group_starts(labels):
+    return np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+
+
+# 주봉/월봉으로 합치기: 시가는 첫날, 고가/저가는 최대/최소, 종가는 마지막 날, 거래량은 합
+def aggregate_ohlc(times, open_, high, low, close, volume, unit):
+    if unit == "D" or not len(times):
+        return times, open_, high, low, close, volume
+    labels = period_start(times, unit)
+    starts = _group_starts(labels)
+    ends = np.r_[starts[1:], len(times)] - 1
+    return (labels[starts], open_[starts], np.maximum.reduceat(high, starts), np.minimum.reduceat(low, starts),
+            close[ends], np.add.reduceat(volume, starts))
+
+
+def aggregate_sum(times, values, unit):
+    if unit == "D" or not len(times):
+        return times, values
+    labels = period_start(times, unit)
+    starts = _group_starts(labels)
+    return labels[starts], np.add.reduceat(values, starts)
+
+
+# Largest-Triangle-Three-Buckets: 처음/끝 점을 두고 나머지를 버킷으로 나눠 버킷마다 면적이 가장 큰 점 하나를 고름
+def lttb(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    xf = x.astype("f8")
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = xf[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs((xf[previous] - avg_x) * (y[start:end] - y[previous])
+                       - (xf[previous] - xf[start:end]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+# 차트에 넣을 컬럼별 배열 (기간 자르기, 봉 단위 합치기, 뉴스 점 줄이기)
+def build_series(stock_data, news_counts, range_days=None, resolution="auto", max_line_points=MAX_LINE_POINTS):
+    prices, news = price_frame(stock_data), news_frame(news_counts)
+
+    # 보이는 기간은 날짜 위치표로 자름 (전체 행 비교 없음)
+    last = max([day for day in (_last_price_day(prices), news.days[-1] if len(news) else None) if day is not None],
+               default=None)
+    if range_days and last is not None:
+        first = last - np.timedelta64(range_days, "D")
+        prices, news = prices.slice(first), news.slice(first)
+    times, (open_, high, low, close, volume) = _price_arrays(prices)
+    news_times, news_values = _news_arrays(news)
+
+    if resolution == "auto":
+        span = [t for t in (times, news_times) if len(t)]
+        days = int((max(t[-1] for t in span) - min(t[0] for t in span)).astype(int)) if span else 0
+        resolution = auto_resolution(days)
+
+    times, open_, high, low, close, volume = aggregate_ohlc(times, open_, high, low, close, volume, resolution)
+    news_times, news_values = aggregate_sum(news_times, news_values, resolution)
+    if len(news_times) > max_line_points:
+        picked = lttb(news_times.astype("int64"), news_values, max_line_points)
+        news_times, news_values = news_times[picked], news_values[picked]
+
+    return {
+        "resolution": resolution,
+        "time": np.datetime_as_string(times, unit="D").tolist(),
+        "open": np.round(open_, 2).tolist(),
+        "high": np.round(high, 2).tolist(),
+        "low": np.round(low, 2).tolist(),
+        "close": np.round(close, 2).tolist(),
+        "volume": np.round(volume / 1000, 1).tolist(),  # 거래량은 천 주 단위
+        "news_time": np.datetime_as_string(news_times, unit="D").tolist(),
+        "news": news_values.astype(np.int64).tolist(),
+    }
+
+
+def series_json(series):
+    return json.dumps(series, separators=(",", ":"))
+
+
+# 캔들 차트와 뉴스 차트를 결합한 HTML 생성 함수
+def create_combined_chart_html(stock_data, news_counts, range_days=None, resolution="auto"):
+    if not isinstance(news_counts, DateFrame) and '날짜' not in news_counts.columns:
+        raise ValueError("뉴스 데이터에 '날짜' 컬럼이 없습니다.")
+    payload = series_json(build_series(stock_data, news_counts, range_days, resolution))
+
+    # HTML 및 JavaScript 생성
+    chart_html = f"""
+    <div id="chart-container" style="height: 500px; position: relative;"></div>
+    <div id="tooltip" style="
+        position: absolute;
+        display: none;
+        background-color: rgba(255, 255, 255, 0.9);
+        border: 1px solid rgba(0, 0, 0, 0.5);
+        border-radius: 4px;
+        padding: 8px;
+        font-size: 12px;
+        color: #000;
+        pointer-events: none;
+        z-index: 1000;
+    "></div>
+    <script src="https://unpkg.com/lightweight-charts@4.2.1/dist/lightweight-charts.standalone.production.js"></script>
+    <script type="text/javascript">
+    document.addEventListener("DOMContentLoaded", function () {{
+        if (!window.LightweightCharts) {{
+            console.error("LightweightCharts 라이브러리가 로드되지 않았습니다.");
+            return;
+        }}
+
+        const chartContainer = document.getElementById('chart-container');
+        if (!chartContainer) {{
+            console.error("차트 컨테이너를 찾을 수 없습니다.");
+            return;
+        }}
+        const chart = LightweightCharts.createChart(chartContainer, {{
+            width: 600,
+            height: 500,
+            layout: {{
+                backgroundColor: '#ffffff',
+                textColor: '#000000',
+            }},
+            grid: {{
+                vertLines: {{ color: '#e0e0e0' }},
+                horzLines: {{ color: '#e0e0e0' }},
+            }},
+        }});
+
+        // 컬럼별 배열을 시리즈 데이터로 변환
+        const data = {payload};
+        const candleData = data.time.map((time, i) => ({{
+            time: time, open: data.open[i], high: data.high[i], low: data.low[i], close: data.close[i]
+        }}));
+        const volumeData = data.time.map((time, i) => ({{ time: time, value: data.volume[i] }}));
+        const newsData = data.news_time.map((time, i) => ({{ time: time, value: data.news[i] }}));
+
+        const candleSeries = chart.addCandlestickSeries();
+        candleSeries.setData(candleData);
+
+        const volumeSeries = chart.addHistogramSeries({{
+            priceScaleId: 'volume',
+            color: 'rgba(79, 16, 188, 0.8)',
+            priceFormat: {{
+                type: 'custom',
+                formatter: value => value.toLocaleString() + "K",
+            }},
+        }});
+        volumeSeries.setData(volumeData);
+
+        const newsSeries = chart.addLineSeries({{
+            priceScaleId: 'news',
+            color: 'rgba(0, 102, 255, 1.0)',
+            lineWidth: 2,
+            priceFormat: {{
+                type: 'custom',
+                formatter: value => value.toLocaleString() + "회",
+            }},
+        }});
+        newsSeries.setData(newsData);
+
+        chart.priceScale('volume').applyOptions({{ scaleMargins: {{ top: 0.6, bottom: 0 }} }});
+        chart.priceScale('news').applyOptions({{ scaleMargins: {{ top: 0.5, bottom: 0.2 }} }});
+
+        const tooltip = document.getElementById('tooltip');
+        chart.subscribeCrosshairMove((param) => {{
+            if (!param.point || !param.time) {{
+                tooltip.style.display = 'none';
+                return;
+            }}
+            const date = param.time;
+            const candle = param.seriesData.get(candleSeries);
+            const volume = param.seriesData.get(volumeSeries);
+            const news = param.seriesData.get(newsSeries);
+
+            if (candle) {{
+                tooltip.style.display = 'block';
+                tooltip.innerHTML = `
+                    <strong>${{date}}</strong><br>
+                    Open: ${{candle.open}}<br>
+                    High: ${{candle.high}}<br>
+                    Low: ${{candle.low}}<br>
+                    Close: ${{candle.close}}<br>
+                    Volume: ${{volume ? volume.value.toLocaleString() + 'K' : 'N/A'}}<br>
+                    나온 횟수: ${{news ? news.value.toLocaleString() + '회' : 'N/A'}}
+                `;
+                const chartRect = chartContainer.getBoundingClientRect();
+                tooltip.style.left = (param.point.x + chartRect.left + 15) + 'px';
+                tooltip.style.top = (param.point.y + chartRect.top + 15) + 'px';
+            }} else {{
+                tooltip.style.display = 'none';
+            }}
+        }});
+
+        chart.timeScale().fitContent();
+    }});
+    </script>
+    """
+
+    return chart_html
@@ -0,0 +1,220 @@
+# HTML 파서 백엔드 (bs4 / lxml / selectolax)
+# 목록 항목, 기사 제목, 기사 본문만 뽑아서 모든 백엔드가 같은 결과를 돌려주도록 맞춤
+# - parse_list(html): [(href, 날짜 문자열), ...]
+# - parse_article(html, body_selectors=None): (제목, 본문 텍스트), body_selectors는 출처별 본문 영역 (없으면 기본값)
+
+LIST_CONTAINER_SELECTOR = "div.grid-nm.id_thum_stock_news"
+LIST_ITEM_SELECTOR = f"{LIST_CONTAINER_SELECTOR} ul.targetAdd li a"
+FRAGMENT_ITEM_SELECTOR = "li a"  # '더보기'로 li 조각만 받은 경우
+
+# 기사 본문 영역 (앞에서부터 찾아서 처음 나온 것을 사용, 없으면 페이지 전체)
+ARTICLE_BODY_SELECTORS = ["div.news_body", "div[itemprop='articleBody']", "#newsContent", "article"]
+IGNORED_TAGS = ["script", "style", "noscript"]
+
+NO_TITLE = "제목 없음"
+
+
+# 공백 정리 (백엔드마다 텍스트 노드 경계의 공백이 달라서 한 칸으로 통일)
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+def _has_class(class_value, name):
+    return name in (class_value or "").split()
+
+
+class Bs4Parser:
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self.BeautifulSoup = BeautifulSoup
+
+    def parse_list(self, html):
+        soup = self.BeautifulSoup(html, "html.parser")
+        news_items = soup.select(LIST_ITEM_SELECTOR)
+        if not news_items and not soup.select_one(LIST_CONTAINER_SELECTOR):
+            news_items = soup.select(FRAGMENT_ITEM_SELECTOR)
+
+        results = []
+        for item in news_items:
+            link = item.get("href")
+            if not link:
+                continue
+            # 뉴스 날짜 및 시간 가져오기
+            data_info = item.find_next("span", class_="data_info")
+            date_span = data_info.find("span") if data_info else None
+            if date_span:
+                results.append((link, normalize_text(date_span.get_text())))
+        return results
+
+    def parse_article(self, html, body_selectors=None):
+        soup = self.BeautifulSoup(html, "html.parser")
+        title = normalize_text(soup.title.get_text()) if soup.title else ""
+        for node in soup(IGNORED_TAGS):
+            node.decompose()
+        body = None
+        for selector in body_selectors or ARTICLE_BODY_SELECTORS:
+            body = soup.select_one(selector)
+            if body:
+                break
+        body = body or soup
+        return title or NO_TITLE, normalize_text(body.get_text(" "))
+
+
+class LxmlParser:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml.cssselect import CSSSelector
+        self.lxml_html = lxml.html
+        self.list_items = CSSSelector(LIST_ITEM_SELECTOR)
+        self.list_container = CSSSelector(LIST_CONTAINER_SELECTOR)
+        self.fragment_items = CSSSelector(FRAGMENT_ITEM_SELECTOR)
+        self.CSSSelector = CSSSelector
+        self.compiled = {}  # 본문 영역 선택자 -> 컴파일한 CSSSelector
+
+    def _selector(self, selector):
+        if selector not in self.compiled:
+            self.compiled[selector] = self.CSSSelector(selector)
+        return self.compiled[selector]
+
+    def _document(self, html):
+        # 빈 문서는 lxml이 예외를 내므로 빈 html로 대신함
+        return self.lxml_html.document_fromstring(html if html.strip() else "<html></html>")
+
+    def parse_list(self, html):
+        doc = self._document(html)
+        news_items = self.list_items(doc)
+        if not news_items and not self.list_container(doc):
+            news_items = self.fragment_items(doc)
+
+        results = []
+        for item in news_items:
+            link = item.get("href")
+            if not link:
+                continue
+            # bs4의 find_next와 같게: 자기 자손을 포함해 문서 순서상 다음에 나오는 span.data_info
+            data_info = item.xpath(
+                "(descendant::span | following::span)"
+                "[contains(concat(' ', normalize-space(@class), ' '), ' data_info ')][1]")
+            date_span = data_info[0].xpath("(.//span)[1]") if data_info else None
+            if date_span:
+                results.append((link, normalize_text(date_span[0].text_content())))
+        return results
+
+    def parse_article(self, html, body_selectors=None):
+        doc = self._document(html)
+        title_node = doc.find(".//title")
+        title = normalize_text(title_node.text_content()) if title_node is not None else ""
+        for node in doc.xpath("//script | //style | //noscript | //comment()"):
+            node.drop_tree()
+        body = None
+        for selector in body_selectors or ARTICLE_BODY_SELECTORS:
+            found = self._selector(selector)(doc)
+            if found:
+                body = found[0]
+                break
+        if body is None:
+            body = doc
+        return title or NO_TITLE, normalize_text(" ".join(body.itertext()))
+
+
+class SelectolaxParser:
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self.HTMLParser = LexborHTMLParser
+
+    # 문서 순서상 다음 노드 (자손 먼저, 그다음 형제, 부모의 형제)
+    @staticmethod
+    def _next_node(node):
+        if node.child is not None:
+            return node.child
+        while node is not None:
+            if node.next is not None:
+                return node.next
+            node = node.parent
+        return None
+
+    # 자손 중 문서 순서상 처음 나오는 tag
+    @staticmethod
+    def _first_descendant(node, tag):
+        stack = []
+        current = node.child
+        while current is not None or stack:
+            if current is None:
+                current = stack.pop()
+                continue
+            if current.tag == tag:
+                return current
+            if current.next is not None:
+                stack.append(current.next)
+            current = current.child
+        return None
+
+    def parse_list(self, html):
+        tree = self.HTMLParser(html)
+        news_items = tree.css(LIST_ITEM_SELECTOR)
+        if not news_items and tree.css_first(LIST_CONTAINER_SELECTOR) is None:
+            news_items = tree.css(FRAGMENT_ITEM_SELECTOR)
+
+        results = []
+        for item in news_items:
+            link = item.attributes.get("href")
+            if not link:
+                continue
+            data_info = self._next_node(item)
+            while data_info is not None and not (
+                    data_info.tag == "span" and _has_class(data_info.attributes.get("class"), "data_info")):
+                data_info = self._next_node(data_info)
+            date_span = self._first_descendant(data_info, "span") if data_info is not None else None
+            if date_span is not None:
+                results.append((link, normalize_text(date_span.text())))
+        return results
+
+    def parse_article(self, html, body_selectors=None):
+        tree = self.HTMLParser(html)
+        title_node = tree.css_first("title")
+        title = normalize_text(title_node.text()) if title_node is not None else ""
+        tree.strip_tags(IGNORED_TAGS)
+        body = None
+        for selector in body_selectors or ARTICLE_BODY_SELECTORS:
+            body = tree.css_first(selector)
+            if body is not None:
+                break
+        if body is None:
+            body = tree.root
+        text = body.text(separator=" ") if body is not None else ""
+        return title or NO_TITLE, normalize_text(text)
+
+
+PARSERS = {parser.name: parser for parser in (Bs4Parser, LxmlParser, SelectolaxParser)}
+
+
+# 설치된 백엔드 이름 목록
+def available_parsers():
+    names = []
+    for name, parser_class in PARSERS.items():
+        try:
+            parser_class()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+# name이 auto면 selectolax > lxml > bs4 순서로 설치된 것을 사용
+def get_parser(name="auto"):
+    if name == "auto":
+        for candidate in ("selectolax", "lxml"):
+            try:
+                return PARSERS[candidate]()
+            except ImportError:
+                continue
+        return Bs4Parser()
+    if name not in PARSERS:
+        raise ValueError(f"지원하지 않는 HTML 파서입니다: {name} (가능: {', '.join(PARSERS)})")
+    return PARSERS[name]()
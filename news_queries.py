@@ -0,0 +1,78 @@
+# 대시보드(chartF.py) 조회 쿼리
+# 화면에 필요한 날짜/항목만 WHERE / ORDER BY / LIMIT으로 DB에서 골라 옴
+# - 메인 페이지: 선택한 날짜(없으면 MAX(날짜))의 TOP 10만 일간 집계 테이블에서 읽음
+# - 상세 페이지: 들어갔을 때만 뉴스 링크/제목을 읽음
+# 날짜 조건은 모두 날짜로 시작하는 인덱스를 탐
+# (기업별_일간집계 / 업종별_일간집계 PK, 기업별_뉴스언급 idx_뉴스언급_날짜, 뉴스기사 idx_뉴스기사_날짜)
+# 모든 함수는 열린 pymysql 연결을 받음 (연결 관리와 캐시는 chartF.py에서 함)
+import pandas as pd
+
+TOP10_TABLES = {'기업명': '기업별_일간집계', '업종': '업종별_일간집계'}
+ARTICLE_COLUMNS = ['날짜', '기업명', '종목코드', '시장', '뉴스링크', '뉴스제목', '나온횟수']
+
+
+# 선택한 날짜에 데이터가 있으면 그 날짜, 없으면 가장 최근 날짜 (데이터가 아예 없으면 None)
+def resolve_date(conn, selected_date):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM 기업별_일간집계 WHERE 날짜 = %s LIMIT 1", (selected_date,))
+        if cursor.fetchone():
+            return selected_date
+        cursor.execute("SELECT MAX(날짜) FROM 기업별_일간집계")
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+# 날짜의 기업별(또는 업종별) TOP 10 ((날짜, 나온횟수) 인덱스를 거꾸로 읽어 10개만 가져옴)
+def load_top10(conn, date, column):
+    if column not in TOP10_TABLES:
+        raise ValueError(f"지원하지 않는 조회 기준입니다: {column}")
+    query = f"""
+    SELECT
+        {column}, 나온횟수
+    FROM
+        {TOP10_TABLES[column]}
+    WHERE
+        날짜 = %s
+    ORDER BY
+        나온횟수 DESC
+    LIMIT 10
+    """
+    top10 = pd.read_sql(query, conn, params=(date,))
+    top10.index = top10.index + 1
+    return top10
+
+
+# 선택한 날짜/기업(또는 업종)의 뉴스 링크와 제목 (기업별로 목록으로 묶음)
+def load_news_articles(conn, date, column, value):
+    if column not in ('기업명', '업종'):
+        raise ValueError(f"지원하지 않는 조회 기준입니다: {column}")
+    query = f"""
+    SELECT
+        m.날짜, m.기업명, m.종목코드, m.시장, a.뉴스링크, a.뉴스제목
+    FROM
+        기업별_뉴스언급 m
+        JOIN 뉴스기사 a ON a.url_hash = m.url_hash
+    WHERE
+        m.날짜 = %s AND m.{column} = %s
+    ORDER BY
+        m.기업명, a.수집시각
+    """
+    rows = pd.read_sql(query, conn, params=(date, value))
+    if rows.empty:
+        return pd.DataFrame(columns=ARTICLE_COLUMNS)
+    news_df = (rows.groupby(['날짜', '기업명', '종목코드', '시장'], sort=False)
+               .agg(뉴스링크=('뉴스링크', list), 뉴스제목=('뉴스제목', list))
+               .reset_index())
+    news_df['나온횟수'] = news_df['뉴스링크'].str.len()
+    return news_df
+
+
+# 종목의 날짜별 나온횟수 (차트용)
+def load_news_counts(conn, company_code):
+    query = """
+    SELECT 날짜, 나온횟수
+    FROM 기업별_일간집계
+    WHERE 종목코드 = %s
+    ORDER BY 날짜
+    """
+    return pd.read_sql(query, conn, params=(company_code,))
@@ -0,0 +1,134 @@
+# 뉴스 출처 어댑터
+# 출처마다 다른 부분만 모아 둠 (목록 수집 순서, 체크포인트, 중복 제거, 저장은 sql.py가 출처와 상관없이 같은 방식으로 처리)
+# - name: 출처 이름 (체크포인트 키, 통계 이름)
+# - list_page_url(page): 목록 페이지 주소 (더 없으면 None)
+# - parse_list(html): [(정규화한 링크, 'YYYY-MM-DD HH:MM' 발행 시각), ...] 최신순
+# - parse_time(text): 출처가 표시하는 발행 시각을 datetime으로
+# - body_selectors: 기사 본문 영역 선택자 (기사마다 파싱 단계에 같이 넘김)
+# - browse_url: 목록 페이지 요청이 안 될 때 selenium으로 열 주소 (지원 안 하면 None)
+# NEWS_SOURCES 설정 예: "edaily:0701,edaily:0702,rss:hankyung=https://www.hankyung.com/feed/finance"
+import datetime
+import email.utils
+import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, urljoin
+
+from news_parser import ARTICLE_BODY_SELECTORS
+
+DEFAULT_EDAILY_URL = "https://m.edaily.co.kr"
+DEFAULT_LIST_PAGE_URL = "{base_url}/NewsList/{section}?page={page}"
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+# 링크에서 지우는 추적용 파라미터 (utm_로 시작하는 것도 지움)
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "from", "nclick", "rss"}
+
+
+# 같은 기사를 가리키는 링크를 하나로 맞춤 (호스트 소문자, #이하 제거, 추적용 파라미터 제거)
+# 남은 쿼리는 순서와 인코딩을 그대로 둬서 이미 저장된 링크(url_hash)와 같게 유지
+def canonical_url(link):
+    parts = urlsplit(link.strip())
+    query = parts.query
+    params = parse_qsl(query, keep_blank_values=True)
+    kept = [(key, value) for key, value in params
+            if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS]
+    if len(kept) != len(params):
+        query = urlencode(kept)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+
+# '2025-01-10 09:12' / '2025-01-10 09:12:30' / '2025-01-10'
+def parse_iso_time(date_text):
+    for date_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(date_text.strip()[:19], date_format)
+        except ValueError:
+            continue
+    return datetime.datetime.strptime(date_text.split(" ")[0], "%Y-%m-%d")
+
+
+# 이데일리 뉴스 목록 섹션
+class EdailySource:
+    kind = "edaily"
+
+    def __init__(self, section, parser, base_url=DEFAULT_EDAILY_URL, list_page_url=DEFAULT_LIST_PAGE_URL):
+        self.section = section
+        self.parser = parser
+        self.base_url = base_url.rstrip("/")
+        self.list_page_template = list_page_url
+        self.name = f"edaily/{section}"
+        self.browse_url = f"{self.base_url}/NewsList/{section}"
+        self.body_selectors = tuple(ARTICLE_BODY_SELECTORS)
+
+    def list_page_url(self, page):
+        return self.list_page_template.format(base_url=self.base_url, section=self.section, page=page)
+
+    def parse_time(self, date_text):
+        return parse_iso_time(date_text)
+
+    def parse_list(self, html):
+        items = []
+        for link, date_text in self.parser.parse_list(html):
+            link = link if link.startswith("http") else f"{self.base_url}{link}"
+            items.append((canonical_url(link), date_text))
+        return items
+
+
+# RSS 2.0 피드 (페이지가 하나뿐이라 피드 한 번에 담긴 기사까지만 수집)
+class RssSource:
+    kind = "rss"
+    browse_url = None
+
+    def __init__(self, name, feed_url, body_selectors=ARTICLE_BODY_SELECTORS):
+        self.name = f"rss/{name}"
+        self.feed_url = feed_url
+        self.body_selectors = tuple(body_selectors)
+
+    def list_page_url(self, page):
+        return self.feed_url if page == 1 else None
+
+    # RFC 822 날짜 ('Fri, 10 Jan 2025 09:12:00 +0900')를 한국 시각으로
+    def parse_time(self, date_text):
+        published = email.utils.parsedate_to_datetime(date_text.strip())
+        if published.tzinfo is not None:
+            published = published.astimezone(KST).replace(tzinfo=None)
+        return published
+
+    def parse_list(self, html):
+        root = ET.fromstring(html)
+        items = []
+        for item in root.iter("item"):
+            link = (item.findtext("link") or "").strip()
+            date_text = item.findtext("pubDate") or ""
+            if not link or not date_text:
+                continue
+            try:
+                published = self.parse_time(date_text)
+            except (TypeError, ValueError):
+                continue
+            items.append((published, canonical_url(urljoin(self.feed_url, link))))
+        # 피드는 최신순이 아닐 수 있으므로 정렬 (체크포인트 / 기준 날짜에서 멈추려면 최신순이어야 함)
+        items.sort(key=lambda item: item[0], reverse=True)
+        return [(link, published.strftime(DATE_FORMAT)) for published, link in items]
+
+
+# NEWS_SOURCES 문자열에서 출처 목록 만들기 ('종류:값'을 쉼표로 구분)
+# - edaily:<섹션>
+# - rss:<이름>=<피드 주소>
+def load_sources(spec, parser, base_url=DEFAULT_EDAILY_URL, list_page_url=DEFAULT_LIST_PAGE_URL):
+    sources = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kind, _, value = entry.partition(":")
+        if kind == "edaily" and value:
+            sources.append(EdailySource(value, parser, base_url, list_page_url))
+        elif kind == "rss" and "=" in value:
+            name, _, feed_url = value.partition("=")
+            sources.append(RssSource(name.strip(), feed_url.strip()))
+        else:
+            raise ValueError(f"알 수 없는 뉴스 출처 설정입니다: {entry} (예: edaily:0701, rss:이름=https://...)")
+    names = [source.name for source in sources]
+    if len(set(names)) != len(names):
+        raise ValueError(f"뉴스 출처 이름이 겹칩니다: {', '.join(names)}")
+    return sources
@@ -0,0 +1,162 @@
+# 기사 파싱 + 종목 매칭 단계
+# 워커 프로세스가 기사 HTML을 받아 (날짜, 링크, 제목, 종목코드들, 오류, MinHash 서명 바이트)만 돌려줌
+# 워커가 여러 개면 묶음(chunk)이 끝나는 대로 결과를 돌려줌 (입력 순서와 다를 수 있음, 결과 내용은 워커 수와 상관없이 같음)
+# 입력이 잠시 끊기면 덜 찬 묶음도 바로 보내서, 앞 단계가 느릴 때도 파싱 결과가 저장 단계로 바로 넘어감
+# 입력은 (링크, 날짜, HTML[, 출처별 본문 영역 선택자])
+# 기사별 파싱 시간은 parse 히스토그램으로 기록 (워커 프로세스에서 잰 시간을 결과와 같이 받아 옴)
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import metrics
+import near_dup
+from news_parser import get_parser
+from stock_matcher import StockMatcher
+
+_END = object()  # 입력 끝
+_WAKE = object()  # 묶음 하나가 끝났음 (입력을 기다리던 map을 깨움)
+
+# 워커 프로세스마다 한 번 만드는 (파서, 매처, 서명 계산 여부)
+_worker_state = None
+
+
+def init_worker(db_stock_data, parser_name, match_names, signatures=False):
+    global _worker_state
+    _worker_state = (get_parser(parser_name), StockMatcher(db_stock_data, match_names=match_names), signatures)
+
+
+# 기사 하나 처리: (날짜, 링크, 제목, 종목코드 튜플, 오류 메시지, 서명)
+# signatures면 거의 같은 기사 찾기용 MinHash 서명(제목 + 본문)도 계산 (아니면 None)
+def parse_article(parser, matcher, full_link, date_text, html, body_selectors=None, signatures=False):
+    date_str = date_text.split(" ")[0]
+    try:
+        title, body = parser.parse_article(html, body_selectors)
+        sig = near_dup.signature(f"{title} {body}") if signatures else None
+        return (date_str, full_link, title, tuple(sorted(matcher.find_codes(body))), None,
+                near_dup.to_bytes(sig) if sig is not None else None)
+    except Exception as e:
+        return date_str, full_link, None, (), str(e), None
+
+
+# 묶음 처리: (결과 목록, 기사별 걸린 시간 목록)
+def parse_chunk(items):
+    parser, matcher, signatures = _worker_state
+    results = []
+    durations = []
+    for item in items:
+        start = time.perf_counter()
+        results.append(parse_article(parser, matcher, *item, signatures=signatures))
+        durations.append(time.perf_counter() - start)
+    return results, durations
+
+
+def _chunk_results(future):
+    results, durations = future.result()
+    for seconds in durations:
+        metrics.observe("parse", seconds)
+    return results
+
+
+class ParseStage:
+    def __init__(self, db_stock_data, workers=1, parser_name="auto", match_names=True, matcher=None,
+                 chunk_size=4, max_pending=None, signatures=False, idle_wait=0.05):
+        self.workers = workers
+        self.signatures = signatures
+        self.chunk_size = chunk_size
+        self.idle_wait = idle_wait  # 입력이 이 시간(초) 동안 없으면 덜 찬 묶음도 보냄
+        # 결과를 기다리는 묶음 수 상한 (HTML이 메모리에 무한정 쌓이지 않도록)
+        self.max_pending = max_pending or workers * 4
+        if workers <= 1:
+            # 워커 1개면 프로세스를 띄우지 않고 현재 프로세스에서 처리
+            self.executor = None
+            self.parser = get_parser(parser_name)
+            self.matcher = matcher or StockMatcher(db_stock_data, match_names=match_names)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                                initargs=(db_stock_data, parser_name, match_names, signatures))
+
+    # (링크, 날짜, HTML)들을 받아 파싱 결과를 돌려줌 (워커 1개면 입력 순서, 여러 개면 끝나는 순서)
+    def map(self, items):
+        if self.executor is None:
+            for item in items:
+                with metrics.span("parse"):
+                    result = parse_article(self.parser, self.matcher, *item, signatures=self.signatures)
+                yield result
+            return
+
+        # 입력은 스레드가 읽어서 inbox에 넣음 (입력을 기다리는 동안에도 끝난 묶음을 돌려주고 덜 찬 묶음을 보내도록)
+        # slots: 읽어 두는 입력 수 상한, 끝난 묶음은 _WAKE를 넣어 기다리던 get을 깨움
+        inbox = queue.Queue()
+        slots = threading.Semaphore(self.max_pending * self.chunk_size)
+        stopped = threading.Event()
+        errors = []  # 입력을 읽다가 난 예외 (map을 부른 쪽으로 다시 던짐)
+
+        def feed():
+            try:
+                for item in items:
+                    while not slots.acquire(timeout=0.5):
+                        if stopped.is_set():
+                            return
+                    inbox.put(item)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                inbox.put(_END)
+
+        def submit(chunk):
+            future = self.executor.submit(parse_chunk, chunk)
+            future.add_done_callback(lambda _: inbox.put(_WAKE))
+            pending.add(future)
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        pending = set()
+        chunk = []
+        ended = False
+        try:
+            while not ended or chunk or pending:
+                full = len(pending) >= self.max_pending
+                if ended or (full and len(chunk) >= self.chunk_size):
+                    if chunk and not full:
+                        submit(chunk)
+                        chunk = []
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            pending.discard(future)
+                            yield from _chunk_results(future)
+                    continue
+
+                try:
+                    item = inbox.get(timeout=self.idle_wait if chunk else None)
+                except queue.Empty:
+                    item = None  # 입력이 잠시 없음
+                if item is _END:
+                    ended = True
+                elif item is not None and item is not _WAKE:
+                    chunk.append(item)
+                    slots.release()
+                if chunk and not full and (len(chunk) >= self.chunk_size or item is None):
+                    submit(chunk)
+                    chunk = []
+
+                for future in [future for future in pending if future.done()]:
+                    pending.discard(future)
+                    yield from _chunk_results(future)
+            if errors:
+                raise errors[0]
+        finally:
+            stopped.set()
+            for future in pending:
+                future.cancel()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
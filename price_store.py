@@ -0,0 +1,140 @@
+# 종목별 일봉(OHLCV) 로컬 저장소
+# 티커마다 구조화 numpy 배열 파일(.npy) 하나에 날짜순으로 저장하고 읽을 때는 메모리 매핑으로 바로 엶
+# 새로 고칠 때는 마지막 저장 날짜부터만 받아서 뒤에 붙임 (마지막 날은 장중 값일 수 있어 다시 받아 덮어씀)
+# provider(ticker, start, end)는 DataFrame(날짜 인덱스, open/high/low/close/volume 컬럼)을 돌려주는 함수
+# (기본은 yfinance, 테스트/벤치마크에서는 가짜 provider를 넣음)
+import datetime
+import importlib
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from date_frame import DateFrame
+
+PRICE_DTYPE = np.dtype([
+    ("time", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+# yfinance 결과를 open/high/low/close/volume 컬럼으로 정리
+def yfinance_provider(ticker, start, end):
+    import yfinance as yf
+
+    data = yf.download(ticker, start=start, end=end + datetime.timedelta(days=1), progress=False)
+    # MultiIndex (('Close', '005930.KS') 같은 튜플 컬럼) 평탄화
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    data.columns = [str(col).strip().lower() for col in data.columns]
+    return data
+
+
+# PRICE_PROVIDER 설정 값으로 provider 찾기 ("yfinance" 또는 "모듈:함수", 벤치마크에서 가짜 provider를 넣을 때 씀)
+def load_provider(spec="yfinance"):
+    if not spec or spec == "yfinance":
+        return yfinance_provider
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"PRICE_PROVIDER는 yfinance 또는 '모듈:함수' 형식이어야 합니다: {spec}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class PriceStore:
+    def __init__(self, directory, provider=yfinance_provider, start="2003-01-01", refresh_interval=3600):
+        self.directory = directory
+        self.provider = provider
+        self.start = datetime.date.fromisoformat(start)
+        self.refresh_interval = refresh_interval  # 이 시간(초) 안에 확인한 티커는 다시 받지 않음
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, ticker):
+        return os.path.join(self.directory, f"{ticker}.npy")
+
+    # 저장된 배열 (메모리 매핑, 없으면 빈 배열)
+    def read(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=PRICE_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    @staticmethod
+    def _to_array(data):
+        data = data.dropna(subset=[column for column in PRICE_COLUMNS if column in data.columns])
+        array = np.empty(len(data), dtype=PRICE_DTYPE)
+        array["time"] = pd.to_datetime(data.index).values.astype("datetime64[D]")
+        for column in PRICE_COLUMNS:
+            array[column] = data[column].to_numpy(dtype="f8") if column in data.columns else np.nan
+        return np.sort(array, order="time")
+
+    def _write(self, ticker, array):
+        path = self._path(ticker)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+        np.save(temp_path, array)
+        os.replace(temp_path, path)
+
+    # 마지막 저장 날짜 이후만 받아서 붙임. 늘어난 행 수 반환
+    # 마지막 저장 날짜가 오늘이어도 다시 받음 (장중 값을 덮어씀, 얼마나 자주 받을지는 _refresh_if_due가 정함)
+    def refresh(self, ticker, today=None):
+        today = today or datetime.date.today()
+        path = self._path(ticker)
+        # 파일을 바꿔치기해야 하므로 메모리 매핑 없이 읽음 (윈도우에서는 매핑된 파일을 바꿀 수 없음)
+        stored = np.load(path) if os.path.exists(path) else np.empty(0, dtype=PRICE_DTYPE)
+        if len(stored):
+            if stored["time"][-1] > np.datetime64(today):
+                return 0
+            start = stored["time"][-1].astype(datetime.date)
+        else:
+            start = self.start
+
+        fetched = self._to_array(self.provider(ticker, start, today))
+        fetched = fetched[fetched["time"] >= np.datetime64(start)]
+        if not len(fetched):
+            return 0
+        # 마지막 저장 날짜 행은 새로 받은 값으로 바꿈
+        array = np.concatenate([stored[stored["time"] < fetched["time"][0]], fetched])
+        self._write(ticker, array)
+        return len(array) - len(stored)
+
+    # refresh_interval이 지났을 때만 새로 고침 (받기에 실패해도 저장된 값이 있으면 그대로 씀)
+    def _refresh_if_due(self, ticker, today=None):
+        path = self._path(ticker)
+        if not os.path.exists(path) or time.time() - os.path.getmtime(path) >= self.refresh_interval:
+            try:
+                self.refresh(ticker, today)
+                if os.path.exists(path):
+                    os.utime(path)  # 확인한 시각
+            except Exception as e:
+                if not os.path.exists(path):
+                    raise
+                print(f"[WARNING] {ticker} 주가 새로 고침 실패, 저장된 데이터를 사용합니다: {e}")
+
+    # 차트용 DataFrame
+    def get(self, ticker, today=None):
+        self._refresh_if_due(ticker, today)
+        return self.to_frame(self.read(ticker))
+
+    # 차트용 DateFrame (저장된 배열이 이미 날짜순이라 날짜 변환 / 정렬 없이 필드를 그대로 열로 씀)
+    # 매핑을 잡고 있으면 다른 세션이 파일을 바꿔치기할 수 없으므로 (윈도우) 복사해서 씀
+    def get_frame(self, ticker, today=None):
+        self._refresh_if_due(ticker, today)
+        return DateFrame.from_records(np.array(self.read(ticker)), "time")
+
+    # 차트가 쓰는 모양 (time, open, high, low, close, Volume)
+    @staticmethod
+    def to_frame(array):
+        return pd.DataFrame({
+            "time": pd.to_datetime(array["time"]),
+            "open": array["open"],
+            "high": array["high"],
+            "low": array["low"],
+            "close": array["close"],
+            "Volume": array["volume"],
+        })
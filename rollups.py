@@ -0,0 +1,68 @@
+# 일간 집계 테이블(기업별_일간집계 / 업종별_일간집계) 확인 도구
+# 종목 언급 원본으로 다시 센 값과 집계 테이블을 비교해서 어긋난 곳을 출력
+# 사용법: py rollups.py check [--since YYYY-MM-DD] [--fix]
+#         py rollups.py rebuild [--since YYYY-MM-DD]
+import argparse
+
+import sql
+
+SHOW_LIMIT = 20
+
+
+def _counts(cursor, query, since):
+    cursor.execute(query.format(where="WHERE 날짜 >= %s" if since else ""), (since,) if since else ())
+    return {(str(date_value), key): int(count) for date_value, key, count in cursor.fetchall()}
+
+
+def _compare(name, raw, rollup):
+    mismatches = []
+    for key in sorted(set(raw) | set(rollup)):
+        if raw.get(key, 0) != rollup.get(key, 0):
+            mismatches.append((key, raw.get(key, 0), rollup.get(key, 0)))
+    for (date_str, key), raw_count, rollup_count in mismatches[:SHOW_LIMIT]:
+        print(f"[WARNING] {name} {date_str} {key}: 원본 {raw_count}회, 집계 {rollup_count}회")
+    if len(mismatches) > SHOW_LIMIT:
+        print(f"[WARNING] {name}: ... 외 {len(mismatches) - SHOW_LIMIT}건")
+    print(f"[INFO] {name}: {len(raw)}개 항목 중 {len(mismatches)}개 불일치")
+    return len(mismatches)
+
+
+def check(cursor, since=None):
+    company_raw = _counts(cursor, """
+        SELECT 날짜, 종목코드, COUNT(*) FROM 기업별_뉴스언급 {where} GROUP BY 날짜, 종목코드
+    """, since)
+    company_rollup = _counts(cursor, """
+        SELECT 날짜, 종목코드, 나온횟수 FROM 기업별_일간집계 {where}
+    """, since)
+    sector_raw = _counts(cursor, """
+        SELECT 날짜, 업종, COUNT(*) FROM 기업별_뉴스언급 {where} GROUP BY 날짜, 업종
+    """, since)
+    # 업종이 없는 종목은 업종별 집계에 들어가지 않음
+    sector_raw = {key: count for key, count in sector_raw.items() if key[1] is not None}
+    sector_rollup = _counts(cursor, """
+        SELECT 날짜, 업종, 나온횟수 FROM 업종별_일간집계 {where}
+    """, since)
+    return _compare("기업별_일간집계", company_raw, company_rollup) + _compare("업종별_일간집계", sector_raw, sector_rollup)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="일간 집계 테이블 확인 / 재생성")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--since", help="이 날짜(YYYY-MM-DD) 이후만 확인 / 재생성")
+    parser.add_argument("--fix", action="store_true", help="check에서 불일치가 있으면 재생성")
+    args = parser.parse_args()
+
+    conn = sql.connect_to_db()
+    cursor = conn.cursor()
+    sql.ensure_table_exists(cursor)
+    mismatched = 0
+    if args.command == "rebuild":
+        sql.rebuild_rollups(cursor, conn, args.since)
+    else:
+        mismatched = check(cursor, args.since)
+        if mismatched and args.fix:
+            sql.rebuild_rollups(cursor, conn, args.since)
+            mismatched = check(cursor, args.since)
+    cursor.close()
+    conn.close()
+    exit(1 if mismatched else 0)
@@ -1,19 +1,26 @@
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import datetime
+import hashlib
 import pymysql
 import os
 from dotenv import load_dotenv
-import re
 import requests
 import time
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import threading
+import queue
+import argparse
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from stock_matcher import StockMatcher
+from news_parser import get_parser, LIST_CONTAINER_SELECTOR, NO_TITLE
+from news_sources import EdailySource, load_sources, parse_iso_time
+from parse_stage import ParseStage
+from article_cache import ArticleCache
+from stock_master import StockMaster
+import data_version
+import metrics
+import near_dup
 
 today_date = datetime.datetime.today()  # 오늘 날짜
 target_date = today_date - datetime.timedelta(days=1)  # 오늘 날짜의 전날
@@ -25,6 +32,61 @@ target_date_str = target_date.strftime("%Y-%m-%d")
 # MySQL 연결 설정
 load_dotenv()  # .env 파일 읽기
 
+# 뉴스 사이트 주소 (로컬 테스트 서버로 바꿔서 실행할 수 있도록 .env에서 읽음)
+BASE_URL = os.getenv("NEWS_BASE_URL", "https://m.edaily.co.kr").rstrip("/")
+
+# 기사 수집 동시성 설정
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))  # 동시에 받는 기사 수
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "4"))  # 같은 호스트에 동시에 보내는 요청 수
+FETCH_DELAY = float(os.getenv("FETCH_DELAY", "0.1"))  # 같은 호스트 요청 사이 최소 간격(초)
+FETCH_TIMEOUT = 10
+
+# 뉴스 목록 수집 방식: http(목록 페이지 직접 요청) 또는 selenium(크롬으로 '더보기' 클릭)
+LINK_DISCOVERY = os.getenv("LINK_DISCOVERY", "http")
+# 이데일리 목록 페이지 주소 ({base_url}, {section}, {page}가 채워짐)
+NEWS_SECTION = os.getenv("NEWS_SECTION", "0701")  # 이데일리 뉴스 목록 섹션 (NEWS_SOURCES가 없을 때)
+LIST_PAGE_URL = os.getenv("NEWS_LIST_PAGE_URL", "{base_url}/NewsList/{section}?page={page}")
+# 수집할 출처 목록 (예: "edaily:0701,edaily:0702,rss:hankyung=https://...", news_sources.py 참고)
+# 출처 이름(edaily/0701 등)이 크롤링_체크포인트의 섹션 키
+NEWS_SOURCES = os.getenv("NEWS_SOURCES", f"edaily:{NEWS_SECTION}")
+MAX_LIST_PAGES = int(os.getenv("MAX_LIST_PAGES", "200"))
+
+# DB 쓰기 배치 설정
+DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "500"))  # 한 번에 저장하는 최대 행 수
+DB_FLUSH_INTERVAL = float(os.getenv("DB_FLUSH_INTERVAL", "5"))  # 버퍼를 비우는 최대 간격(초)
+
+# 기업명으로도 종목을 찾을지 여부 (0이면 종목코드만 찾음)
+MATCH_COMPANY_NAMES = os.getenv("MATCH_COMPANY_NAMES", "1") != "0"
+
+# 기사 파싱/종목 매칭 프로세스 수 (1이면 프로세스를 띄우지 않고 현재 프로세스에서 처리)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "1"))
+
+# 파이프라인 단계 사이 큐 크기와 진행 상황 출력 간격(초, 0이면 출력 안 함)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "100"))
+PIPELINE_REPORT_INTERVAL = float(os.getenv("PIPELINE_REPORT_INTERVAL", "5"))
+
+# 기사 HTML 디스크 캐시 (ARTICLE_CACHE_DIR를 비우면 사용 안 함)
+ARTICLE_CACHE_DIR = os.getenv("ARTICLE_CACHE_DIR", "article_cache")
+ARTICLE_CACHE_MAX_MB = int(os.getenv("ARTICLE_CACHE_MAX_MB", "1024"))  # 넘으면 오래 안 쓴 기사부터 삭제
+ARTICLE_CACHE_REFRESH = float(os.getenv("ARTICLE_CACHE_REFRESH", "86400"))  # 이 시간(초)이 지난 캐시만 조건부 요청으로 다시 확인
+
+# 거의 같은 기사 합치기: MinHash 유사도가 NEAR_DUP_THRESHOLD 이상이고 날짜가 NEAR_DUP_DAYS일 안이면
+# 나중 기사에서 원본 기사와 겹치는 종목 언급은 넣지 않음 (0이면 사용 안 함)
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.6"))
+NEAR_DUP_DAYS = int(os.getenv("NEAR_DUP_DAYS", "3"))
+
+# 단계별 계측 결과(요약 JSON / Prometheus 텍스트 / 구간 기록)를 쓸 폴더 (비우면 계측 안 함, metrics.py 참고)
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+metrics.configure(METRICS_DIR)
+
+# 상장법인목록 스냅샷 파일 (원본 테이블 체크섬이 같으면 JOIN 없이 이 파일에서 읽음, 비우면 파일 없이 매번 DB에서 읽음)
+STOCK_MASTER_PATH = os.getenv("STOCK_MASTER_PATH", "stock_master.json")
+stock_snapshot = StockMaster(STOCK_MASTER_PATH)
+
+# HTML 파서 백엔드: auto(selectolax > lxml > bs4 중 설치된 것), bs4, lxml, selectolax
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+html_parser = get_parser(HTML_PARSER)
+
 def connect_to_db():
     return pymysql.connect(
         host=os.getenv("DB_HOST"),
@@ -35,243 +97,1316 @@ def connect_to_db():
     )
 
 # 테이블 생성
-def create_table(cursor):
-    create_table_query = """
-    CREATE TABLE IF NOT EXISTS 기업별_뉴스횟수Final (
-        id INT AUTO_INCREMENT PRIMARY KEY,
+# - 뉴스기사: 기사 한 건당 한 행 (링크 해시가 키)
+# - 기업별_뉴스언급: 기사에 나온 종목 한 건당 한 행
+# - 크롤링_체크포인트: 섹션별로 마지막으로 끝까지 처리한 가장 최신 기사 (다음 실행은 여기까지만 수집)
+# - 기업별_일간집계 / 업종별_일간집계: 날짜별 TOP 10용 집계 (종목 언급을 저장하는 트랜잭션에서 같이 갱신)
+# - 수집_작업: 백그라운드 수집 작업 대기열과 진행 상황 (상태: 대기 / 실행중 / 완료 / 실패)
+# - 데이터_버전: 날짜 / 종목 / 전체 범위별 버전 (저장할 때마다 바뀐 범위를 올림, 대시보드 캐시 키에 사용)
+# - 백필_구간: 지난 날짜 백필의 출처별 날짜 구간 진행 상황 (상태: 실행중 / 완료 / 실패, 완료한 구간은 다시 하지 않음)
+# - 기업별_뉴스횟수: 날짜/기업별 나온횟수 집계 뷰
+SCHEMA_QUERIES = [
+    """
+    CREATE TABLE IF NOT EXISTS 뉴스기사 (
+        url_hash CHAR(40) NOT NULL PRIMARY KEY,
+        날짜 DATE NOT NULL,
+        뉴스링크 VARCHAR(2048) NOT NULL,
+        뉴스제목 VARCHAR(1000),
+        수집시각 DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        minhash VARBINARY(512),
+        원본_url_hash CHAR(40),
+        INDEX idx_뉴스기사_날짜 (날짜),
+        INDEX idx_뉴스기사_원본 (원본_url_hash)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS 기업별_뉴스언급 (
+        종목코드 VARCHAR(6) NOT NULL,
+        url_hash CHAR(40) NOT NULL,
         날짜 DATE NOT NULL,
         기업명 VARCHAR(255),
-        종목코드 VARCHAR(6),
         시장 VARCHAR(10),
         업종 VARCHAR(255),
         업종_ID INT,
-        나온횟수 INT,
-        뉴스링크 TEXT,
-        뉴스제목 TEXT,
-        UNIQUE (날짜, 기업명, 종목코드)
+        PRIMARY KEY (종목코드, url_hash),
+        INDEX idx_뉴스언급_날짜 (날짜, 종목코드),
+        INDEX idx_뉴스언급_기사 (url_hash)
     );
+    """,
     """
-    cursor.execute(create_table_query)
-    conn.commit()
+    CREATE TABLE IF NOT EXISTS 크롤링_체크포인트 (
+        섹션 VARCHAR(100) NOT NULL PRIMARY KEY,
+        발행시각 DATETIME NOT NULL,
+        뉴스링크 VARCHAR(2048) NOT NULL,
+        갱신시각 DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS 기업별_일간집계 (
+        날짜 DATE NOT NULL,
+        종목코드 VARCHAR(6) NOT NULL,
+        기업명 VARCHAR(255),
+        시장 VARCHAR(10),
+        업종 VARCHAR(255),
+        나온횟수 INT NOT NULL,
+        PRIMARY KEY (날짜, 종목코드),
+        INDEX idx_기업별_일간집계_순위 (날짜, 나온횟수),
+        INDEX idx_기업별_일간집계_종목 (종목코드, 날짜)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS 업종별_일간집계 (
+        날짜 DATE NOT NULL,
+        업종 VARCHAR(255) NOT NULL,
+        나온횟수 INT NOT NULL,
+        PRIMARY KEY (날짜, 업종),
+        INDEX idx_업종별_일간집계_순위 (날짜, 나온횟수)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS 수집_작업 (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        상태 VARCHAR(10) NOT NULL,
+        요청 VARCHAR(50) NOT NULL,
+        요청시각 DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        시작시각 DATETIME,
+        종료시각 DATETIME,
+        링크 INT NOT NULL DEFAULT 0,
+        저장 INT NOT NULL DEFAULT 0,
+        오류 INT NOT NULL DEFAULT 0,
+        메시지 VARCHAR(1000),
+        갱신시각 DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        INDEX idx_수집_작업_상태 (상태)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS 데이터_버전 (
+        범위 VARCHAR(100) NOT NULL PRIMARY KEY,
+        버전 BIGINT NOT NULL,
+        갱신시각 DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS 백필_구간 (
+        출처 VARCHAR(100) NOT NULL,
+        시작일 DATE NOT NULL,
+        종료일 DATE NOT NULL,
+        상태 VARCHAR(10) NOT NULL,
+        링크 INT NOT NULL DEFAULT 0,
+        저장 INT NOT NULL DEFAULT 0,
+        시작시각 DATETIME,
+        종료시각 DATETIME,
+        갱신시각 DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (출처, 시작일, 종료일)
+    );
+    """,
+    """
+    CREATE OR REPLACE VIEW 기업별_뉴스횟수 AS
+    SELECT 날짜, 기업명, 종목코드, 시장, 업종, 업종_ID, COUNT(*) AS 나온횟수
+    FROM 기업별_뉴스언급
+    GROUP BY 날짜, 기업명, 종목코드, 시장, 업종, 업종_ID;
+    """,
+]
+
+# 테이블을 만든 뒤에 추가한 컬럼 (예전에 만든 테이블에는 없으므로 확인해서 추가)
+ADDED_COLUMNS = [
+    ("뉴스기사", "minhash", "ADD COLUMN minhash VARBINARY(512)"),
+    ("뉴스기사", "원본_url_hash", "ADD COLUMN 원본_url_hash CHAR(40), ADD INDEX idx_뉴스기사_원본 (원본_url_hash)"),
+]
+
+MAX_TITLE_LENGTH = 1000
+
+
+def add_missing_columns(cursor):
+    for table, column, alter in ADDED_COLUMNS:
+        cursor.execute("""
+            SELECT 1 FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        if cursor.fetchone() is None:
+            cursor.execute(f"ALTER TABLE {table} {alter}")
+            print(f"[INFO] {table}.{column} 컬럼 추가")
+
+
+def create_table(cursor):
+    for query in SCHEMA_QUERIES:
+        cursor.execute(query)
+    add_missing_columns(cursor)
+    cursor.connection.commit()
     print("[INFO] 테이블 생성 또는 확인 완료.")
 
-# 상장법인목록 데이터 로드
+
+# 뉴스기사 테이블의 키 (링크 SHA-1)
+def url_hash(full_link):
+    return hashlib.sha1(full_link.encode("utf-8")).hexdigest()
+
+# 상장법인목록 데이터 로드 ({종목코드: Company}, stock_master.py 참고)
+# 수집 작업자처럼 계속 떠 있는 프로세스는 원본 테이블이 바뀌었을 때만 다시 읽음
 def load_stock_data(cursor):
-    query = '''
-    SELECT 상장법인목록_업종세분화.code, 상장법인목록_업종세분화.name, 상장법인목록_업종세분화.market, type_name.type_name, type_name.type_ID
-    FROM 상장법인목록_업종세분화
-    JOIN type_name ON 상장법인목록_업종세분화.type_ID = type_name.type_ID
-    '''
-    cursor.execute(query)
-    return {str(row[0]).strip().zfill(6): {
-        'name': row[1].strip(),
-        'market': row[2].strip() if row[2] else "기타",  # 시장 정보
-        'type_name': row[3].strip(),  # 업종명
-        'type_ID': row[4]  # 업종 ID
-    } for row in cursor.fetchall()}
-
-# 테이블 생성 후 존재 여부 확인
+    return stock_snapshot.load(cursor.connection)
+
+# 테이블 생성 후 존재 여부 확인 (CREATE ... IF NOT EXISTS라서 매번 실행해도 됨)
 def ensure_table_exists(cursor):
     try:
-        cursor.execute("SHOW TABLES LIKE '기업별_뉴스횟수Final'")
-        result = cursor.fetchone()
-        if not result:
-            print("[INFO] 테이블이 존재하지 않습니다. 생성 중...")
-            create_table(cursor)
-            conn.commit()
-        else:
-            print("[INFO] 테이블이 이미 존재합니다.")
+        create_table(cursor)
+        # 집계 테이블을 새로 만든 경우 기존 종목 언급으로 한 번 채움
+        cursor.execute("SELECT 1 FROM 기업별_일간집계 LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute("SELECT 1 FROM 기업별_뉴스언급 LIMIT 1")
+            if cursor.fetchone() is not None:
+                print("[INFO] 일간 집계 테이블이 비어 있어 종목 언급으로 다시 만듭니다.")
+                rebuild_rollups(cursor, cursor.connection)
     except Exception as e:
         print(f"[ERROR] 테이블 확인 및 생성 중 오류 발생: {e}")
 
-# 데이터베이스에 이미 저장된 뉴스 링크를 불러오기
-def get_existing_news_links(cursor, date_str):
-    query = "SELECT 뉴스링크 FROM 기업별_뉴스횟수Final WHERE 날짜 = %s"
-    cursor.execute(query, (date_str,))
+
+# 일간 집계 갱신: 바뀐 (날짜, 종목코드, 업종)만 종목 언급에서 다시 세서 덮어씀
+# (같은 기사가 다시 들어오거나 다시 처리되어 언급이 지워져도 숫자가 어긋나지 않음)
+# 날짜별 종목 언급 인덱스(idx_뉴스언급_날짜)를 타므로 전체 기간 크기와 상관없이 바뀐 종목 수만큼만 읽음
+def refresh_rollups(cursor, keys):
+    company_keys = sorted({(str(date_value), code) for date_value, code, _ in keys})
+    sector_keys = sorted({(str(date_value), type_name) for date_value, _, type_name in keys if type_name})
+    round_trips = 0
+    if company_keys:
+        placeholders = ", ".join(["(%s, %s)"] * len(company_keys))
+        params = [value for key in company_keys for value in key]
+        cursor.execute(f"DELETE FROM 기업별_일간집계 WHERE (날짜, 종목코드) IN ({placeholders})", params)
+        cursor.execute(f"""
+            INSERT INTO 기업별_일간집계 (날짜, 종목코드, 기업명, 시장, 업종, 나온횟수)
+            SELECT 날짜, 종목코드, MAX(기업명), MAX(시장), MAX(업종), COUNT(*)
+            FROM 기업별_뉴스언급
+            WHERE (날짜, 종목코드) IN ({placeholders})
+            GROUP BY 날짜, 종목코드
+        """, params)
+        round_trips += 2
+    if sector_keys:
+        placeholders = ", ".join(["(%s, %s)"] * len(sector_keys))
+        params = [value for key in sector_keys for value in key]
+        cursor.execute(f"DELETE FROM 업종별_일간집계 WHERE (날짜, 업종) IN ({placeholders})", params)
+        cursor.execute(f"""
+            INSERT INTO 업종별_일간집계 (날짜, 업종, 나온횟수)
+            SELECT 날짜, 업종, SUM(나온횟수)
+            FROM 기업별_일간집계
+            WHERE (날짜, 업종) IN ({placeholders})
+            GROUP BY 날짜, 업종
+        """, params)
+        round_trips += 2
+    return round_trips
+
+
+# 일간 집계를 종목 언급 전체(또는 since 이후)로 다시 만듦
+def rebuild_rollups(cursor, conn, since=None):
+    where = "WHERE 날짜 >= %s" if since else ""
+    params = (since,) if since else ()
+    cursor.execute(f"DELETE FROM 기업별_일간집계 {where}", params)
+    cursor.execute(f"DELETE FROM 업종별_일간집계 {where}", params)
+    cursor.execute(f"""
+        INSERT INTO 기업별_일간집계 (날짜, 종목코드, 기업명, 시장, 업종, 나온횟수)
+        SELECT 날짜, 종목코드, MAX(기업명), MAX(시장), MAX(업종), COUNT(*)
+        FROM 기업별_뉴스언급 {where}
+        GROUP BY 날짜, 종목코드
+    """, params)
+    cursor.execute(f"""
+        INSERT INTO 업종별_일간집계 (날짜, 업종, 나온횟수)
+        SELECT 날짜, 업종, SUM(나온횟수)
+        FROM 기업별_일간집계 {where + " AND" if since else "WHERE"} 업종 IS NOT NULL
+        GROUP BY 날짜, 업종
+    """, params)
+    data_version.bump_all(cursor)
+    conn.commit()
+    print("[INFO] 일간 집계 테이블 재생성 완료.")
+
+# 거의 같은 기사 찾기 색인 (since ~ until 원본 기사의 MinHash 서명과 묶음별 종목 언급, 사용 안 하면 None)
+def open_near_dup_index(cursor, since=None, until=None):
+    if NEAR_DUP_THRESHOLD <= 0:
+        return None
+    index = near_dup.MinHashIndex(NEAR_DUP_THRESHOLD)
+    where = ("AND a.날짜 >= %s " if since else "") + ("AND a.날짜 <= %s" if until else "")
+    params = [value for value in (since, until) if value]
+    cursor.execute(f"""
+        SELECT a.url_hash, a.날짜, a.minhash
+        FROM 뉴스기사 a
+        WHERE a.minhash IS NOT NULL AND a.원본_url_hash IS NULL {where}
+    """, params)
+    groups = {}
+    for link_hash, date_value, data in cursor.fetchall():
+        groups[link_hash] = NearDupGroup(link_hash, date_value)
+        index.add(link_hash, near_dup.from_bytes(data), groups[link_hash])
+    # 원본과 거의 같은 기사들의 종목 언급 (종목마다 가장 이른 기사)
+    cursor.execute(f"""
+        SELECT COALESCE(a.원본_url_hash, a.url_hash), m.종목코드, a.날짜, a.url_hash
+        FROM 뉴스기사 a
+        JOIN 기업별_뉴스언급 m ON m.url_hash = a.url_hash
+        WHERE a.minhash IS NOT NULL {where}
+    """, params)
+    for key, code, date_value, link_hash in cursor.fetchall():
+        group = groups.get(key)
+        if group is not None and (code not in group.owners or (date_value, link_hash) < group.owners[code]):
+            group.owners[code] = (date_value, link_hash)
+    print(f"[INFO] 거의 같은 기사 색인: 기사 {len(index)}개 (유사도 {index.threshold}, "
+          f"밴드 {index.bands}x{index.rows})")
+    return index
+
+
+# 데이터베이스에 이미 저장된 뉴스 링크를 불러오기 (date_str 이후, until_str을 주면 그 날짜까지의 기사)
+def get_existing_news_links(cursor, date_str, until_str=None):
+    if until_str:
+        cursor.execute("SELECT 뉴스링크 FROM 뉴스기사 WHERE 날짜 BETWEEN %s AND %s", (date_str, until_str))
+    else:
+        cursor.execute("SELECT 뉴스링크 FROM 뉴스기사 WHERE 날짜 >= %s", (date_str,))
     existing_links = {row[0] for row in cursor.fetchall()}
     print(f"[INFO] {len(existing_links)}개의 기존 뉴스 링크가 데이터베이스에 존재합니다.")
     return existing_links
 
-def fetch_news_links(url, target_date, existing_links):
+# 섹션의 체크포인트 (발행시각, 링크), 없으면 None
+def load_checkpoint(cursor, section):
+    cursor.execute("SELECT 발행시각, 뉴스링크 FROM 크롤링_체크포인트 WHERE 섹션 = %s", (section,))
+    row = cursor.fetchone()
+    if row:
+        print(f"[INFO] {section} 체크포인트: {row[0]} {row[1]}")
+        return row[0], row[1]
+    print(f"[INFO] {section} 체크포인트가 없습니다. 기준 날짜까지 수집합니다.")
+    return None
+
+
+# 체크포인트 저장 (더 최신일 때만 앞으로 옮김)
+def save_checkpoint(cursor, conn, section, checkpoint, full_link, date_text):
+    published = parse_news_time(date_text)
+    if checkpoint and published < checkpoint[0]:
+        return
+    cursor.execute("""
+        INSERT INTO 크롤링_체크포인트 (섹션, 발행시각, 뉴스링크)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE 발행시각 = VALUES(발행시각), 뉴스링크 = VALUES(뉴스링크)
+    """, (section, published, full_link))
+    conn.commit()
+    print(f"[INFO] {section} 체크포인트 갱신: {published} {full_link}")
+
+
+# 목록에서 뽑은 발행 시각 ('2025-01-10 09:12' 형식, 시각이 없으면 날짜만, 출처 어댑터가 이 형식으로 맞춰 줌)
+parse_news_time = parse_iso_time
+
+
+# 설정한 뉴스 출처 목록 (NEWS_SOURCES)
+def load_news_sources():
+    return load_sources(NEWS_SOURCES, html_parser, BASE_URL, LIST_PAGE_URL)
+
+
+# 기본 이데일리 섹션 (list_page_url로 목록 페이지 주소를 바꿀 수 있음)
+def default_source(list_page_url=None):
+    return EdailySource(NEWS_SECTION, html_parser, BASE_URL, list_page_url or LIST_PAGE_URL)
+
+
+# 뉴스 목록 HTML에서 (링크, 날짜) 목록 추출
+def parse_news_list(html, parser=None):
+    parser = parser or html_parser
+    return [(link if link.startswith("http") else f"{BASE_URL}{link}", date_text)
+            for link, date_text in parser.parse_list(html)]
+
+
+# 목록 항목을 걸러서 news_links에 추가. 수집을 멈출 지점(target_date 이전 뉴스 또는 체크포인트)에 닿으면 True 반환
+# until을 주면 그 날짜보다 새 뉴스는 건너뜀 (백필 구간)
+def collect_news_items(items, target_date, seen_links, news_links, checkpoint=None, until=None):
+    for full_link, date_text in items:
+        try:
+            published = parse_news_time(date_text)
+        except ValueError as e:
+            print(f"[ERROR] 뉴스 링크 처리 중 오류 발생: {e}")
+            continue
+
+        # 지난번에 끝까지 처리한 가장 최신 기사에 닿으면 그 뒤는 이미 처리된 기사
+        # (날짜 / 체크포인트 비교는 기존 링크인지 보기 전에 함: 이미 저장된 기사만 있는 페이지에서도 멈춤)
+        if checkpoint and (published < checkpoint[0] or full_link == checkpoint[1]):
+            print(f"[INFO] 체크포인트 도달 ({checkpoint[0]}). 크롤링 종료.")
+            return True
+        if until and published.date() > until.date():
+            continue
+
+        # 뉴스 날짜가 target_date 이전이면 종료 (target_date는 현재 시각이 붙어 있으므로 날짜만 비교)
+        if published.date() < target_date.date():
+            print(f"[INFO] {target_date.strftime('%Y-%m-%d')} 이전 뉴스 발견. 크롤링 종료.")
+            return True
+
+        # 기존 링크는 제외하지만 크롤링은 계속 진행
+        if full_link in seen_links:
+            continue
+        news_links.append((full_link, date_text))
+        seen_links.add(full_link)
+    return False
+
+
+def last_found_date(news_links):
+    if not news_links:
+        return None
+    return datetime.datetime.strptime(news_links[-1][1].split(" ")[0], "%Y-%m-%d")
+
+
+def fetch_news_links(source, target_date, existing_links, mode=LINK_DISCOVERY, checkpoint=None):
+    news_links = list(iter_news_links(source, target_date, set(existing_links), mode, checkpoint))
+    return news_links, last_found_date(news_links)
+
+
+# 출처의 새 뉴스 링크를 찾는 대로 하나씩 돌려줌 (목록 페이지 요청이 실패하면 selenium으로 이어서 수집)
+# seen_links에 돌려준 링크가 추가되므로 selenium으로 넘어가도 같은 링크를 다시 돌려주지 않음
+def iter_news_links(source, target_date, seen_links, mode=LINK_DISCOVERY, checkpoint=None):
+    if mode == "http":
+        try:
+            yield from iter_news_links_http(source, target_date, seen_links, checkpoint=checkpoint)
+            return
+        except Exception as e:
+            if not source.browse_url:
+                raise
+            print(f"[WARNING] {source.name} 목록 페이지 요청 실패, selenium으로 다시 시도합니다: {e}")
+    if not source.browse_url:
+        raise ValueError(f"{source.name}은(는) selenium 목록 수집을 지원하지 않습니다.")
+    yield from iter_news_links_selenium(source, target_date, seen_links, checkpoint)
+
+
+# page_url: {page}가 들어간 이데일리 목록 페이지 주소
+def fetch_news_links_http(page_url, target_date, existing_links, session=None, checkpoint=None):
+    news_links = list(iter_news_links_http(default_source(page_url), target_date, existing_links, session,
+                                           checkpoint))
+    return news_links, last_found_date(news_links)
+
+
+# 브라우저 없이 목록 페이지를 직접 요청 (페이지마다 새로 받은 항목만 파싱)
+# 백필은 first_page(구간이 시작되는 페이지)부터 last_page까지 넘기고 until보다 새 뉴스는 건너뜀
+# limiter를 주면 목록 페이지 요청도 기사 요청과 같은 요청 제한을 받음
+# 이번에 넘긴 목록 페이지에서 이미 본 항목만 나오는 페이지면 멈춤 (?page=를 무시하고 같은 목록을 주는 경우)
+# DB에 이미 있는 기사만 있는 페이지에서는 멈추지 않음 (그 뒤에 지난 실행이 못 끝낸 기사가 있을 수 있음)
+def iter_news_links_http(source, target_date, seen_links, session=None, checkpoint=None, until=None, first_page=1,
+                         last_page=None, limiter=None):
+    own_session = session is None
+    if own_session:
+        session = create_session(1)
+
+    found = 0
+    listed = set()  # 이번에 넘긴 목록 페이지에 나온 링크
+    try:
+        for page in range(first_page, (last_page or MAX_LIST_PAGES) + 1):
+            page_url = source.list_page_url(page)
+            if page_url is None:
+                break
+            with limiter.slot(page_url) if limiter else nullcontext(), metrics.span("list_page", source=source.name):
+                response = session.get(page_url, timeout=FETCH_TIMEOUT)
+                if response.status_code == 404:
+                    print(f"[INFO] {source.name} 더 이상 목록 페이지가 없음. 크롤링 종료.")
+                    break
+                response.raise_for_status()
+                items = source.parse_list(response.text)
+            metrics.inc("list_pages", source=source.name)
+            metrics.inc("list_items", len(items), source=source.name)
+            if page == first_page and not items:
+                raise ValueError(f"목록 페이지에서 뉴스 항목을 찾지 못했습니다: {response.url}")
+            if not items:
+                print(f"[INFO] {source.name} 더 이상 뉴스 항목이 없음. 크롤링 종료.")
+                break
+            page_listed = {full_link for full_link, _ in items}
+            if page_listed <= listed:
+                print(f"[INFO] {source.name} {page}페이지에 새 항목이 없음 (같은 목록 반복). 크롤링 종료.")
+                break
+            listed |= page_listed
+            page_links = []
+            reached_end = collect_news_items(items, target_date, seen_links, page_links, checkpoint, until)
+            found += len(page_links)
+            yield from page_links
+            if reached_end:
+                break
+    finally:
+        if own_session:
+            session.close()
+
+    print(f"[INFO] {source.name} 뉴스 링크 크롤링 완료. 총 {found}개 링크 발견.")
+
+
+# 크롬으로 '더보기'를 눌러가며 수집 (목록 페이지 요청이 안 될 때 사용, 이데일리 목록 구조 기준)
+def iter_news_links_selenium(source, target_date, seen_links, checkpoint=None):
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from webdriver_manager.chrome import ChromeDriverManager
+
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-gpu")
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    driver.get(url)
+    with metrics.span("selenium_start", source=source.name):
+        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+        driver.get(source.browse_url)
 
-    news_links = []
-    seen_links = existing_links
-    last_found_date = None
+    # 아직 파싱하지 않은 li만 HTML 조각으로 가져오는 스크립트
+    new_items_script = f"""
+    const items = document.querySelectorAll('{LIST_CONTAINER_SELECTOR} ul.targetAdd li');
+    return [items.length, Array.from(items).slice(arguments[0]).map(li => li.outerHTML).join('')];
+    """
+    count_script = f"return document.querySelectorAll('{LIST_CONTAINER_SELECTOR} ul.targetAdd li').length;"
 
-    while True:
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        news_items = soup.select("div.grid-nm.id_thum_stock_news ul.targetAdd li a")
-        new_links_found = False
+    found = 0
+    parsed_count = 0
 
-        for item in news_items:
+    try:
+        while True:
+            with metrics.span("list_page", source=source.name):
+                parsed_count, fragment = driver.execute_script(new_items_script, parsed_count)
+                items = source.parse_list(fragment)
+            metrics.inc("list_pages", source=source.name)
+            metrics.inc("list_items", len(items), source=source.name)
+            if not items:
+                print("[INFO] 더 이상 뉴스 항목이 없음. 크롤링 종료.")
+                break
+            page_links = []
+            reached_end = collect_news_items(items, target_date, seen_links, page_links, checkpoint)
+            found += len(page_links)
+            yield from page_links
+            if reached_end:
+                break
+
+            # 더보기 버튼 클릭 후 새 항목이 붙을 때까지 대기
             try:
-                link = item.get("href")
-                if not link:
-                    continue
-                full_link = link if link.startswith("https") else f"https://m.edaily.co.kr{link}"
+                with metrics.span("list_more", source=source.name):
+                    more_button = WebDriverWait(driver, 10).until(
+                        EC.element_to_be_clickable((By.CLASS_NAME, "btn_page_more_con"))
+                    )
+                    driver.execute_script("arguments[0].scrollIntoView(true);", more_button)
+                    more_button.click()
+                    print("[INFO] '더보기' 버튼 클릭 완료.")
+                    WebDriverWait(driver, 10).until(lambda d: d.execute_script(count_script) > parsed_count)
+            except Exception as e:
+                print(f"[INFO] '더보기' 버튼 클릭 실패 또는 더 이상 버튼 없음: {e}")
+                break
+    finally:
+        driver.quit()
 
-                # 뉴스 날짜 및 시간 가져오기
-                date_span = item.find_next("span", class_="data_info").find("span")
-                if date_span:
-                    date_text = date_span.text.strip()
-                    news_date = datetime.datetime.strptime(date_text.split(" ")[0], "%Y-%m-%d")
+    print(f"[INFO] 뉴스 링크 크롤링 완료. 총 {found}개 링크 발견.")
 
-                    # 기존 링크는 제외하지만 크롤링은 계속 진행
-                    if full_link in seen_links:
-                        print(f"[INFO] 기존 뉴스 링크 발견, 크롤링은 계속 진행: {full_link}")
-                        continue
 
-                    # 뉴스 날짜가 target_date 이후인지 확인
-                    if news_date >= target_date:
-                        news_links.append((full_link, date_text))
-                        seen_links.add(full_link)
-                        new_links_found = True
-                        last_found_date = news_date
-                    else:
-                        print(f"[INFO] {target_date.strftime('%Y-%m-%d')} 이전 뉴스 발견. 크롤링 종료.")
-                        driver.quit()
-                        return news_links, last_found_date
+# 호스트별 요청 제한 (동시 요청 수 + 요청 사이 최소 간격)
+# rate를 주면 모든 호스트를 합쳐서 초당 rate회까지만 요청 (백필처럼 여러 구간을 동시에 돌릴 때 전체 속도 제한)
+class HostLimiter:
+    def __init__(self, per_host=FETCH_PER_HOST, delay=FETCH_DELAY, rate=0):
+        self.per_host = per_host
+        self.delay = delay
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.semaphores = {}
+        self.next_time = {}
+        self.next_any = 0.0  # 전체 제한의 다음 요청 시각
+
+    def _semaphore(self, host):
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self.semaphores[host]
+
+    # 같은 호스트의 다음 요청 시각을 예약하고 그때까지 대기
+    def _wait_turn(self, host):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time.get(host, now))
+            if self.rate > 0:
+                start = max(start, self.next_any)
+                self.next_any = start + 1 / self.rate
+            self.next_time[host] = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+    @contextmanager
+    def slot(self, url):
+        host = urlparse(url).netloc
+        start = time.perf_counter()
+        with self._semaphore(host):
+            self._wait_turn(host)
+            metrics.observe("host_wait", time.perf_counter() - start)
+            yield
+
+
+# keep-alive 연결을 재사용하는 공용 세션 (스레드들이 하나의 연결 풀을 공유)
+def create_session(pool_size=FETCH_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def open_article_cache():
+    if not ARTICLE_CACHE_DIR:
+        return None
+    return ArticleCache(ARTICLE_CACHE_DIR, ARTICLE_CACHE_MAX_MB * 1024 * 1024)
+
+
+# 기사 HTML 받기 (source는 캐시에 같이 기록하는 출처 이름)
+# - 캐시가 있으면 ARTICLE_CACHE_REFRESH 안에 받은 기사는 요청 없이 캐시에서 돌려줌
+# - 오래된 캐시는 ETag / Last-Modified로 조건부 요청을 보내서 304면 캐시를 그대로 사용
+# - offline이면 네트워크를 쓰지 않고 캐시에 없으면 오류
+def fetch_article(session, limiter, full_link, cache=None, date_text=None, offline=False, source=None):
+    entry = cache.get(full_link) if cache else None
+    if offline:
+        if entry is None:
+            metrics.inc("article_fetch", result="offline_miss")
+            raise ValueError("캐시에 없는 기사입니다.")
+        metrics.inc("article_fetch", result="cache")
+        return entry["html"]
+    if entry and time.time() - entry["fetched_at"] < ARTICLE_CACHE_REFRESH:
+        metrics.inc("article_fetch", result="cache")
+        return entry["html"]
+
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    with limiter.slot(full_link), metrics.span("article_fetch"):
+        response = session.get(full_link, timeout=FETCH_TIMEOUT, headers=headers)
+    if entry and response.status_code == 304:
+        metrics.inc("article_fetch", result="not_modified")
+        cache.touch(entry)
+        return entry["html"]
+    metrics.inc("article_fetch", result=str(response.status_code))
+    response.raise_for_status()
+    if cache:
+        cache.put(full_link, date_text or (entry or {}).get("date", ""), response.text,
+                  response.headers.get("ETag"), response.headers.get("Last-Modified"), source=source)
+    return response.text
 
+
+# 다시 받아도 안 되는 기사 (404 / 410 등 4xx, 요청 제한 / 시간 초과는 제외)
+def permanent_failure(e):
+    response = getattr(e, "response", None)
+    return (isinstance(e, requests.HTTPError) and response is not None and 400 <= response.status_code < 500
+            and response.status_code not in (408, 425, 429))
+
+
+# 기사 HTML을 스레드 풀로 동시에 받아서 받는 순서대로 돌려줌
+def fetch_articles(news_links, session, max_workers=FETCH_WORKERS, limiter=None):
+    limiter = limiter or HostLimiter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_article, session, limiter, full_link): (full_link, date_text)
+            for full_link, date_text in news_links
+        }
+        for future in as_completed(futures):
+            full_link, date_text = futures[future]
+            try:
+                html = future.result()
             except Exception as e:
-                print(f"[ERROR] 뉴스 링크 처리 중 오류 발생: {e}")
+                print(f"[ERROR] 뉴스 크롤링 실패: {full_link} - {e}")
+                continue
+            yield full_link, date_text, html
+
+
+# 뉴스 데이터 저장 (이미 모아 둔 링크 목록을 파이프라인에 넣음)
+def process_news_data(news_links, db_stock_data, cursor, conn, session=None, max_workers=FETCH_WORKERS,
+                      matcher=None, parse_workers=PARSE_WORKERS):
+    pipeline = NewsPipeline(db_stock_data, cursor, conn, session=session, fetch_workers=max_workers,
+                            parse_workers=parse_workers, matcher=matcher)
+    return pipeline.run(iter(news_links))
+
+
+_DONE = object()  # 큐 종료 표시
+
+
+# 단계별 처리 건수와 처리 속도
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.first_time = None
+        self.last_time = None
+        self.lock = threading.Lock()
+
+    def done(self, n=1):
+        now = time.perf_counter()
+        with self.lock:
+            self.count += n
+            if self.first_time is None:
+                self.first_time = now
+            self.last_time = now
 
-        if not new_links_found:
-            print("[INFO] 더 이상 새로운 뉴스 링크가 발견되지 않음. 크롤링 종료.")
-            break
+    def failed(self):
+        with self.lock:
+            self.errors += 1
 
-        # 더보기 버튼 클릭
+    def rate(self, start_time):
+        elapsed = (self.last_time or start_time) - start_time
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+
+# 출처 하나의 링크 수집 상태와 처리 건수
+class SourceState:
+    def __init__(self, name, body_selectors=None):
+        self.name = name
+        self.body_selectors = body_selectors
+        self.stats = {stage: StageStats(stage) for stage in ("discover", "fetch", "write")}
+        self.duplicates = 0  # 다른 출처에서 먼저 찾은 기사
+        self.gone = 0  # 4xx로 받을 수 없는 기사 (처리한 것으로 보고 체크포인트를 막지 않음)
+        self.newest_link = None  # 이번 실행에서 처음 찾은 (가장 최신) (링크, 날짜)
+        self.discover_completed = False  # 링크 수집이 오류 없이 끝까지 진행됐는지
+
+    def snapshot(self):
+        snapshot = {stage: stats.count for stage, stats in self.stats.items()}
+        snapshot["errors"] = sum(stats.errors for stats in self.stats.values())
+        snapshot["duplicates"] = self.duplicates
+        snapshot["gone"] = self.gone
+        return snapshot
+
+
+# 링크 발견 -> 기사 수집 -> 파싱 -> DB 저장을 크기가 정해진 큐로 연결한 파이프라인
+# 첫 목록 페이지에서 링크가 나오자마자 기사 수집이 시작되고, 뒤 단계가 밀리면 앞 단계가 기다림
+# 출처가 여러 개면 출처마다 링크 수집 스레드를 띄우고 기사 수집 / 파싱(종목 매처) / 저장은 같이 씀
+# 같은 기사(정규화한 링크)를 여러 출처에서 찾으면 먼저 찾은 출처만 처리함
+class NewsPipeline:
+    def __init__(self, db_stock_data, cursor, conn, session=None, fetch_workers=FETCH_WORKERS,
+                 parse_workers=PARSE_WORKERS, matcher=None, queue_size=PIPELINE_QUEUE_SIZE,
+                 report_interval=PIPELINE_REPORT_INTERVAL, cache=None, offline=False, progress=None,
+                 near_dups=None, limiter=None, metrics_name=None):
+        self.db_stock_data = db_stock_data
+        self.cursor = cursor
+        self.conn = conn
+        self.session = session
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.matcher = matcher
+        self.report_interval = report_interval
+        self.cache = cache
+        self.offline = offline  # 캐시에 있는 기사만 다시 처리 (기존 종목 언급은 새 결과로 바꿈)
+        self.progress = progress  # 진행 상황을 받는 함수 (통계 dict)
+        self.near_dups = near_dups  # 거의 같은 기사 찾기 색인 (MinHashIndex, 없으면 안 찾음)
+        self.limiter = limiter  # 호스트별 요청 제한 (없으면 FETCH_PER_HOST / FETCH_DELAY)
+        self.metrics_name = metrics_name  # 계측 결과 파일 이름 (없으면 ingest / reprocess)
+        self.link_queue = queue.Queue(maxsize=queue_size)
+        self.html_queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.stats = {name: StageStats(name) for name in ("discover", "fetch", "parse", "write")}
+        self.start_time = None
+        self.first_link_time = None
+        self.writer = None
+        self.sources = {}  # 출처 이름 -> SourceState
+        self.link_sources = {}  # 처리 중인 링크 -> SourceState
+        self.claimed = set()  # 이번 실행에서 처리하기로 한 링크 (출처 사이 중복 제거)
+        self.writing = {}  # 저장 버퍼에 넣고 아직 커밋되지 않은 링크 -> SourceState
+        self.lock = threading.Lock()
+        self.discovering = 0  # 아직 끝나지 않은 링크 수집 스레드 수
+
+    # 큐가 가득 차면 기다림 (파이프라인이 멈추면 포기)
+    def _put(self, target_queue, item):
+        while not self.stop_event.is_set():
+            try:
+                target_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source_queue):
+        while not self.stop_event.is_set():
+            try:
+                return source_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    # 다른 출처가 이미 찾은 링크면 False
+    def _claim(self, full_link, source):
+        with self.lock:
+            if full_link in self.claimed:
+                source.duplicates += 1
+                return False
+            self.claimed.add(full_link)
+            self.link_sources[full_link] = source
+            return True
+
+    # link_iter는 (링크, 날짜) 또는 (링크, 날짜, 본문 영역 선택자)를 돌려줌
+    def _discover(self, source, link_iter):
         try:
-            more_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CLASS_NAME, "btn_page_more_con"))
-            )
-            driver.execute_script("arguments[0].scrollIntoView(true);", more_button)
-            more_button.click()
-            print("[INFO] '더보기' 버튼 클릭 완료.")
-            time.sleep(3)
+            for full_link, date_text, *selectors in link_iter:
+                if self.first_link_time is None:
+                    self.first_link_time = time.perf_counter()
+                if source.newest_link is None:
+                    source.newest_link = (full_link, date_text)
+                if not self._claim(full_link, source):
+                    continue
+                body_selectors = selectors[0] if selectors else source.body_selectors
+                if not self._put(self.link_queue, (full_link, date_text, source, body_selectors)):
+                    break
+                self.stats["discover"].done()
+                source.stats["discover"].done()
+            else:
+                source.discover_completed = True
         except Exception as e:
-            print(f"[INFO] '더보기' 버튼 클릭 실패 또는 더 이상 버튼 없음: {e}")
-            break
+            print(f"[ERROR] {source.name} 뉴스 링크 수집 중 오류 발생: {e}")
+        finally:
+            # 마지막으로 끝난 링크 수집 스레드가 기사 수집 스레드들에 종료를 알림
+            with self.lock:
+                self.discovering -= 1
+                last = self.discovering == 0
+            if last:
+                for _ in range(self.fetch_workers):
+                    self._put(self.link_queue, _DONE)
 
-    driver.quit()
-    print(f"[INFO] 뉴스 링크 크롤링 완료. 총 {len(news_links)}개 링크 발견.")
-    return news_links, last_found_date
+    def _fetch(self, session, limiter):
+        try:
+            while True:
+                item = self._get(self.link_queue)
+                if item is _DONE:
+                    break
+                full_link, date_text, source, body_selectors = item
+                try:
+                    html = fetch_article(session, limiter, full_link, self.cache, date_text, self.offline,
+                                         source.name)
+                except Exception as e:
+                    self.link_sources.pop(full_link, None)
+                    if permanent_failure(e):
+                        print(f"[WARNING] 받을 수 없는 기사, 건너뜀: {full_link} - {e}")
+                        metrics.inc("article_gone", source=source.name)
+                        with self.lock:
+                            source.gone += 1
+                        continue
+                    print(f"[ERROR] 뉴스 크롤링 실패: {full_link} - {e}")
+                    self.stats["fetch"].failed()
+                    source.stats["fetch"].failed()
+                    continue
+                if not self._put(self.html_queue, (full_link, date_text, html, body_selectors)):
+                    break
+                self.stats["fetch"].done()
+                source.stats["fetch"].done()
+        finally:
+            self._put(self.html_queue, _DONE)
 
+    # 수집 스레드가 모두 끝날 때까지 HTML을 꺼내 줌
+    def _fetched_articles(self):
+        remaining = self.fetch_workers
+        while remaining:
+            item = self._get(self.html_queue)
+            if item is _DONE:
+                if self.stop_event.is_set():
+                    return
+                remaining -= 1
+                continue
+            yield item
 
+    def snapshot(self):
+        snapshot = {name: stats.count for name, stats in self.stats.items()}
+        snapshot["errors"] = sum(stats.errors for stats in self.stats.values())
+        snapshot["sources"] = {name: source.snapshot() for name, source in self.sources.items()}
+        return snapshot
 
-# 뉴스 데이터 저장
-def process_news_data(news_links, db_stock_data, cursor, conn):
-    for full_link, date_text in news_links:
+    def _notify(self):
+        if self.progress is None:
+            return
         try:
-            response = requests.get(full_link, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            self.progress(self.snapshot())
+        except Exception as e:
+            print(f"[WARNING] 진행 상황 전달 실패: {e}")
 
-            # 뉴스 제목 추출
-            title = soup.title.string.strip() if soup.title else "제목 없음"
+    def _report(self):
+        while not self.stop_event.wait(self.report_interval):
+            print(f"[INFO] 파이프라인: 링크 {self.stats['discover'].count}개 "
+                  f"(수집 대기 {self.link_queue.qsize()}) -> 수집 {self.stats['fetch'].count}개 "
+                  f"(파싱 대기 {self.html_queue.qsize()}) -> 파싱 {self.stats['parse'].count}개 "
+                  f"-> 저장 {self.stats['write'].count}개")
+            self._notify()
 
-            # 뉴스에서 종목 코드 추출
-            stock_codes = set(re.findall(r"\b\d{6}\b", soup.text))
-            for stock_code in stock_codes:
-                if stock_code not in db_stock_data:
-                    continue
+    # MentionWriter가 커밋(또는 되돌림)한 기사들의 저장 건수 / 실패 건수
+    def _flushed(self, links, committed):
+        for full_link in links:
+            source = self.writing.pop(full_link, None)
+            stats = [self.stats["write"]] + ([source.stats["write"]] if source else [])
+            for stage_stats in stats:
+                if committed:
+                    stage_stats.done()
+                else:
+                    stage_stats.failed()
 
-                company_name = db_stock_data[stock_code]["name"]
-                market_type = db_stock_data[stock_code]["market"]
-                company_type = db_stock_data[stock_code]["type_name"]
-                type_ID = db_stock_data[stock_code]["type_ID"]
-
-                # 데이터베이스 중복 확인
-                query = """
-                SELECT 뉴스링크, 뉴스제목 FROM 기업별_뉴스횟수Final 
-                WHERE 날짜 = %s AND 기업명 = %s AND 종목코드 = %s
-                """
-                cursor.execute(query, (date_text.split(" ")[0], company_name, stock_code))
-                existing_data = cursor.fetchone()
-
-                # 기존 데이터가 존재하고 뉴스 링크 또는 제목이 포함되어 있다면 처리하지 않음
-                if existing_data:
-                    existing_links, existing_titles = existing_data
-                    if full_link in existing_links or title in existing_titles:
-                        print(f"[INFO] 기존 데이터와 중복: {company_name}, {date_text}, {full_link}")
-                        continue
+    # 출처 하나 (이름 없이 링크만 넘기는 경우)
+    def run(self, link_iter, name="default", body_selectors=None):
+        return self.run_sources([(name, body_selectors, link_iter)])
+
+    # sources: [(출처 이름, 본문 영역 선택자, 링크 iterator), ...]를 한 번에 처리
+    def run_sources(self, sources):
+        if not sources:
+            return 0
+        metrics.start_run()
+        own_session = self.session is None
+        session = create_session(self.fetch_workers) if own_session else self.session
+        matcher = self.matcher
+        if matcher is None and self.parse_workers <= 1:
+            matcher = StockMatcher(self.db_stock_data, match_names=MATCH_COMPANY_NAMES)
+        parse_stage = ParseStage(self.db_stock_data, workers=self.parse_workers, parser_name=HTML_PARSER,
+                                 match_names=MATCH_COMPANY_NAMES, matcher=matcher,
+                                 signatures=self.near_dups is not None)
+        self.writer = MentionWriter(self.cursor, self.conn, replace_mentions=self.offline, near_dups=self.near_dups,
+                                    on_flush=self._flushed)
+        limiter = self.limiter or HostLimiter()
+
+        self.sources = {name: SourceState(name, body_selectors) for name, body_selectors, _ in sources}
+        self.discovering = len(sources)
+        self.start_time = time.perf_counter()
+        threads = [threading.Thread(target=self._discover, args=(self.sources[name], link_iter), daemon=True)
+                   for name, _, link_iter in sources]
+        threads += [threading.Thread(target=self._fetch, args=(session, limiter), daemon=True)
+                    for _ in range(self.fetch_workers)]
+        if self.report_interval > 0:
+            threads.append(threading.Thread(target=self._report, daemon=True))
+        for thread in threads:
+            thread.start()
 
-                # 데이터베이스에 새로 삽입
-                query = """
-                INSERT INTO 기업별_뉴스횟수Final 
-                    (날짜, 기업명, 종목코드, 시장, 업종, 업종_ID, 나온횟수, 뉴스링크, 뉴스제목)
-                VALUES 
-                    (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE 
-                    뉴스링크 = CASE 
-                        WHEN NOT FIND_IN_SET(%s, 뉴스링크) THEN CONCAT(뉴스링크, ' | ', %s)
-                        ELSE 뉴스링크 
-                    END,
-                    뉴스제목 = CASE 
-                        WHEN NOT FIND_IN_SET(%s, 뉴스제목) THEN CONCAT(뉴스제목, ' | ', %s)
-                        ELSE 뉴스제목 
-                    END,
-                    `나온횟수` = LENGTH(뉴스링크) - LENGTH(REPLACE(뉴스링크, ' | ', '')) + 1
-                """
-                data = (date_text.split(" ")[0], company_name, stock_code, market_type, company_type, type_ID, 
-                        1, full_link, title, full_link, full_link, title, title)
-                cursor.execute(query, data)
-                conn.commit()
-                print(f"[INFO] 저장 완료: {company_name} - {date_text}")
+        try:
+            for parsed in parse_stage.map(self._fetched_articles()):
+                self.stats["parse"].done()
+                source = self.link_sources.pop(parsed[1], None)
+                # 저장 건수는 커밋된 뒤에 셈 (_flushed)
+                self.writing[parsed[1]] = source
+                try:
+                    save_parsed_article(parsed, self.db_stock_data, self.writer)
+                except Exception as e:
+                    self._flushed([parsed[1]], False)
+                    print(f"[ERROR] 뉴스 처리 실패: {parsed[1]} - {e}")
+        finally:
+            self.stop_event.set()
+            parse_stage.close()
+            self.writer.close()
+            for thread in threads:
+                thread.join()
+            if own_session:
+                session.close()
+
+        self.print_summary()
+        self._notify()
+        if self.cache:
+            self.cache.print_summary()
+        self._write_metrics()
+        return self.stats["write"].count
+
+    # 단계별 처리 건수와 실행 요약을 계측 결과로 저장 (계측이 꺼져 있으면 아무것도 안 함)
+    def _write_metrics(self):
+        if not metrics.enabled():
+            return
+        for name, stats in self.stats.items():
+            metrics.inc("stage_items", stats.count, stage=name)
+            metrics.inc("stage_errors", stats.errors, stage=name)
+        for source in self.sources.values():
+            metrics.inc("source_duplicates", source.duplicates, source=source.name)
+        elapsed = time.perf_counter() - self.start_time
+        metrics.write_run(self.metrics_name or ("reprocess" if self.offline else "ingest"), {
+            "elapsed_sec": round(elapsed, 3),
+            "articles_per_sec": round(self.stats["write"].count / elapsed, 1) if elapsed > 0 else 0.0,
+            "first_link_to_first_commit_sec": (round(self.writer.first_commit_time - self.first_link_time, 3)
+                                               if self.first_link_time and self.writer.first_commit_time else None),
+            "completed": self.completed(),
+            "pipeline": self.snapshot(),
+        })
+
+    # 출처(없으면 모든 출처)에서 찾은 기사를 빠짐없이 저장했는지 (이때만 체크포인트를 앞으로 옮김)
+    # 4xx로 받을 수 없는 기사는 처리한 것으로 봄 (매번 같은 구간을 다시 넘지 않도록), 일시적인 오류는 막음
+    def completed(self, name=None):
+        sources = [self.sources[name]] if name else list(self.sources.values())
+        return self.writer.failed_flushes == 0 and all(
+            source.discover_completed and not any(stats.errors for stats in source.stats.values())
+            and source.stats["write"].count + source.gone == source.stats["discover"].count
+            for source in sources)
+
+    def print_summary(self):
+        elapsed = time.perf_counter() - self.start_time
+        units = {"discover": "links/sec", "fetch": "articles/sec", "parse": "articles/sec", "write": "articles/sec"}
+        for name, stats in self.stats.items():
+            print(f"[INFO] {name:<8} {stats.count}개 (실패 {stats.errors}개), "
+                  f"{stats.rate(self.start_time):.1f} {units[name]}")
+        rate = self.stats["write"].count / elapsed if elapsed > 0 else 0.0
+        print(f"[INFO] 기사 {self.stats['write'].count}/{self.stats['discover'].count}개 처리 완료 "
+              f"({elapsed:.1f}초, {rate:.1f} articles/sec)")
+        for source in self.sources.values():
+            stats = source.stats
+            print(f"[INFO] 출처 {source.name}: 링크 {stats['discover'].count}개 (중복 {source.duplicates}개) "
+                  f"-> 수집 {stats['fetch'].count}개 (실패 {stats['fetch'].errors}개, 없는 기사 {source.gone}개) "
+                  f"-> 저장 {stats['write'].count}개 (실패 {stats['write'].errors}개), "
+                  f"{stats['write'].rate(self.start_time):.1f} articles/sec")
+        if self.first_link_time is not None and self.writer.first_commit_time is not None:
+            print(f"[INFO] 첫 링크 발견부터 첫 저장까지 {self.writer.first_commit_time - self.first_link_time:.2f}초")
+
+
+# 파싱 결과(날짜, 링크, 제목, 종목코드들, 오류, 서명)를 저장 버퍼에 추가
+def save_parsed_article(parsed, db_stock_data, writer):
+    date_str, full_link, title, stock_codes, error, signature = parsed
+    if error:
+        raise ValueError(f"기사 파싱 실패: {error}")
+
+    link_hash = writer.add_article(date_str, full_link, title, signature)
+    for stock_code in stock_codes:
+        if stock_code in db_stock_data:
+            writer.add(date_str, stock_code, db_stock_data[stock_code], link_hash, title)
+    writer.maybe_flush()
+
+
+UPSERT_ARTICLE_QUERY = """
+INSERT INTO 뉴스기사 (url_hash, 날짜, 뉴스링크, 뉴스제목, minhash, 원본_url_hash)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE 뉴스제목 = COALESCE(VALUES(뉴스제목), 뉴스제목), minhash = VALUES(minhash),
+    원본_url_hash = VALUES(원본_url_hash)
+"""
+
+DELETE_MENTIONS_QUERY = "DELETE FROM 기업별_뉴스언급 WHERE url_hash IN ({})"
+
+DELETE_MENTION_QUERY = "DELETE FROM 기업별_뉴스언급 WHERE 종목코드 = %s AND url_hash = %s"
+
+# 원본이 바뀐 묶음: 예전 원본과 그 원본을 가리키던 기사들이 새 원본을 가리키도록
+REPOINT_QUERY = """
+UPDATE 뉴스기사 SET 원본_url_hash = %s
+WHERE (url_hash = %s OR 원본_url_hash = %s) AND url_hash <> %s
+"""
+
+# 이미 있는 (종목코드, 기사) 언급은 그대로 둠
+INSERT_MENTION_QUERY = """
+INSERT INTO 기업별_뉴스언급 (종목코드, url_hash, 날짜, 기업명, 시장, 업종, 업종_ID)
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE url_hash = url_hash
+"""
+
+
+# 거의 같은 기사 묶음 (MinHashIndex에는 원본 기사의 서명으로 들어감)
+# 원본은 묶음에서 (날짜, url_hash)가 가장 작은 기사, 종목마다 언급은 그 종목이 나온 가장 이른 기사 하나에만 둠
+# (기사가 들어오는 순서나 워커 수와 상관없이 같은 결과가 나오도록)
+class NearDupGroup:
+    def __init__(self, key, day):
+        self.key = key  # 원본 기사 url_hash
+        self.day = day  # 원본 기사 날짜
+        self.owners = {}  # 종목코드 -> 언급을 가진 기사 (날짜, url_hash)
+
+
+# 종목 언급을 메모리에 모아 중복을 걸러낸 뒤 배치 단위로 한 트랜잭션에 저장
+# near_dups(MinHashIndex)가 있으면 거의 같은 기사는 원본_url_hash를 기록하고,
+# 묶음에서 이미 센 종목의 언급은 넣지 않음 (같은 기사가 여러 번 세어지지 않도록)
+# 더 이른 기사가 나중에 들어오면 원본을 그 기사로 옮기고 (이미 저장한 행도) 언급도 그 기사로 옮김
+class MentionWriter:
+    def __init__(self, cursor, conn, batch_size=DB_BATCH_SIZE, flush_interval=DB_FLUSH_INTERVAL,
+                 replace_mentions=False, near_dups=None, near_dup_days=NEAR_DUP_DAYS, on_flush=None):
+        self.cursor = cursor
+        self.conn = conn
+        # 저장을 시도한 기사 링크 목록과 커밋 성공 여부를 받는 함수 (파이프라인이 저장 건수를 커밋 뒤에 셈)
+        self.on_flush = on_flush
+        # True면 저장하는 기사의 기존 종목 언급을 지우고 새로 넣음 (캐시에서 다시 처리할 때)
+        self.replace_mentions = replace_mentions
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.articles_buffer = {}  # url_hash -> 기사 행
+        self.buffer = {}  # (종목코드, url_hash) -> 언급 행
+        # 이번 실행에서 이미 버퍼에 넣은 (종목코드, 기사), 거의 같은 기사 찾기가 꺼져 있으면 (날짜, 종목코드, 제목)도
+        self.seen = set()
+        self.near_dups = near_dups
+        self.near_dup_days = near_dup_days
+        self.groups = {}  # 기사 -> 속한 거의 같은 기사 묶음 (NearDupGroup)
+        self.repoints = []  # 다음 저장 때 DB에서 원본을 옮길 (새 원본, 예전 원본)
+        self.dropped = []  # 다음 저장 때 DB에서 지울 언급 (종목코드, url_hash, 날짜, 업종)
+        self.near_duplicates = 0  # 거의 같은 기사 수
+        self.collapsed = 0  # 원본 기사와 겹쳐서 넣지 않은 종목 언급 수
+        self.last_flush = time.monotonic()
+        self.first_commit_time = None
+        self.failed_flushes = 0
+        # 통계 (커밋된 것만 셈, 실패해서 되돌린 기사는 failed_articles)
+        self.articles = 0
+        self.failed_articles = 0
+        self.rows = 0
+        self.round_trips = 0
+        self.write_time = 0.0
+
+    # 기사 행 추가 (종목이 없는 기사도 저장해서 다음 실행 때 다시 받지 않도록 함)
+    # 같은 기사가 다시 들어오면 (migrate.py는 종목마다 한 번씩) 버퍼에 제목이 있는 행을 그대로 둠
+    # 제목이 없는(None) 행은 저장된 제목을 지우지 않음 (UPSERT_ARTICLE_QUERY의 COALESCE)
+    def add_article(self, date_str, full_link, title, signature=None):
+        link_hash = url_hash(full_link)
+        buffered = self.articles_buffer.get(link_hash)
+        if buffered is not None and buffered[3] is not None:
+            return link_hash
+        original = self._find_original(link_hash, date_str, signature)
+        self.articles_buffer[link_hash] = (link_hash, date_str, full_link,
+                                           title[:MAX_TITLE_LENGTH] if title else None, signature, original)
+        return link_hash
+
+    # near_dup_days 안의 거의 같은 원본 기사 url_hash
+    # (없거나 이 기사가 원본보다 이르면 이 기사를 원본으로 색인에 넣고 None)
+    def _find_original(self, link_hash, date_str, signature):
+        if self.near_dups is None or signature is None:
+            return None
+        sig = near_dup.from_bytes(signature)
+        day = datetime.date.fromisoformat(date_str)
+        # 다시 처리하는 원본 기사면 그 묶음을 그대로 씀
+        indexed = self.near_dups.get(link_hash)
+        for _, key, group in self.near_dups.find(sig, exclude=link_hash):
+            if abs((day - group.day).days) <= self.near_dup_days:
+                self._join(group, link_hash)
+                self.near_duplicates += 1
+                if (day, link_hash) < (group.day, group.key):
+                    self._repoint(group, link_hash, day, sig)
+                    return None
+                # 다시 처리한 기사가 예전에는 원본이었으면 색인에서 빼고 그 기사를 가리키던 기사들도 이 묶음으로
+                if indexed is not None:
+                    self.near_dups.remove(link_hash)
+                    self._move_rows(link_hash, key)
+                return key
+        group = indexed or NearDupGroup(link_hash, day)
+        group.day = day
+        self.near_dups.add(link_hash, sig, group)
+        self._join(group, link_hash)
+        return None
+
+    # 다시 처리하는 기사가 예전에 갖고 있던 언급은 묶음에서 빼고 다시 셈 (replace_mentions로 지워지므로)
+    def _join(self, group, link_hash):
+        if any(owner[1] == link_hash for owner in group.owners.values()):
+            group.owners = {code: owner for code, owner in group.owners.items() if owner[1] != link_hash}
+        self.groups[link_hash] = group
+
+    # 묶음의 원본을 link_hash로 바꿈
+    def _repoint(self, group, link_hash, day, sig):
+        old_key = group.key
+        self.near_dups.remove(old_key)
+        group.key, group.day = link_hash, day
+        self.near_dups.add(link_hash, sig, group)
+        self._move_rows(old_key, link_hash)
+
+    # old_key 기사와 그 기사를 원본으로 가리키던 기사들이 new_key를 가리키도록
+    # (버퍼의 기사 행은 바로, 저장된 행은 다음 저장 때 REPOINT_QUERY로)
+    def _move_rows(self, old_key, new_key):
+        for key, article in self.articles_buffer.items():
+            if key != new_key and (key == old_key or article[5] == old_key):
+                self.articles_buffer[key] = article[:5] + (new_key,)
+        self.repoints.append((new_key, old_key, old_key, new_key))
+
+    # 종목 언급 행 추가
+    # 제목이 같은 기사 합치기는 거의 같은 기사 찾기가 꺼져 있을 때만 함 (켜져 있으면 본문 유사도로 판단)
+    # 제목이 없는 기사('제목 없음')끼리는 합치지 않음
+    def add(self, date_str, stock_code, stock_info, link_hash, title):
+        link_key = (stock_code, link_hash)
+        title_key = None
+        if self.near_dups is None and title and title != NO_TITLE:
+            title_key = (date_str, stock_code, title)
+        if link_key in self.seen or title_key in self.seen:
+            return
+        # 같은 묶음(원본 + 거의 같은 기사들)에서 더 이른 기사가 이미 센 종목이면 넣지 않고,
+        # 더 늦은 기사가 센 종목이면 그 언급을 빼고 이 기사로 옮김
+        group = self.groups.get(link_hash)
+        if group is not None:
+            rank = (datetime.date.fromisoformat(date_str), link_hash)
+            owner = group.owners.get(stock_code)
+            if owner is not None:
+                self.collapsed += 1
+                if owner <= rank:
+                    return
+                self._drop_mention(stock_code, owner, stock_info)
+            group.owners[stock_code] = rank
+        self.seen.add(link_key)
+        if title_key:
+            self.seen.add(title_key)
+        self.buffer[link_key] = (stock_code, link_hash, date_str, stock_info.name, stock_info.market,
+                                 stock_info.type_name, stock_info.type_ID)
 
+    # 버퍼에 있는 언급은 빼고, 이미 저장된 언급은 다음 저장 때 지움
+    def _drop_mention(self, stock_code, owner, stock_info):
+        day, owner_hash = owner
+        if self.buffer.pop((stock_code, owner_hash), None) is None:
+            self.dropped.append((stock_code, owner_hash, day.isoformat(), stock_info.type_name))
+
+    def maybe_flush(self):
+        pending = len(self.buffer) + len(self.articles_buffer)
+        if pending >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.articles_buffer:
+            return
+        articles = list(self.articles_buffer.values())
+        rows = list(self.buffer.values())
+        repoints = self.repoints
+        dropped = self.dropped
+        self.articles_buffer = {}
+        self.buffer = {}
+        self.repoints = []
+        self.dropped = []
+
+        start_time = time.perf_counter()
+        round_trips = self.round_trips
+        try:
+            with metrics.span("db_flush"):
+                # 이미 저장된 행의 원본 옮기기 (버퍼의 기사 행은 옮긴 값이라 뒤의 UPSERT가 그대로 씀)
+                if repoints:
+                    with metrics.span("db_query", statement="repoint_originals"):
+                        self.cursor.executemany(REPOINT_QUERY, repoints)
+                    self.round_trips += 1
+                # pymysql은 INSERT ... VALUES 문을 여러 행짜리 한 문장으로 묶어서 보냄
+                with metrics.span("db_query", statement="upsert_articles"):
+                    self.cursor.executemany(UPSERT_ARTICLE_QUERY, articles)
+                self.round_trips += 1
+                # 집계를 다시 셀 (날짜, 종목코드, 업종)
+                touched = {(row[2], row[0], row[5]) for row in rows}
+                # 더 이른 기사로 옮긴 언급 (예전 기사 쪽 행을 지움)
+                if dropped:
+                    touched.update((date_value, code, type_name) for code, _, date_value, type_name in dropped)
+                    with metrics.span("db_query", statement="drop_mentions"):
+                        self.cursor.executemany(DELETE_MENTION_QUERY,
+                                                [(code, link_hash) for code, link_hash, _, _ in dropped])
+                    self.round_trips += 1
+                if self.replace_mentions:
+                    hashes = [article[0] for article in articles]
+                    placeholders = ", ".join(["%s"] * len(hashes))
+                    # 지워지는 언급의 집계도 다시 세야 하므로 먼저 읽어 둠
+                    with metrics.span("db_query", statement="delete_mentions"):
+                        self.cursor.execute(
+                            f"SELECT DISTINCT 날짜, 종목코드, 업종 FROM 기업별_뉴스언급 WHERE url_hash IN ({placeholders})",
+                            hashes)
+                        touched.update(self.cursor.fetchall())
+                        self.cursor.execute(DELETE_MENTIONS_QUERY.format(placeholders), hashes)
+                    self.round_trips += 2
+                if rows:
+                    with metrics.span("db_query", statement="insert_mentions"):
+                        self.cursor.executemany(INSERT_MENTION_QUERY, rows)
+                    self.round_trips += 1
+                with metrics.span("db_query", statement="refresh_rollups"):
+                    self.round_trips += refresh_rollups(self.cursor, touched)
+                # 바뀐 날짜 / 종목의 데이터 버전 올림 (대시보드 캐시 무효화)
+                with metrics.span("db_query", statement="bump_versions"):
+                    data_version.bump(self.cursor,
+                                      [data_version.date_scope(date_value) for date_value, _, _ in touched]
+                                      + [data_version.company_scope(code) for _, code, _ in touched])
+                self.round_trips += 1
+                with metrics.span("db_commit"):
+                    self.conn.commit()
+                self.round_trips += 1
         except Exception as e:
-            print(f"[ERROR] 뉴스 크롤링 실패: {full_link} - {e}")
+            self.conn.rollback()
+            self.failed_flushes += 1
+            self.failed_articles += len(articles)
+            metrics.inc("db_flush_failures")
+            print(f"[ERROR] DB 저장 실패 (기사 {len(articles)}건): {e}")
+            self._notify_flush(articles, False)
+            return
+        finally:
+            self.write_time += time.perf_counter() - start_time
+            metrics.inc("db_round_trips", self.round_trips - round_trips)
+        metrics.inc("db_rows", len(articles), table="뉴스기사")
+        metrics.inc("db_rows", len(rows), table="기업별_뉴스언급")
+        self.articles += len(articles)
+        self.rows += len(rows)
+        self._notify_flush(articles, True)
+        if self.first_commit_time is None:
+            self.first_commit_time = time.perf_counter()
+        print(f"[INFO] 저장 완료: 기사 {len(articles)}건, 종목 언급 {len(rows)}건")
 
-if __name__ == "__main__":
-    conn = connect_to_db()
-    cursor = conn.cursor()
+    def _notify_flush(self, articles, committed):
+        if self.on_flush is not None:
+            self.on_flush([article[2] for article in articles], committed)
 
-    print("[INFO] 테이블 생성 확인 중...")
-    ensure_table_exists(cursor)
+    def close(self):
+        self.flush()
+        rate = self.rows / self.write_time if self.write_time > 0 else 0.0
+        per_article = self.round_trips / self.articles if self.articles else 0.0
+        print(f"[INFO] DB 저장 {self.rows}행 ({rate:.1f} rows/sec), "
+              f"DB 왕복 {self.round_trips}회 (기사당 {per_article:.2f}회)"
+              + (f", 저장 실패로 되돌린 기사 {self.failed_articles}건" if self.failed_articles else ""))
+        if self.near_dups is not None:
+            per_lookup = self.near_dups.comparisons / self.near_dups.lookups if self.near_dups.lookups else 0.0
+            print(f"[INFO] 거의 같은 기사 {self.near_duplicates}건, 겹쳐서 뺀 종목 언급 {self.collapsed}건 "
+                  f"(색인 {len(self.near_dups)}개, 찾기당 후보 {per_lookup:.1f}개)")
 
-    print("[INFO] 상장법인목록 데이터 로드 중...")
-    db_stock_data = load_stock_data(cursor)
 
-    if not db_stock_data:
-        print("[WARNING] 상장법인목록 데이터가 비어 있습니다.")
-        exit()
+# 캐시에 저장된 기사를 네트워크 없이 다시 파싱/매칭해서 저장 (매칭 로직을 바꾼 뒤 지난 기사에 다시 적용할 때)
+def reprocess_from_cache(db_stock_data, cursor, conn, since=None, until=None):
+    cache = open_article_cache()
+    if cache is None:
+        print("[ERROR] ARTICLE_CACHE_DIR가 비어 있어 캐시에서 다시 처리할 수 없습니다.")
+        return 0
+    # 캐시에 기록된 출처의 본문 영역 선택자로 다시 파싱 (지금 설정에 없는 출처는 기본값)
+    selectors = {source.name: source.body_selectors for source in load_news_sources()}
+    near_dup_since = None
+    if since:
+        near_dup_since = datetime.date.fromisoformat(since) - datetime.timedelta(days=NEAR_DUP_DAYS)
+    pipeline = NewsPipeline(db_stock_data, cursor, conn, cache=cache, offline=True,
+                            near_dups=open_near_dup_index(cursor, near_dup_since))
+    processed = pipeline.run((link, date_text, selectors.get(source))
+                             for link, date_text, source in cache.iter_links(since, until))
+    print(f"[INFO] 캐시에서 기사 {processed}개 다시 처리 완료.")
+    return processed
 
-    url = "https://m.edaily.co.kr/NewsList/0701"
 
-    # 크롤링 시작
-    existing_links = get_existing_news_links(cursor, today_date_str)
-    news_links, found_date = fetch_news_links(url, target_date, existing_links)
+# 출처들을 target_date까지 수집해서 저장하고 다 처리한 출처의 체크포인트를 옮김. 저장한 기사 수 반환
+# (run_ingestion과 bench.py ingest가 같이 씀, 연결과 상장법인목록은 부르는 쪽에서 준비)
+def crawl_sources(db_stock_data, cursor, conn, sources, target_date, cache=None, progress=None,
+                  fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS, limiter=None):
+    target_date_str = target_date.strftime("%Y-%m-%d")
 
-    if news_links:
-        process_news_data(news_links, db_stock_data, cursor, conn)
-        print(f"[INFO] {found_date} 뉴스 총 {len(news_links)}개 저장 완료.")
+    # 출처마다 자기 체크포인트까지만 수집하고, 수집 범위(target_date 이후)에 이미 저장된 기사는 다시 받지 않음
+    # (중간에 멈춘 실행은 체크포인트가 그대로라서 다음 실행이 저장된 기사를 건너뛰며 이어서 수집)
+    checkpoints = {source.name: load_checkpoint(cursor, source.name) for source in sources}
+    existing_links = get_existing_news_links(cursor, target_date_str)
 
-    '''
-    # 나온횟수 업데이트
-    def update_news_count(cursor, conn):
-        query = "SELECT id, 뉴스링크 FROM 기업별_뉴스횟수Final"
-        cursor.execute(query)
-        rows = cursor.fetchall()
+    # 크롤링 시작 (출처별 링크 수집을 동시에 돌리고, 찾는 대로 기사 수집/파싱/저장을 함께 진행)
+    near_dups = open_near_dup_index(cursor, (target_date - datetime.timedelta(days=NEAR_DUP_DAYS)).date())
+    pipeline = NewsPipeline(db_stock_data, cursor, conn, fetch_workers=fetch_workers, parse_workers=parse_workers,
+                            cache=cache, progress=progress, near_dups=near_dups, limiter=limiter)
+    processed = pipeline.run_sources([
+        (source.name, source.body_selectors,
+         iter_news_links(source, target_date, set(existing_links), checkpoint=checkpoints[source.name]))
+        for source in sources])
+    print(f"[INFO] {target_date_str} 이후 뉴스 총 {processed}개 저장 완료.")
 
-        for row in rows:
-            row_id, links = row
-            if not links:
-                continue
-            count = len(links.split(" | "))  # ' | ' 기준으로 링크 개수 계산
-            update_query = "UPDATE 기업별_뉴스횟수Final SET 나온횟수 = %s WHERE id = %s"
-            cursor.execute(update_query, (count, row_id))
-
-        conn.commit()
-        print(f"[INFO] 나온횟수 업데이트 완료. 총 {len(rows)}개 레코드 적용.")
-
-    update_news_count(cursor, conn)
-    '''
-    cursor.close()
-    conn.close()
-    print("[INFO] 크롤링 및 데이터베이스 저장 완료.")
\ No newline at end of file
+    for source in sources:
+        newest_link = pipeline.sources[source.name].newest_link
+        if newest_link and pipeline.completed(source.name):
+            save_checkpoint(cursor, conn, source.name, checkpoints[source.name], *newest_link)
+        elif newest_link:
+            print(f"[WARNING] {source.name}의 일부 기사를 처리하지 못해 체크포인트를 그대로 둡니다. "
+                  "다음 실행에서 다시 시도합니다.")
+    return processed
+
+
+# 크롤링 한 번 실행 (명령줄 실행과 백그라운드 수집 작업자가 같이 씀). 저장한 기사 수 반환
+# progress(통계 dict)는 진행 상황 출력 간격마다 불림
+def run_ingestion(progress=None):
+    # 오래 떠 있는 작업자에서도 실행할 때마다 기준 날짜(전날)를 새로 계산
+    run_target_date = datetime.datetime.today() - datetime.timedelta(days=1)
+
+    conn = connect_to_db()
+    cursor = conn.cursor()
+    try:
+        print("[INFO] 테이블 생성 확인 중...")
+        ensure_table_exists(cursor)
+
+        print("[INFO] 상장법인목록 데이터 로드 중...")
+        db_stock_data = load_stock_data(cursor)
+
+        if not db_stock_data:
+            print("[WARNING] 상장법인목록 데이터가 비어 있습니다.")
+            return 0
+
+        return crawl_sources(db_stock_data, cursor, conn, load_news_sources(), run_target_date,
+                             cache=open_article_cache(), progress=progress)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="뉴스 수집 및 종목 언급 저장")
+    arg_parser.add_argument("--from-cache", action="store_true", help="네트워크 없이 기사 캐시만 다시 처리")
+    arg_parser.add_argument("--since", help="--from-cache 대상 시작 날짜 (YYYY-MM-DD)")
+    arg_parser.add_argument("--until", help="--from-cache 대상 끝 날짜 (YYYY-MM-DD)")
+    args = arg_parser.parse_args()
+
+    if args.from_cache:
+        conn = connect_to_db()
+        cursor = conn.cursor()
+        ensure_table_exists(cursor)
+        db_stock_data = load_stock_data(cursor)
+        if db_stock_data:
+            reprocess_from_cache(db_stock_data, cursor, conn, args.since, args.until)
+        else:
+            print("[WARNING] 상장법인목록 데이터가 비어 있습니다.")
+        cursor.close()
+        conn.close()
+    else:
+        run_ingestion()
+    print("[INFO] 크롤링 및 데이터베이스 저장 완료.")
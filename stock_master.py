@@ -0,0 +1,153 @@
+# 상장법인목록 스냅샷
+# - 상장법인목록_업종세분화 + type_name JOIN 결과를 종목코드 -> Company(__slots__ 레코드) dict로 들고 있음
+#   행마다 따로 만들어지는 시장 / 업종 문자열은 sys.intern으로 하나만 남기고, 주가 티커(005930.KS)는 읽을 때 한 번 만듦
+# - 읽은 결과를 원본 테이블 체크섬과 같이 로컬 파일에 저장해 두고, 다음에는 CHECKSUM TABLE 한 번으로
+#   바뀌었는지만 확인해서 같으면 JOIN 없이 파일(이미 읽었으면 메모리)에서 씀
+# - 수집(sql.load_stock_data)과 대시보드(chartF.py)가 같이 씀. 대시보드는 check_interval마다만 체크섬을 확인
+import json
+import os
+import sys
+import threading
+import time
+
+FORMAT_VERSION = 1  # 스냅샷 파일 형식 (바꾸면 예전 파일은 무시하고 DB에서 다시 만듦)
+SOURCE_TABLES = ("상장법인목록_업종세분화", "type_name")
+MARKET_SUFFIXES = {"코스피": ".KS", "코스닥": ".KQ"}  # yfinance 티커 접미사 (코넥스 등은 지원 안 됨)
+
+QUERY = '''
+SELECT 상장법인목록_업종세분화.code, 상장법인목록_업종세분화.name, 상장법인목록_업종세분화.market, type_name.type_name, type_name.type_ID
+FROM 상장법인목록_업종세분화
+JOIN type_name ON 상장법인목록_업종세분화.type_ID = type_name.type_ID
+'''
+
+
+def _intern(text):
+    return sys.intern(text) if isinstance(text, str) else text
+
+
+# 주가 티커 (지원하지 않는 시장이면 None)
+def ticker_for(code, market):
+    suffix = MARKET_SUFFIXES.get(market)
+    return f"{code}{suffix}" if suffix else None
+
+
+class Company:
+    __slots__ = ("code", "name", "market", "type_name", "type_ID", "ticker")
+
+    def __init__(self, code, name, market, type_name, type_ID):
+        self.code = code
+        self.name = name
+        self.market = _intern(market)
+        self.type_name = _intern(type_name)
+        self.type_ID = type_ID
+        self.ticker = ticker_for(code, market)
+
+    def __repr__(self):
+        return f"Company({self.code!r}, {self.name!r}, {self.market!r}, {self.type_name!r}, {self.type_ID!r})"
+
+
+# DB 행 (code, name, market, type_name, type_ID) -> Company (종목코드 6자리, 시장이 비어 있으면 '기타')
+def company_from_row(row):
+    code, name, market, type_name, type_ID = row
+    return Company(str(code).strip().zfill(6), name.strip(), market.strip() if market else "기타",
+                   type_name.strip(), type_ID)
+
+
+def query_companies(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(QUERY)
+        rows = cursor.fetchall()
+    companies = {}
+    for row in rows:
+        company = company_from_row(row)
+        companies[company.code] = company
+    return companies
+
+
+# 원본 테이블 체크섬 ('테이블:값,...'), 테이블이 없거나 잴 수 없으면 None
+def source_checksum(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"CHECKSUM TABLE {', '.join(SOURCE_TABLES)}")
+        rows = cursor.fetchall()
+    if len(rows) != len(SOURCE_TABLES) or any(checksum is None for _, checksum in rows):
+        return None
+    return ",".join(f"{table}:{checksum}" for table, checksum in sorted(rows))
+
+
+# (체크섬, {종목코드: Company}), 파일이 없거나 형식이 다르면 None
+def read_snapshot(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != FORMAT_VERSION:
+        return None
+    return data["checksum"], {row[0]: Company(*row) for row in data["rows"]}
+
+
+def write_snapshot(path, checksum, companies):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rows = [[company.code, company.name, company.market, company.type_name, company.type_ID]
+            for company in companies.values()]
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"format": FORMAT_VERSION, "checksum": checksum, "saved_at": time.time(), "rows": rows},
+                           ensure_ascii=False, separators=(",", ":")))
+    os.replace(temp_path, path)
+
+
+# 프로세스 하나가 같이 쓰는 상장법인목록 (path: 스냅샷 파일, 비우면 파일 없이 체크섬이 바뀔 때만 DB에서 다시 읽음)
+# check_interval(초) 안에는 체크섬도 확인하지 않고 들고 있는 것을 그대로 씀 (0이면 load할 때마다 확인)
+class StockMaster:
+    def __init__(self, path, check_interval=0):
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.companies = {}
+        self.checksum = None
+        self.checked_at = None
+        # 통계
+        self.checks = 0
+        self.db_loads = 0
+        self.file_loads = 0
+
+    def stale(self):
+        return self.checked_at is None or time.monotonic() - self.checked_at >= self.check_interval
+
+    # {종목코드: Company} (확인할 때가 됐으면 체크섬을 보고 바뀌었을 때만 다시 읽음)
+    def load(self, conn):
+        with self.lock:
+            if not self.stale():
+                return self.companies
+            # 확인에 실패해도 check_interval 동안은 다시 시도하지 않음 (대시보드가 화면마다 재시도하지 않도록)
+            self.checked_at = time.monotonic()
+            checksum = source_checksum(conn)
+            self.checks += 1
+            if checksum is None or checksum != self.checksum:
+                self._reload(conn, checksum)
+            return self.companies
+
+    def _reload(self, conn, checksum):
+        snapshot = read_snapshot(self.path) if self.path and checksum is not None else None
+        if snapshot and snapshot[0] == checksum:
+            self.companies = snapshot[1]
+            self.file_loads += 1
+            origin = "스냅샷 파일"
+        else:
+            self.companies = query_companies(conn)
+            self.db_loads += 1
+            origin = "DB"
+            if self.path and checksum is not None:
+                try:
+                    write_snapshot(self.path, checksum, self.companies)
+                except OSError as e:
+                    print(f"[WARNING] 상장법인목록 스냅샷 저장 실패: {e}")
+        self.checksum = checksum
+        print(f"[INFO] 상장법인목록 {len(self.companies)}개를 {origin}에서 읽었습니다.")
+
+    def stats(self):
+        return {"companies": len(self.companies), "checks": self.checks, "db_loads": self.db_loads,
+                "file_loads": self.file_loads}
@@ -0,0 +1,118 @@
+# 종목코드 / 기업명 매칭
+# 상장법인목록으로 Aho-Corasick 오토마톤을 한 번 만들어 두고,
+# 기사 본문을 한 번만 훑어서 나온 종목코드를 모두 찾음
+
+# 기업명 바로 뒤에 붙어도 되는 조사 (뒤에 붙은 한글이 통째로 이 중 하나일 때만 기업명으로 봄)
+# '신세계인터내셔날', 'LG에너지솔루션'처럼 목록에 없는 더 긴 이름의 앞부분은 기업명으로 보지 않음
+PARTICLES = frozenset([
+    "은", "는", "이", "가", "을", "를", "의", "에", "에서", "에게", "에는", "에도", "에선", "와", "과", "와의", "과의",
+    "와는", "과는", "도", "만", "로", "으로", "로는", "으로는", "로서", "으로서", "이나", "나", "보다", "처럼", "까지",
+    "부터", "이며", "이고", "이다", "이라", "이라는", "라는", "측", "등", "엔",
+])
+
+# 흔한 낱말과 같은 기업명 ('투자 대상으로', '태양광', '고려해야'): 이름으로는 찾지 않고 종목코드로만 찾음
+AMBIGUOUS_NAMES = frozenset([
+    "대상", "동양", "전방", "태양", "동방", "한창", "진도", "선진", "국보", "신원", "화신", "고려", "신성", "대원",
+    "대동", "서원", "세원", "대현", "성안", "경방", "삼영", "우진", "일진", "대유", "세방",
+])
+
+
+def _is_ascii_alnum(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+def _is_hangul(ch):
+    return "가" <= ch <= "힣"
+
+
+class StockMatcher:
+    def __init__(self, db_stock_data, match_names=True, min_name_length=2, stop_names=AMBIGUOUS_NAMES,
+                 particles=PARTICLES):
+        # 상태별 전이 / 실패 링크 / 출력 (패턴 길이, 종목코드, 코드 패턴 여부)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.particles = particles  # None이면 뒤에 붙은 한글을 검사하지 않음
+
+        for code in db_stock_data:
+            self._add(code, code, True)
+        if match_names:
+            for code, info in db_stock_data.items():
+                name = info.name
+                if len(name) >= min_name_length and name not in stop_names:
+                    self._add(name, code, False)
+        self._build()
+
+    def _add(self, pattern, code, is_code):
+        state = 0
+        for ch in pattern:
+            next_state = self.goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][ch] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append((len(pattern), code, is_code))
+
+    # BFS로 실패 링크를 만들고 실패 상태의 출력을 합쳐 둠
+    def _build(self):
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail_state = self.fail[state]
+                while fail_state and ch not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                target = self.goto[fail_state].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    # 단어 경계 확인
+    # - 종목코드: 앞뒤가 영문/숫자가 아니어야 함 (예: '(005930)')
+    # - 기업명: 영문으로 시작/끝나면 앞뒤가 영문/숫자가 아니어야 하고, 한글 앞에 붙어 있으면 다른 단어의 일부로 봄
+    #   뒤에 붙은 한글은 조사(PARTICLES)일 때만 허용: '삼성전자는'은 되고 '신세계인터내셔날'의 '신세계'는 안 됨
+    def _at_boundary(self, text, start, end, is_code):
+        before = text[start - 1] if start > 0 else ""
+        after = text[end] if end < len(text) else ""
+        if is_code:
+            return not (before and _is_ascii_alnum(before)) and not (after and _is_ascii_alnum(after))
+        if before and (_is_hangul(before) or (_is_ascii_alnum(text[start]) and _is_ascii_alnum(before))):
+            return False
+        if after and _is_ascii_alnum(text[end - 1]) and _is_ascii_alnum(after):
+            return False
+        if after and _is_hangul(after) and self.particles is not None:
+            word_end = end
+            while word_end < len(text) and _is_hangul(text[word_end]):
+                word_end += 1
+            return text[end:word_end] in self.particles
+        return True
+
+    # 본문에서 겹치지 않는 가장 긴 매칭(왼쪽 우선)을 골라 종목코드 집합으로 반환
+    def find_codes(self, text):
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        matches = []
+        state = 0
+        for end, ch in enumerate(text, start=1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, code, is_code in output[state]:
+                start = end - length
+                if self._at_boundary(text, start, end, is_code):
+                    matches.append((start, -length, code))
+
+        codes = set()
+        covered_until = 0
+        for start, negative_length, code in sorted(matches):
+            if start < covered_until:
+                continue
+            codes.add(code)
+            covered_until = start - negative_length
+        return codes